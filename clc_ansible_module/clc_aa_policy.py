@@ -67,6 +67,9 @@ notes:
           - CLC_V2_API_TOKEN, the API token generated from https://api.ctl.io/v2/authentication/login
           - CLC_ACCT_ALIAS, the account alias associated with the centurylink cloud
     - Users can set CLC_V2_API_URL to specify an endpoint for pointing to a different CLC environment.
+    - Users can set CLC_CACHE_TTL to the number of seconds the policy lists of an account are cached on disk
+      and shared with the other CLC modules. CLC_CACHE_DIR overrides the default cache directory
+      ~/.ansible/tmp/clc_cache.
 '''
 
 EXAMPLES = '''
@@ -142,6 +145,9 @@ policy:
 
 __version__ = '${version}'
 
+import re
+import tempfile
+import time
 from distutils.version import LooseVersion
 
 try:
@@ -165,6 +171,94 @@ else:
     CLC_FOUND = True
 
 
+class ClcCatalogCache(object):
+    """
+    On disk cache of CLC API listings, shared between tasks and between modules.
+    It is enabled by setting the CLC_CACHE_TTL environment variable to the number
+    of seconds a listing stays valid.  CLC_CACHE_DIR overrides the default cache
+    directory of ~/.ansible/tmp/clc_cache.
+    """
+
+    @staticmethod
+    def _get_ttl():
+        """
+        Read the cache time to live from the environment
+        :return: the time to live in seconds, 0 when caching is disabled
+        """
+        try:
+            return int(os.environ.get('CLC_CACHE_TTL', 0))
+        except ValueError:
+            return 0
+
+    @staticmethod
+    def _get_path(kind, key):
+        """
+        Build the path of the cache file for a listing
+        :param kind: the kind of listing, e.g. alert_policies
+        :param key: the key of the listing, e.g. the account alias
+        :return: the path of the cache file
+        """
+        cache_dir = os.environ.get('CLC_CACHE_DIR') or os.path.join(
+            os.path.expanduser('~'), '.ansible', 'tmp', 'clc_cache')
+        name = re.sub(r'[^\w.-]', '_', '%s_%s' % (kind, str(key).lower()))
+        return os.path.join(cache_dir, name + '.json')
+
+    @staticmethod
+    def get(kind, key):
+        """
+        Get a listing from the cache
+        :param kind: the kind of listing
+        :param key: the key of the listing
+        :return: the cached list of items, or None when missing or expired
+        """
+        ttl = ClcCatalogCache._get_ttl()
+        if ttl <= 0:
+            return None
+        try:
+            with open(ClcCatalogCache._get_path(kind, key)) as cache_file:
+                entry = json.load(cache_file)
+        except (IOError, OSError, ValueError):
+            return None
+        if time.time() - entry.get('timestamp', 0) > ttl:
+            return None
+        return entry.get('items')
+
+    @staticmethod
+    def put(kind, key, items):
+        """
+        Store a listing in the cache. Failures to write the cache are ignored.
+        :param kind: the kind of listing
+        :param key: the key of the listing
+        :param items: the list of items to store
+        :return: none
+        """
+        if ClcCatalogCache._get_ttl() <= 0:
+            return
+        path = ClcCatalogCache._get_path(kind, key)
+        try:
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, 'w') as cache_file:
+                json.dump({'timestamp': time.time(), 'items': items}, cache_file)
+            os.rename(tmp_path, path)
+        except (IOError, OSError):
+            pass
+
+    @staticmethod
+    def invalidate(kind, key):
+        """
+        Remove a listing from the cache
+        :param kind: the kind of listing
+        :param key: the key of the listing
+        :return: none
+        """
+        try:
+            os.remove(ClcCatalogCache._get_path(kind, key))
+        except (IOError, OSError):
+            pass
+
+
 class ClcAntiAffinityPolicy(object):
 
     clc = clc_sdk
@@ -176,6 +270,7 @@ class ClcAntiAffinityPolicy(object):
         """
         self.module = module
         self.policy_dict = {}
+        self.alias = None
 
         if not CLC_FOUND:
             self.module.fail_json(
@@ -212,6 +307,7 @@ class ClcAntiAffinityPolicy(object):
         p = self.module.params
 
         self._set_clc_credentials_from_env()
+        self.alias = self.clc.v2.Account.GetAlias()
         self.policy_dict = self._get_policies_for_datacenter(p)
 
         if p['state'] == "absent":
@@ -257,15 +353,34 @@ class ClcAntiAffinityPolicy(object):
     def _get_policies_for_datacenter(self, p):
         """
         Get the Policies for a datacenter by calling the CLC API.
+        The policies of the account are read from the shared catalog cache when available.
         :param p: datacenter to get policies from
         :return: policies in the datacenter
         """
         response = {}
 
-        policies = self.clc.v2.AntiAffinity.GetAll(location=p['location'])
+        catalog = ClcCatalogCache.get('aa_policies', self.alias)
+        if catalog is not None:
+            policies = [self.clc.v2.AntiAffinity(
+                id=policy.get('id'),
+                alias=self.alias,
+                name=policy.get('name'),
+                location=policy.get('location'),
+                servers=policy.get('servers'))
+                for policy in catalog
+                if str(policy.get('location')).lower() == p['location'].lower()]
+        else:
+            policies = self.clc.v2.AntiAffinity.GetAll(alias=self.alias)
+            ClcCatalogCache.put('aa_policies', self.alias, [
+                {'id': policy.id,
+                 'name': policy.name,
+                 'location': policy.location,
+                 'servers': policy.servers}
+                for policy in policies])
 
         for policy in policies:
-            response[policy.name] = policy
+            if str(policy.location).lower() == p['location'].lower():
+                response[policy.name] = policy
         return response
 
     def _create_policy(self, p):
@@ -275,9 +390,11 @@ class ClcAntiAffinityPolicy(object):
         :return: response dictionary from the CLC API.
         """
         try:
-            return self.clc.v2.AntiAffinity.Create(
+            policy = self.clc.v2.AntiAffinity.Create(
                 name=p['name'],
                 location=p['location'])
+            ClcCatalogCache.invalidate('aa_policies', self.alias)
+            return policy
         except CLCException as ex:
             self.module.fail_json(msg='Failed to create anti affinity policy : {0}. {1}'.format(
                 p['name'], ex.response_text
@@ -292,6 +409,7 @@ class ClcAntiAffinityPolicy(object):
         try:
             policy = self.policy_dict[p['name']]
             policy.Delete()
+            ClcCatalogCache.invalidate('aa_policies', self.alias)
         except CLCException as ex:
             self.module.fail_json(msg='Failed to delete anti affinity policy : {0}. {1}'.format(
                 p['name'], ex.response_text
@@ -78,6 +78,19 @@ options:
     required: False
     default: present
     choices: ['present','absent']
+  policies:
+    description:
+      - A list of alert policies to reconcile in a single task. Each entry is a dictionary accepting the keys
+        name, id, alert_recipients, metric, duration, threshold and state, with the same meaning as the module
+        options. An entry without a state uses the state of the module. This is mutually exclusive with name and id.
+    required: False
+    default: None
+  parallelism:
+    description:
+      - The maximum number of alert policy changes to submit to the CLC API at the same time
+        when policies is set.
+    required: False
+    default: 10
 requirements:
     - python = 2.7
     - requests >= 2.5.0
@@ -93,6 +106,9 @@ notes:
           - CLC_V2_API_TOKEN, the API token generated from https://api.ctl.io/v2/authentication/login
           - CLC_ACCT_ALIAS, the account alias associated with the centurylink cloud
     - Users can set CLC_V2_API_URL to specify an endpoint for pointing to a different CLC environment.
+    - Users can set CLC_CACHE_TTL to the number of seconds the alert policy list of an account is cached on disk
+      and shared with the other CLC modules. CLC_CACHE_DIR overrides the default cache directory
+      ~/.ansible/tmp/clc_cache.
 '''
 
 EXAMPLES = '''
@@ -135,6 +151,33 @@ EXAMPLES = '''
 
     - name: debug
       debug: var=policy
+
+---
+- name: Reconcile Alert Policies Example
+  hosts: localhost
+  gather_facts: False
+  connection: local
+  tasks:
+    - name: Ensure the alert policies of the web tier
+      clc_alert_policy:
+        alias: wfad
+        policies:
+          - name: 'web cpu > 90%'
+            alert_recipients: ['ops@centurylink.com']
+            metric: cpu
+            duration: '00:05:00'
+            threshold: 90
+          - name: 'web disk > 80%'
+            alert_recipients: ['ops@centurylink.com']
+            metric: disk
+            duration: '00:05:00'
+            threshold: 80
+          - name: 'web memory > 95%'
+            state: absent
+      register: policies
+
+    - name: debug
+      debug: var=policies
 '''
 
 RETURN = '''
@@ -185,7 +228,11 @@ policy:
 
 __version__ = '${version}'
 
+import re
+import tempfile
+import time
 from distutils.version import LooseVersion
+from multiprocessing.pool import ThreadPool
 
 try:
     import requests
@@ -208,6 +255,94 @@ else:
     CLC_FOUND = True
 
 
+class ClcCatalogCache(object):
+    """
+    On disk cache of CLC API listings, shared between tasks and between modules.
+    It is enabled by setting the CLC_CACHE_TTL environment variable to the number
+    of seconds a listing stays valid.  CLC_CACHE_DIR overrides the default cache
+    directory of ~/.ansible/tmp/clc_cache.
+    """
+
+    @staticmethod
+    def _get_ttl():
+        """
+        Read the cache time to live from the environment
+        :return: the time to live in seconds, 0 when caching is disabled
+        """
+        try:
+            return int(os.environ.get('CLC_CACHE_TTL', 0))
+        except ValueError:
+            return 0
+
+    @staticmethod
+    def _get_path(kind, key):
+        """
+        Build the path of the cache file for a listing
+        :param kind: the kind of listing, e.g. alert_policies
+        :param key: the key of the listing, e.g. the account alias
+        :return: the path of the cache file
+        """
+        cache_dir = os.environ.get('CLC_CACHE_DIR') or os.path.join(
+            os.path.expanduser('~'), '.ansible', 'tmp', 'clc_cache')
+        name = re.sub(r'[^\w.-]', '_', '%s_%s' % (kind, str(key).lower()))
+        return os.path.join(cache_dir, name + '.json')
+
+    @staticmethod
+    def get(kind, key):
+        """
+        Get a listing from the cache
+        :param kind: the kind of listing
+        :param key: the key of the listing
+        :return: the cached list of items, or None when missing or expired
+        """
+        ttl = ClcCatalogCache._get_ttl()
+        if ttl <= 0:
+            return None
+        try:
+            with open(ClcCatalogCache._get_path(kind, key)) as cache_file:
+                entry = json.load(cache_file)
+        except (IOError, OSError, ValueError):
+            return None
+        if time.time() - entry.get('timestamp', 0) > ttl:
+            return None
+        return entry.get('items')
+
+    @staticmethod
+    def put(kind, key, items):
+        """
+        Store a listing in the cache. Failures to write the cache are ignored.
+        :param kind: the kind of listing
+        :param key: the key of the listing
+        :param items: the list of items to store
+        :return: none
+        """
+        if ClcCatalogCache._get_ttl() <= 0:
+            return
+        path = ClcCatalogCache._get_path(kind, key)
+        try:
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, 'w') as cache_file:
+                json.dump({'timestamp': time.time(), 'items': items}, cache_file)
+            os.rename(tmp_path, path)
+        except (IOError, OSError):
+            pass
+
+    @staticmethod
+    def invalidate(kind, key):
+        """
+        Remove a listing from the cache
+        :param kind: the kind of listing
+        :param key: the key of the listing
+        :return: none
+        """
+        try:
+            os.remove(ClcCatalogCache._get_path(kind, key))
+        except (IOError, OSError):
+            pass
+
+
 class ClcAlertPolicy(object):
 
     clc = clc_sdk
@@ -232,6 +367,18 @@ class ClcAlertPolicy(object):
 
         self._set_user_agent(self.clc)
 
+    @property
+    def policy_dict(self):
+        """
+        The alert policies of the account, keyed by policy id
+        """
+        return self._policy_dict
+
+    @policy_dict.setter
+    def policy_dict(self, value):
+        self._policy_dict = value
+        self._policy_name_index = None
+
     @staticmethod
     def _define_module_argument_spec():
         """
@@ -251,10 +398,14 @@ class ClcAlertPolicy(object):
                 default=None),
             duration=dict(type='str', default=None),
             threshold=dict(type='int', default=None),
-            state=dict(default='present', choices=['present', 'absent'])
+            state=dict(default='present', choices=['present', 'absent']),
+            policies=dict(type='list', default=None),
+            parallelism=dict(type='int', default=10)
         )
         mutually_exclusive = [
-            ['name', 'id']
+            ['name', 'id'],
+            ['policies', 'name'],
+            ['policies', 'id']
         ]
         return {'argument_spec': argument_spec,
                 'mutually_exclusive': mutually_exclusive}
@@ -270,6 +421,11 @@ class ClcAlertPolicy(object):
         self._set_clc_credentials_from_env()
         self.policy_dict = self._get_alert_policies(p['alias'])
 
+        if p.get('policies') is not None:
+            changed, policies = self._ensure_alert_policies_are_reconciled(
+                p.get('policies'))
+            return self.module.exit_json(changed=changed, policies=policies)
+
         if p['state'] == 'present':
             changed, policy = self._ensure_alert_policy_is_present()
         else:
@@ -320,6 +476,11 @@ class ClcAlertPolicy(object):
             self.module.fail_json(msg='Policy name is a required')
         policy = self._alert_policy_exists(policy_name)
         if not policy:
+            missing = self._get_missing_policy_fields(p)
+            if missing:
+                return self.module.fail_json(
+                    msg='Missing required alert policy fields for "{0}": {1}'.format(
+                        policy_name, ', '.join(missing)))
             changed = True
             policy = None
             if not self.module.check_mode:
@@ -365,40 +526,279 @@ class ClcAlertPolicy(object):
         changed = False
         p = self.module.params
         alert_policy_id = alert_policy.get('id')
-        email_list = p.get('alert_recipients')
-        metric = p.get('metric')
-        duration = p.get('duration')
-        threshold = p.get('threshold')
         policy = alert_policy
-        if (metric and metric != str(alert_policy.get('triggers')[0].get('metric'))) or \
-                (duration and duration != str(alert_policy.get('triggers')[0].get('duration'))) or \
-                (threshold and float(threshold) != float(alert_policy.get('triggers')[0].get('threshold'))):
+        if self._alert_policy_needs_update(alert_policy, p):
             changed = True
+        if changed and not self.module.check_mode:
+            policy = self._update_alert_policy(alert_policy_id)
+        return changed, policy
+
+    @staticmethod
+    def _alert_policy_needs_update(alert_policy, params):
+        """
+        Compares an existing alert policy with the requested configuration
+        :param alert_policy: the existing alert policy
+        :param params: dictionary with the requested alert_recipients, metric, duration and threshold
+        :return: True if the trigger or the recipients differ, False otherwise
+        """
+        email_list = params.get('alert_recipients')
+        metric = params.get('metric')
+        duration = params.get('duration')
+        threshold = params.get('threshold')
+        trigger = alert_policy.get('triggers')[0]
+        if (metric and metric != str(trigger.get('metric'))) or \
+                (duration and duration != str(trigger.get('duration'))) or \
+                (threshold and float(threshold) != float(trigger.get('threshold'))):
+            return True
         elif email_list:
             t_email_list = list(
                 alert_policy.get('actions')[0].get('settings').get('recipients'))
             if set(email_list) != set(t_email_list):
-                changed = True
-        if changed and not self.module.check_mode:
-            policy = self._update_alert_policy(alert_policy_id)
-        return changed, policy
+                return True
+        return False
+
+    @staticmethod
+    def _get_missing_policy_fields(params):
+        """
+        Lists the fields required to create an alert policy that are not set
+        :param params: dictionary with the requested alert_recipients, metric, duration and threshold
+        :return: the list of missing field names
+        """
+        return [field for field in ('alert_recipients', 'metric', 'duration', 'threshold')
+                if params.get(field) in (None, '', [])]
+
+    def _ensure_alert_policies_are_reconciled(self, policies):
+        """
+        Ensures a list of alert policies are present or absent.  The existing policies are
+        fetched once, and the required deletes, then creates and updates, are submitted concurrently.
+        :param policies: the list of alert policy dictionaries
+        :return: (changed, report)
+                 changed: A flag representing if anything is modified
+                 report: the list of per policy changes
+        """
+        p = self.module.params
+        alias = p.get('alias')
+        changes = self._plan_alert_policy_changes(policies)
+        pending = [change for change in changes if change['action'] != 'unchanged']
+
+        if pending and not self.module.check_mode:
+            for actions in (('delete',), ('create', 'update')):
+                self._run_in_parallel(
+                    lambda change: self._apply_alert_policy_change(alias, change),
+                    [change for change in pending if change['action'] in actions],
+                    p.get('parallelism'))
+            for change in pending:
+                if not change.get('error'):
+                    self._update_policy_catalog(
+                        alias, change['id'], change.get('policy'))
+            errors = [change['error'] for change in pending if change.get('error')]
+            if errors:
+                return self.module.fail_json(
+                    msg='Unable to reconcile the alert policies. {0}'.format(
+                        ' '.join(errors)),
+                    policies=self._get_alert_policy_report(changes))
+        return len(pending) > 0, self._get_alert_policy_report(changes)
+
+    def _plan_alert_policy_changes(self, policies):
+        """
+        Computes the alert policies to create, update and delete
+        :param policies: the list of alert policy dictionaries
+        :return: the list of planned changes
+        """
+        changes = []
+        seen = set()
+        default_state = self.module.params.get('state')
+        for policy in policies:
+            if not isinstance(policy, dict):
+                return self.module.fail_json(
+                    msg='Each entry of policies must be a dictionary: {0}'.format(policy))
+            name = policy.get('name')
+            policy_id = policy.get('id')
+            state = policy.get('state') or default_state
+            if not name and not policy_id:
+                return self.module.fail_json(
+                    msg='Either alert policy id or policy name is required: {0}'.format(policy))
+            if (name, policy_id) in seen:
+                return self.module.fail_json(
+                    msg='The alert policy is listed more than once: {0}'.format(name or policy_id))
+            seen.add((name, policy_id))
+            if not policy_id:
+                policy_id = self._get_alert_policy_id(self.module, name)
+            current = self.policy_dict.get(policy_id) if policy_id else None
+
+            if state == 'absent':
+                action = 'delete' if current else 'unchanged'
+            elif not current:
+                if not name:
+                    return self.module.fail_json(
+                        msg='Unable to find the alert policy id : {0}'.format(policy_id))
+                missing = self._get_missing_policy_fields(policy)
+                if missing:
+                    return self.module.fail_json(
+                        msg='Missing required alert policy fields for "{0}": {1}'.format(
+                            name, ', '.join(missing)))
+                action = 'create'
+            elif self._alert_policy_needs_update(current, policy):
+                action = 'update'
+            else:
+                action = 'unchanged'
+            changes.append({
+                'name': name or current.get('name'),
+                'id': policy_id,
+                'action': action,
+                'policy': current,
+                'params': policy})
+        return changes
+
+    def _apply_alert_policy_change(self, alias, change):
+        """
+        Submits a single planned alert policy change to the CLC API.
+        Failures are recorded on the change instead of failing the module,
+        as this runs on a worker thread.
+        :param alias: the account alias
+        :param change: the planned change dictionary
+        :return: the change dictionary, updated with the resulting policy or the error
+        """
+        action = change['action']
+        params = change['params']
+        try:
+            if action == 'delete':
+                self.clc.v2.API.Call(
+                    'DELETE', '/v2/alertPolicies/%s/%s' % (alias, change['id']), None)
+                change['policy'] = None
+            else:
+                current = change.get('policy') or {}
+                trigger = (current.get('triggers') or [{}])[0]
+                recipients = params.get('alert_recipients')
+                if recipients is None and current:
+                    recipients = current.get('actions')[0].get('settings').get('recipients')
+                arguments = self._build_alert_policy_payload(
+                    change['name'],
+                    recipients,
+                    params.get('metric') or trigger.get('metric'),
+                    params.get('duration') or trigger.get('duration'),
+                    params.get('threshold') or trigger.get('threshold'))
+                if action == 'create':
+                    change['policy'] = self.clc.v2.API.Call(
+                        'POST', '/v2/alertPolicies/%s' % alias, arguments)
+                    change['id'] = change['policy'].get('id')
+                else:
+                    change['policy'] = self.clc.v2.API.Call(
+                        'PUT', '/v2/alertPolicies/%s/%s' % (alias, change['id']), arguments)
+        except APIFailedResponse as e:
+            change['error'] = 'Unable to {0} alert policy "{1}". {2}'.format(
+                action, change['name'], str(e.response_text))
+        return change
+
+    @staticmethod
+    def _get_alert_policy_report(changes):
+        """
+        Builds the module output for a list of alert policy changes
+        :param changes: the list of change dictionaries
+        :return: the list of reported changes
+        """
+        return [{'name': change['name'],
+                 'id': change['id'],
+                 'action': change['action'],
+                 'policy': change.get('policy')}
+                for change in changes]
+
+    @staticmethod
+    def _build_alert_policy_payload(policy_name, email_list, metric, duration, threshold):
+        """
+        Builds the json payload to create or update an alert policy
+        :param policy_name: the alert policy name
+        :param email_list: the list of recipient email ids
+        :param metric: the metric of the trigger
+        :param duration: the duration of the trigger
+        :param threshold: the threshold of the trigger
+        :return: the json payload
+        """
+        return json.dumps(
+            {
+                'name': policy_name,
+                'actions': [{
+                    'action': 'email',
+                    'settings': {
+                        'recipients': email_list
+                    }
+                }],
+                'triggers': [{
+                    'metric': metric,
+                    'duration': duration,
+                    'threshold': threshold
+                }]
+            }
+        )
+
+    @staticmethod
+    def _run_in_parallel(func, items, parallelism):
+        """
+        Calls func for every item on a bounded pool of threads
+        :param func: the function to call with each item
+        :param items: the list of items to process
+        :param parallelism: the maximum number of concurrent calls
+        :return: the list of results, in the same order as items
+        """
+        items = list(items)
+        if not parallelism or parallelism < 2 or len(items) < 2:
+            return [func(item) for item in items]
+        pool = ThreadPool(min(parallelism, len(items)))
+        try:
+            return pool.map(func, items)
+        finally:
+            pool.close()
+            pool.join()
 
     def _get_alert_policies(self, alias):
         """
-        Get the alert policies for account alias by calling the CLC API.
+        Get the alert policies for account alias from the shared catalog cache,
+        or by calling the CLC API when the cache is missing or expired.
         :param alias: the account alias
         :return: the alert policies for the account alias
         """
         response = {}
 
-        policies = self.clc.v2.API.Call('GET',
-                                        '/v2/alertPolicies/%s'
-                                        % alias)
+        policies = ClcCatalogCache.get('alert_policies', alias)
+        if policies is None:
+            policies = self.clc.v2.API.Call('GET',
+                                            '/v2/alertPolicies/%s'
+                                            % alias).get('items')
+            ClcCatalogCache.put('alert_policies', alias, policies)
 
-        for policy in policies.get('items'):
+        for policy in policies:
             response[policy.get('id')] = policy
         return response
 
+    def _get_policy_name_index(self):
+        """
+        Get the alert policy ids keyed by policy name, building the index on first use
+        :return: dictionary of policy name to list of policy ids
+        """
+        if self._policy_name_index is None:
+            self._policy_name_index = {}
+            for policy_id in self.policy_dict:
+                self._policy_name_index.setdefault(
+                    self.policy_dict.get(policy_id).get('name'), []).append(policy_id)
+        return self._policy_name_index
+
+    def _update_policy_catalog(self, alias, policy_id, policy=None):
+        """
+        Record a created, updated or deleted alert policy in the policy indexes and the shared catalog cache
+        :param alias: the account alias
+        :param policy_id: the alert policy id
+        :param policy: the alert policy, None when it was deleted
+        :return: none
+        """
+        if not isinstance(self.policy_dict, dict):
+            return
+        if policy_id in self.policy_dict:
+            self.policy_dict.pop(policy_id)
+        if isinstance(policy, dict):
+            self.policy_dict[policy_id] = policy
+        self._policy_name_index = None
+        ClcCatalogCache.put('alert_policies', alias, list(self.policy_dict.values()))
+
     def _create_alert_policy(self):
         """
         Create an alert Policy using the CLC API.
@@ -411,22 +811,8 @@ class ClcAlertPolicy(object):
         duration = p['duration']
         threshold = p['threshold']
         policy_name = p['name']
-        arguments = json.dumps(
-            {
-                'name': policy_name,
-                'actions': [{
-                    'action': 'email',
-                    'settings': {
-                        'recipients': email_list
-                    }
-                }],
-                'triggers': [{
-                    'metric': metric,
-                    'duration': duration,
-                    'threshold': threshold
-                }]
-            }
-        )
+        arguments = self._build_alert_policy_payload(
+            policy_name, email_list, metric, duration, threshold)
         try:
             result = self.clc.v2.API.Call(
                 'POST',
@@ -436,6 +822,8 @@ class ClcAlertPolicy(object):
             return self.module.fail_json(
                 msg='Unable to create alert policy "{0}". {1}'.format(
                     policy_name, str(e.response_text)))
+        if isinstance(result, dict) and result.get('id'):
+            self._update_policy_catalog(alias, result.get('id'), result)
         return result
 
     def _update_alert_policy(self, alert_policy_id):
@@ -451,22 +839,8 @@ class ClcAlertPolicy(object):
         duration = p['duration']
         threshold = p['threshold']
         policy_name = p['name']
-        arguments = json.dumps(
-            {
-                'name': policy_name,
-                'actions': [{
-                    'action': 'email',
-                    'settings': {
-                        'recipients': email_list
-                    }
-                }],
-                'triggers': [{
-                    'metric': metric,
-                    'duration': duration,
-                    'threshold': threshold
-                }]
-            }
-        )
+        arguments = self._build_alert_policy_payload(
+            policy_name, email_list, metric, duration, threshold)
         try:
             result = self.clc.v2.API.Call(
                 'PUT', '/v2/alertPolicies/%s/%s' %
@@ -475,6 +849,8 @@ class ClcAlertPolicy(object):
             return self.module.fail_json(
                 msg='Unable to update alert policy "{0}". {1}'.format(
                     policy_name, str(e.response_text)))
+        if isinstance(result, dict):
+            self._update_policy_catalog(alias, alert_policy_id, result)
         return result
 
     def _delete_alert_policy(self, alias, policy_id):
@@ -492,6 +868,7 @@ class ClcAlertPolicy(object):
             return self.module.fail_json(
                 msg='Unable to delete alert policy id "{0}". {1}'.format(
                     policy_id, str(e.response_text)))
+        self._update_policy_catalog(alias, policy_id)
         return result
 
     def _alert_policy_exists(self, policy_name):
@@ -501,9 +878,9 @@ class ClcAlertPolicy(object):
         :return: boolean of if the policy exists
         """
         result = False
-        for policy_id in self.policy_dict:
-            if self.policy_dict.get(policy_id).get('name') == policy_name:
-                result = self.policy_dict.get(policy_id)
+        policy_ids = self._get_policy_name_index().get(policy_name)
+        if policy_ids:
+            result = self.policy_dict.get(policy_ids[-1])
         return result
 
     def _get_alert_policy_id(self, module, alert_policy_name):
@@ -514,13 +891,12 @@ class ClcAlertPolicy(object):
         :return: alert_policy_id: The alert policy id
         """
         alert_policy_id = None
-        for policy_id in self.policy_dict:
-            if self.policy_dict.get(policy_id).get('name') == alert_policy_name:
-                if not alert_policy_id:
-                    alert_policy_id = policy_id
-                else:
-                    return module.fail_json(
-                        msg='multiple alert policies were found with policy name : %s' % alert_policy_name)
+        policy_ids = self._get_policy_name_index().get(alert_policy_name, [])
+        if len(policy_ids) > 1:
+            return module.fail_json(
+                msg='multiple alert policies were found with policy name : %s' % alert_policy_name)
+        if policy_ids:
+            alert_policy_id = policy_ids[0]
         return alert_policy_id
 
     @staticmethod
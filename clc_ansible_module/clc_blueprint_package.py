@@ -58,6 +58,42 @@ options:
     choices: [ True, False ]
     default: True
     required: False
+  parallelism:
+    description:
+      - The maximum number of package executions to submit, and of requests to wait for, at the same time.
+    default: 10
+    required: False
+  submission_rate:
+    description:
+      - The maximum number of package executions submitted per second, to stay within the API rate limits.
+        Set to 0 to submit the executions without a limit.
+    default: 5
+    required: False
+  batch_size:
+    description:
+      - Install the package in waves of this many servers. Each wave is submitted and waited for before
+        the next wave starts. By default all the servers are handled in one wave.
+    default: None
+    required: False
+  max_fail_percentage:
+    description:
+      - The percentage of failed servers in a wave tolerated before the remaining waves are aborted when
+        batch_size is set. The task fails if any server failed.
+    default: 0
+    required: False
+  install_marker:
+    description:
+      - Where to record the packages applied to the servers. With state_file, a server on which the
+        package was already installed with the same package_params is skipped. Only the installations
+        that were waited for and succeeded are recorded.
+    default: none
+    choices: ['none', 'state_file']
+    required: False
+  marker_file:
+    description:
+      - The path of the state file used when install_marker is state_file.
+    default: ~/.ansible/tmp/clc_blueprint_package_markers.json
+    required: False
 requirements:
     - python = 2.7
     - requests >= 2.5.0
@@ -85,6 +121,24 @@ EXAMPLES = '''
             - UC1TEST-SERVER2
         package_id: 77abb844-579d-478d-3955-c69ab4a7ba1a
         package_params: {}
+
+- name: Roll out a package 50 servers at a time
+      clc_blueprint_package:
+        server_ids: "{{ agent_server_ids }}"
+        package_id: 77abb844-579d-478d-3955-c69ab4a7ba1a
+        parallelism: 25
+        batch_size: 50
+        max_fail_percentage: 10
+
+- name: Deploy package once per server and parameter set
+      clc_blueprint_package:
+        server_ids:
+            - UC1TEST-SERVER1
+            - UC1TEST-SERVER2
+        package_id: 77abb844-579d-478d-3955-c69ab4a7ba1a
+        package_params:
+            version: 1.2.0
+        install_marker: state_file
 '''
 
 RETURN = '''
@@ -102,11 +156,26 @@ server_ids:
             "UC1TEST-SERVER1",
             "UC1TEST-SERVER2"
         ]
+server_results:
+    description: The result of the package installation on each server, keyed by server id. The status is
+                 submitted, succeeded, failed, aborted or skipped.
+    returned: success
+    type: dict
+    sample:
+        {
+            "UC1TEST-SERVER1": {"status": "succeeded"},
+            "UC1TEST-SERVER2": {"status": "failed", "msg": "Unable to process package install request"}
+        }
 '''
 
 __version__ = '${version}'
 
+import hashlib
+import tempfile
+import threading
+import time
 from distutils.version import LooseVersion
+from multiprocessing.pool import ThreadPool
 
 try:
     import requests
@@ -129,6 +198,131 @@ else:
     CLC_FOUND = True
 
 
+class ClcTaskFailure(Exception):
+    """
+    Raised in place of fail_json while a server is handled on a worker thread
+    """
+    pass
+
+
+class ClcWorkerModule(object):
+    """
+    Wraps the AnsibleModule used by worker threads, so a failure is raised to the worker
+    instead of exiting the module from a thread
+    """
+
+    def __init__(self, module):
+        self._module = module
+
+    def __getattr__(self, name):
+        return getattr(self._module, name)
+
+    def fail_json(self, **kwargs):
+        raise ClcTaskFailure(kwargs.get('msg'))
+
+
+class ClcTokenBucket(object):
+    """
+    Paces the requests submitted by the worker threads to a steady rate, allowing short bursts
+    """
+
+    def __init__(self, rate):
+        self.rate = float(rate or 0)
+        self.capacity = max(1.0, self.rate)
+        self._tokens = self.capacity
+        self._updated = time.time()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Blocks until a request may be submitted
+        :return: none
+        """
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.time()
+                self._tokens = min(
+                    self.capacity,
+                    self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+
+
+class ClcPackageMarkerStore(object):
+    """
+    Local state file recording the package applied to the servers, keyed by server id and
+    package id, with a hash of the package parameters.
+    """
+
+    def __init__(self, path):
+        self.path = os.path.expanduser(path)
+        self.markers = self._load()
+
+    def _load(self):
+        """
+        Read the markers from the state file
+        :return: the dictionary of markers, empty when the file is missing or invalid
+        """
+        try:
+            with open(self.path) as marker_file:
+                markers = json.load(marker_file)
+        except (IOError, OSError, ValueError):
+            return {}
+        return markers if isinstance(markers, dict) else {}
+
+    @staticmethod
+    def get_params_hash(package_params):
+        """
+        Hash the package parameters, independently of the order of their keys
+        :param package_params: the package arguments
+        :return: the hex digest of the parameters
+        """
+        return hashlib.sha1(
+            json.dumps(package_params or {}, sort_keys=True)).hexdigest()
+
+    def is_applied(self, server_id, package_id, params_hash):
+        """
+        Check if the package was applied to a server with the same parameters
+        :param server_id: the CLC server id
+        :param package_id: the blueprint package id
+        :param params_hash: the hash of the package arguments
+        :return: True if the marker exists
+        """
+        return self.markers.get(server_id, {}).get(package_id) == params_hash
+
+    def mark(self, server_id, package_id, params_hash):
+        """
+        Record that the package was applied to a server
+        :param server_id: the CLC server id
+        :param package_id: the blueprint package id
+        :param params_hash: the hash of the package arguments
+        :return: none
+        """
+        self.markers.setdefault(server_id, {})[package_id] = params_hash
+
+    def save(self):
+        """
+        Write the markers to the state file. Failures to write the file are ignored, the
+        servers are then installed again on the next run.
+        :return: none
+        """
+        try:
+            if not os.path.isdir(os.path.dirname(self.path)):
+                os.makedirs(os.path.dirname(self.path))
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path))
+            with os.fdopen(fd, 'w') as marker_file:
+                json.dump(self.markers, marker_file)
+            os.rename(tmp_path, self.path)
+        except (IOError, OSError):
+            pass
+
+
 class ClcBlueprintPackage(object):
 
     clc = clc_sdk
@@ -139,6 +333,7 @@ class ClcBlueprintPackage(object):
         Construct module
         """
         self.module = module
+        self.server_results = {}
         if not CLC_FOUND:
             self.module.fail_json(
                 msg='clc-python-sdk required for this module')
@@ -169,7 +364,10 @@ class ClcBlueprintPackage(object):
             changed, changed_server_ids, request_list = self.ensure_package_installed(
                 server_ids, package_id, package_params)
             self._wait_for_requests_to_complete(request_list)
-        self.module.exit_json(changed=changed, server_ids=changed_server_ids)
+        self.module.exit_json(
+            changed=changed,
+            server_ids=changed_server_ids,
+            server_results=self.server_results)
 
     @staticmethod
     def define_argument_spec():
@@ -183,6 +381,12 @@ class ClcBlueprintPackage(object):
             package_id=dict(required=True),
             package_params=dict(type='dict', default={}),
             wait=dict(default=True),
+            parallelism=dict(type='int', default=10),
+            submission_rate=dict(type='float', default=5),
+            batch_size=dict(type='int', default=None),
+            max_fail_percentage=dict(type='int', default=0),
+            install_marker=dict(default='none', choices=['none', 'state_file']),
+            marker_file=dict(default='~/.ansible/tmp/clc_blueprint_package_markers.json'),
             state=dict(default='present', choices=['present'])
         )
         return argument_spec
@@ -196,22 +400,174 @@ class ClcBlueprintPackage(object):
         :return: (changed, server_ids, request_list)
                     changed: A flag indicating if a change was made
                     server_ids: The list of servers modified
-                    request_list: The list of request objects from clc-sdk
+                    request_list: The list of request objects from clc-sdk that were not waited for
         """
         changed = False
         request_list = []
         servers = self._get_servers_from_clc(
             server_ids,
             'Failed to get servers from CLC')
-        for server in servers:
+        servers = list(servers or [])
+        marker_store = self._get_marker_store()
+        params_hash = ClcPackageMarkerStore.get_params_hash(package_params)
+        if marker_store:
+            applied = [server for server in servers
+                       if marker_store.is_applied(server.id, package_id, params_hash)]
+            for server in applied:
+                self.server_results[server.id] = {'status': 'skipped'}
+            servers = [server for server in servers if server not in applied]
+        if servers:
+            changed = True
             if not self.module.check_mode:
-                request = self.clc_install_package(
-                    server,
+                request_list = self._install_package_in_batches(
+                    servers,
                     package_id,
-                    package_params)
-                request_list.append(request)
-            changed = True
-        return changed, server_ids, request_list
+                    package_params,
+                    marker_store)
+        return changed, [server.id for server in servers], request_list
+
+    def _get_marker_store(self):
+        """
+        Open the store of the install markers if install_marker is enabled
+        :return: the ClcPackageMarkerStore, or None
+        """
+        p = self.module.params
+        if p.get('install_marker') != 'state_file':
+            return None
+        return ClcPackageMarkerStore(
+            p.get('marker_file') or '~/.ansible/tmp/clc_blueprint_package_markers.json')
+
+    def _save_install_markers(self, marker_store, package_id, package_params):
+        """
+        Record the package on the servers where its installation succeeded
+        :param marker_store: the ClcPackageMarkerStore, or None
+        :param package_id: the blueprint package id
+        :param package_params: the package arguments
+        :return: none
+        """
+        if not marker_store:
+            return
+        params_hash = ClcPackageMarkerStore.get_params_hash(package_params)
+        for server_id, result in self.server_results.items():
+            if result['status'] == 'succeeded':
+                marker_store.mark(server_id, package_id, params_hash)
+        marker_store.save()
+
+    def _install_package_in_batches(self, servers, package_id, package_params, marker_store=None):
+        """
+        Install the package in waves of batch_size servers. The requests of a wave are waited for
+        before the next wave starts, and the remaining waves are aborted once the failed servers of
+        a wave exceed max_fail_percentage. Without batch_size all the servers form a single wave,
+        which is waited for only if the wait argument is True.
+        :param servers: the list of CLC server objects
+        :param package_id: the blueprint package id
+        :param package_params: the package arguments
+        :param marker_store: the ClcPackageMarkerStore recording the succeeded installations, or None
+        :return: the list of request objects that were not waited for
+        """
+        p = self.module.params
+        rolling = bool(p.get('batch_size'))
+        batch_size = p.get('batch_size') or len(servers)
+        max_fail_percentage = p.get('max_fail_percentage') or 0
+        throttle = ClcTokenBucket(p.get('submission_rate'))
+        request_list = []
+        errors = []
+        if batch_size < 1:
+            return self.module.fail_json(
+                msg='batch_size must be a positive number: {0}'.format(batch_size))
+        for start in range(0, len(servers), batch_size):
+            wave = self._install_package_wave(
+                servers[start:start + batch_size], package_id, package_params, throttle)
+            if rolling or p.get('wait'):
+                self._wait_for_wave(wave)
+            else:
+                request_list.extend([result['request'] for result in wave if result['request']])
+            wave_errors = [result['error'] for result in wave if result['error']]
+            errors.extend(wave_errors)
+            for result in wave:
+                self.server_results[result['server'].id] = self._get_server_result(result)
+
+            remaining = servers[start + batch_size:]
+            if rolling and remaining and \
+                    len(wave_errors) * 100.0 / len(wave) > max_fail_percentage:
+                for server in remaining:
+                    self.server_results[server.id] = {'status': 'aborted'}
+                errors.append('Aborted the installation on the {0} remaining servers.'.format(len(remaining)))
+                break
+        self._save_install_markers(marker_store, package_id, package_params)
+        if errors:
+            return self.module.fail_json(
+                msg='Unable to install package : {0}. {1}'.format(package_id, ' '.join(errors)),
+                server_results=self.server_results)
+        return request_list
+
+    def _install_package_wave(self, servers, package_id, package_params, throttle):
+        """
+        Submit the package execution of a wave of servers concurrently
+        :param servers: the list of CLC server objects
+        :param package_id: the blueprint package id
+        :param package_params: the package arguments
+        :param throttle: the ClcTokenBucket pacing the submissions
+        :return: the list of server results, in the same order as servers
+        """
+        module = self.module
+        self.module = ClcWorkerModule(module)
+        try:
+            return self._run_in_parallel(
+                lambda server: self._install_package_on_server(
+                    server, package_id, package_params, throttle),
+                servers,
+                module.params.get('parallelism'))
+        finally:
+            self.module = module
+
+    def _install_package_on_server(self, server, package_id, package_params, throttle):
+        """
+        Submit the package execution of a single server on a worker thread
+        :param server: the CLC server object
+        :param package_id: the blueprint package id
+        :param package_params: the package arguments
+        :param throttle: the ClcTokenBucket pacing the submissions
+        :return: dictionary with the server, the request, the completion state and the error
+        """
+        result = {'server': server, 'request': None, 'completed': False, 'error': None}
+        try:
+            throttle.acquire()
+            result['request'] = self.clc_install_package(server, package_id, package_params)
+        except ClcTaskFailure as ex:
+            result['error'] = str(ex)
+        return result
+
+    def _wait_for_wave(self, results):
+        """
+        Wait concurrently for the requests of a wave of servers, and record the servers
+        whose request failed
+        :param results: the list of server results of the wave
+        :return: none
+        """
+        pending = [result for result in results if result['request']]
+        succeeded = self._run_in_parallel(
+            self._wait_for_request,
+            [result['request'] for result in pending],
+            self.module.params.get('parallelism'))
+        for result, request_succeeded in zip(pending, succeeded):
+            result['completed'] = True
+            if not request_succeeded:
+                result['error'] = 'Unable to process package install request for server : {0}.'.format(
+                    result['server'].id)
+
+    @staticmethod
+    def _get_server_result(result):
+        """
+        Build the entry of a server in the server_results output
+        :param result: the server result of a wave
+        :return: dictionary with the status and, for a failure, the message
+        """
+        if result['error']:
+            return {'status': 'failed', 'msg': result['error']}
+        if result['completed']:
+            return {'status': 'succeeded'}
+        return {'status': 'submitted'}
 
     def clc_install_package(self, server, package_id, package_params):
         """
@@ -244,12 +600,43 @@ class ClcBlueprintPackage(object):
         """
         if not self.module.params['wait']:
             return
-        for request in request_lst:
-            request.WaitUntilComplete()
-            for request_details in request.requests:
-                if request_details.Status() != 'succeeded':
-                    self.module.fail_json(
-                        msg='Unable to process package install request')
+        succeeded = self._run_in_parallel(
+            self._wait_for_request,
+            request_lst,
+            self.module.params.get('parallelism'))
+        if not all(succeeded):
+            self.module.fail_json(
+                msg='Unable to process package install request')
+
+    @staticmethod
+    def _wait_for_request(request):
+        """
+        Waits until a single CLC request is complete on a worker thread
+        :param request: the CLC request object
+        :return: True if every request detail succeeded
+        """
+        request.WaitUntilComplete()
+        return all(request_details.Status() == 'succeeded'
+                   for request_details in request.requests)
+
+    @staticmethod
+    def _run_in_parallel(func, items, parallelism):
+        """
+        Calls func for every item on a bounded pool of threads
+        :param func: the function to call with each item
+        :param items: the list of items to process
+        :param parallelism: the maximum number of concurrent calls
+        :return: the list of results, in the same order as items
+        """
+        items = list(items)
+        if not parallelism or parallelism < 2 or len(items) < 2:
+            return [func(item) for item in items]
+        pool = ThreadPool(min(parallelism, len(items)))
+        try:
+            return pool.map(func, items)
+        finally:
+            pool.close()
+            pool.join()
 
     def _get_servers_from_clc(self, server_list, message):
         """
@@ -89,6 +89,27 @@ options:
     default: True
     required: False
     choices: [True, False]
+  policies:
+    description:
+      - The complete list of firewall policies that should exist for the source account alias and location.
+        Each entry is a dictionary accepting the keys source, destination, ports, destination_account_alias,
+        enabled and firewall_policy_id. Entries without a firewall_policy_id are matched against the existing
+        policies by destination account, source and destination. This is mutually exclusive with
+        firewall_policy_id, source, destination and ports.
+    default: None
+    required: False
+  prune:
+    description:
+      - Whether to delete the existing firewall policies that are not listed in policies.
+    default: False
+    required: False
+    choices: [True, False]
+  parallelism:
+    description:
+      - The maximum number of firewall policy changes to submit to the CLC API at the same time
+        when policies is set.
+    default: 10
+    required: False
 requirements:
     - python = 2.7
     - requests >= 2.5.0
@@ -135,6 +156,28 @@ EXAMPLES = '''
         location: VA1
         state: absent
         firewall_policy_id: 'c62105233d7a4231bd2e91b9c791e43e1'
+
+---
+- name: Manage every Firewall Policy of a datacenter
+  hosts: localhost
+  gather_facts: False
+  connection: local
+  tasks:
+    - name: Ensure exactly these Firewall Policies exist at CenturyLink Cloud
+      clc_firewall_policy:
+        source_account_alias: WFAD
+        location: VA1
+        state: present
+        prune: True
+        policies:
+          - source: ['10.128.216.0/24']
+            destination: ['10.122.124.0/24']
+            ports: ['TCP/80', 'TCP/443']
+            destination_account_alias: WFAD
+          - source: ['10.128.216.0/24']
+            destination: ['10.122.125.0/24']
+            ports: ['any']
+            destination_account_alias: WFAD
 '''
 
 RETURN = '''
@@ -181,6 +224,26 @@ firewall_policy:
            ],
            "status":"active"
         }
+firewall_policies:
+    description: The change report of every firewall policy handled when policies is set
+    returned: success, when policies is set
+    type: list
+    sample:
+        [
+           {
+              "action":"create",
+              "firewall_policy_id":"fc36f1bfd47242e488a9c44346438c05",
+              "firewall_policy":{
+                 "destination":["10.122.124.0/24"],
+                 "destinationAccount":"wfad",
+                 "enabled":true,
+                 "id":"fc36f1bfd47242e488a9c44346438c05",
+                 "ports":["tcp/80", "tcp/443"],
+                 "source":["10.128.216.0/24"],
+                 "status":"active"
+              }
+           }
+        ]
 '''
 
 __version__ = '${version}'
@@ -188,8 +251,11 @@ __version__ = '${version}'
 from future import standard_library
 standard_library.install_aliases()
 import urllib.parse
+import socket
+import struct
 from time import sleep
 from distutils.version import LooseVersion
+from multiprocessing.pool import ThreadPool
 
 try:
     import requests
@@ -250,7 +316,10 @@ class ClcFirewallPolicy(object):
             destination=dict(defualt=None, type='list'),
             wait=dict(default=True),
             state=dict(default='present', choices=['present', 'absent']),
-            enabled=dict(defualt=True, choices=[True, False])
+            enabled=dict(defualt=True, choices=[True, False]),
+            policies=dict(default=None, type='list'),
+            prune=dict(default=False, type='bool'),
+            parallelism=dict(default=10, type='int')
         )
         return argument_spec
 
@@ -287,6 +356,18 @@ class ClcFirewallPolicy(object):
 
         self._set_clc_credentials_from_env()
 
+        policies = self.module.params.get('policies')
+        if policies is not None:
+            if firewall_policy_id or source or destination or ports:
+                return self.module.fail_json(
+                    msg='policies is mutually exclusive with firewall_policy_id, '
+                        'source, destination and ports')
+            changed, firewall_policies = self._ensure_firewall_policy_set(
+                source_account_alias, location, policies)
+            return self.module.exit_json(
+                changed=changed,
+                firewall_policies=firewall_policies)
+
         if state == 'absent':
             changed, firewall_policy_id, firewall_policy = self._ensure_firewall_policy_is_absent(
                 source_account_alias, location, self.firewall_dict)
@@ -420,6 +501,213 @@ class ClcFirewallPolicy(object):
             changed = True
         return changed, firewall_policy_id, response
 
+    def _ensure_firewall_policy_set(
+            self,
+            source_account_alias,
+            location,
+            policies):
+        """
+        Ensures that the firewall policies of a datacenter match the given list of policies
+        :param source_account_alias: the source account alias for the firewall policies
+        :param location: datacenter of the firewall policies
+        :param policies: the list of desired firewall policy dictionaries
+        :return: (changed, firewall_policies)
+            changed: flag for if a change occurred
+            firewall_policies: the change report for every firewall policy handled
+        """
+        state = self.module.params.get('state')
+        prune = self.module.params.get('prune')
+        firewall_dicts = self._build_firewall_policy_dicts(
+            source_account_alias, policies)
+        existing_policies = self._get_firewall_policies(
+            source_account_alias, location)
+        changes = self._plan_firewall_policy_set(
+            firewall_dicts, existing_policies, state, prune)
+        pending = [change for change in changes
+                   if change['action'] != 'unchanged']
+
+        if pending and not self.module.check_mode:
+            self._run_in_parallel(
+                lambda change: self._apply_firewall_policy_change(
+                    source_account_alias, location, change),
+                pending,
+                self.module.params.get('parallelism'))
+            errors = [change['error'] for change in pending if change.get('error')]
+            if errors:
+                return self.module.fail_json(
+                    msg='Unable to apply the firewall policies. {0}'.format(
+                        ' '.join(errors)),
+                    firewall_policies=self._get_firewall_policy_set_report(changes))
+            self._wait_for_policy_set_to_complete(
+                source_account_alias, location, pending)
+        return len(pending) > 0, self._get_firewall_policy_set_report(changes)
+
+    def _build_firewall_policy_dicts(self, source_account_alias, policies):
+        """
+        Validates the desired firewall policies and converts them to firewall policy dictionaries
+        :param source_account_alias: the source account alias for the firewall policies
+        :param policies: the list of desired firewall policy dictionaries
+        :return: the list of firewall policy dictionaries
+        """
+        firewall_dicts = []
+        default_destination_account_alias = self.module.params.get(
+            'destination_account_alias') or source_account_alias
+        for policy in policies:
+            if not isinstance(policy, dict):
+                return self.module.fail_json(
+                    msg='Each entry of policies must be a dictionary: {0}'.format(policy))
+            firewall_dict = {
+                'firewall_policy_id': policy.get('firewall_policy_id'),
+                'destination_account_alias': policy.get(
+                    'destination_account_alias') or default_destination_account_alias,
+                'source': policy.get('source'),
+                'destination': policy.get('destination'),
+                'ports': policy.get('ports'),
+                'enabled': policy.get('enabled', True)}
+            for key in ('source', 'destination', 'ports'):
+                if firewall_dict[key] and not isinstance(firewall_dict[key], list):
+                    firewall_dict[key] = [firewall_dict[key]]
+                if not firewall_dict[key] and self.module.params.get(
+                        'state') == 'present':
+                    return self.module.fail_json(
+                        msg='{0} is required for every entry of policies: {1}'.format(
+                            key, policy))
+            firewall_dicts.append(firewall_dict)
+        return firewall_dicts
+
+    def _plan_firewall_policy_set(
+            self,
+            firewall_dicts,
+            existing_policies,
+            state,
+            prune):
+        """
+        Computes the creates, updates and deletes needed to reach the desired firewall policies
+        :param firewall_dicts: the list of desired firewall policy dictionaries
+        :param existing_policies: the list of firewall policies returned by the CLC API
+        :param state: the desired state of the listed firewall policies
+        :param prune: whether to delete the existing policies that are not listed
+        :return: the list of changes, one dictionary per firewall policy
+        """
+        changes = []
+        unmatched = dict((policy.get('id'), policy)
+                         for policy in existing_policies)
+        policy_ids_by_key = {}
+        for policy in existing_policies:
+            key = self._get_firewall_policy_key(
+                policy.get('destinationAccount'),
+                policy.get('source'),
+                policy.get('destination'))
+            policy_ids_by_key.setdefault(key, []).append(policy.get('id'))
+
+        for firewall_dict in firewall_dicts:
+            policy_id = firewall_dict.get('firewall_policy_id')
+            if policy_id:
+                if policy_id not in unmatched:
+                    return self.module.fail_json(
+                        msg='Unable to find the firewall policy id : {0}'.format(
+                            policy_id))
+            else:
+                key = self._get_firewall_policy_key(
+                    firewall_dict.get('destination_account_alias'),
+                    firewall_dict.get('source'),
+                    firewall_dict.get('destination'))
+                policy_id = next(
+                    (candidate for candidate in policy_ids_by_key.get(key, [])
+                     if candidate in unmatched), None)
+            current = unmatched.pop(policy_id, None)
+
+            if state == 'absent':
+                action = 'delete' if current else 'unchanged'
+            elif not current:
+                action = 'create'
+            elif self._compare_get_request_with_dict(current, firewall_dict):
+                action = 'update'
+            else:
+                action = 'unchanged'
+            changes.append({
+                'action': action,
+                'firewall_policy_id': policy_id,
+                'firewall_policy': current,
+                'firewall_dict': firewall_dict})
+
+        if prune and state == 'present':
+            for policy_id in sorted(unmatched):
+                changes.append({
+                    'action': 'delete',
+                    'firewall_policy_id': policy_id,
+                    'firewall_policy': unmatched[policy_id],
+                    'firewall_dict': None})
+        return changes
+
+    @staticmethod
+    def _get_firewall_policy_key(destination_account_alias, source, destination):
+        """
+        Builds the key used to match a desired firewall policy with an existing one
+        :param destination_account_alias: the destination account alias of the policy
+        :param source: the list of source addresses of the policy
+        :param destination: the list of destination addresses of the policy
+        :return: a hashable key identifying the policy
+        """
+        return (str(destination_account_alias).lower(),
+                ClcFirewallPolicy._normalize_addresses(source or []),
+                ClcFirewallPolicy._normalize_addresses(destination or []))
+
+    def _apply_firewall_policy_change(
+            self,
+            source_account_alias,
+            location,
+            change):
+        """
+        Submits a single planned firewall policy change to the CLC API.
+        Failures are recorded on the change instead of failing the module,
+        as this runs on a worker thread.
+        :param source_account_alias: the source account alias for the firewall policy
+        :param location: datacenter of the firewall policy
+        :param change: the planned change dictionary
+        :return: the change dictionary, updated with the policy id or the error
+        """
+        action = change['action']
+        firewall_dict = change.get('firewall_dict')
+        url = '/v2-experimental/firewallPolicies/%s/%s' % (
+            source_account_alias, location)
+        try:
+            if action == 'create':
+                response = self.clc.v2.API.Call('POST', url, {
+                    'destinationAccount': firewall_dict.get('destination_account_alias'),
+                    'source': firewall_dict.get('source'),
+                    'destination': firewall_dict.get('destination'),
+                    'ports': firewall_dict.get('ports')})
+                change['firewall_policy_id'] = self._get_policy_id_from_response(
+                    response)
+            elif action == 'update':
+                self.clc.v2.API.Call(
+                    'PUT', '%s/%s' % (url, change['firewall_policy_id']), {
+                        'destinationAccount': firewall_dict.get('destination_account_alias'),
+                        'source': firewall_dict.get('source'),
+                        'destination': firewall_dict.get('destination'),
+                        'ports': firewall_dict.get('ports'),
+                        'enabled': firewall_dict.get('enabled')})
+            elif action == 'delete':
+                self.clc.v2.API.Call(
+                    'DELETE', '%s/%s' % (url, change['firewall_policy_id']))
+        except APIFailedResponse as e:
+            change['error'] = 'Unable to {0} the firewall policy {1}. {2}'.format(
+                action, change.get('firewall_policy_id') or '', str(e.response_text))
+        return change
+
+    @staticmethod
+    def _get_firewall_policy_set_report(changes):
+        """
+        Builds the module output for a list of firewall policy changes
+        :param changes: the list of change dictionaries
+        :return: the list of reported changes
+        """
+        return [{'action': change['action'],
+                 'firewall_policy_id': change.get('firewall_policy_id'),
+                 'firewall_policy': change.get('firewall_policy')}
+                for change in changes]
+
     def _create_firewall_policy(
             self,
             source_account_alias,
@@ -500,7 +788,9 @@ class ClcFirewallPolicy(object):
     @staticmethod
     def _compare_get_request_with_dict(response, firewall_dict):
         """
-        Helper method to compare the json response for getting the firewall policy with the request parameters
+        Helper method to compare the json response for getting the firewall policy with the request parameters.
+        Addresses and ports are compared as normalized sets so that ordering and formatting differences
+        are not reported as changes.
         :param response: response from the get method
         :param firewall_dict: dictionary of request parameters for firewall policy
         :return: changed: Boolean that returns true if there are differences between
@@ -524,14 +814,83 @@ class ClcFirewallPolicy(object):
         request_ports = firewall_dict.get('ports')
 
         if (
-            response_dest_account_alias and str(response_dest_account_alias) != str(request_dest_account_alias)) or (
+            response_dest_account_alias and str(response_dest_account_alias).lower() != str(
+                request_dest_account_alias).lower()) or (
             response_enabled != request_enabled) or (
-            response_source and response_source != request_source) or (
-                response_dest and response_dest != request_dest) or (
-                    response_ports and response_ports != request_ports):
+            response_source and ClcFirewallPolicy._normalize_addresses(response_source) !=
+                ClcFirewallPolicy._normalize_addresses(request_source)) or (
+                response_dest and ClcFirewallPolicy._normalize_addresses(response_dest) !=
+                ClcFirewallPolicy._normalize_addresses(request_dest)) or (
+                    response_ports and ClcFirewallPolicy._normalize_ports(response_ports) !=
+                    ClcFirewallPolicy._normalize_ports(request_ports)):
             changed = True
         return changed
 
+    @staticmethod
+    def _normalize_addresses(addresses):
+        """
+        Converts a list of addresses to a set of networks, so that 10.1.1.5/24 and 10.1.1.0/24 compare equal
+        :param addresses: the list of ip addresses or cidr blocks
+        :return: frozenset of (network, prefix length) tuples.  Values that can not be parsed are kept
+                 as lower case strings
+        """
+        if addresses is None:
+            return None
+        if not isinstance(addresses, list):
+            addresses = [addresses]
+        networks = set()
+        for address in addresses:
+            value = str(address).strip()
+            ip, _, prefix = value.partition('/')
+            try:
+                packed = struct.unpack('!I', socket.inet_aton(ip))[0]
+                prefix_len = int(prefix) if prefix else 32
+            except (socket.error, struct.error, ValueError):
+                networks.add(value.lower())
+                continue
+            if not 0 <= prefix_len <= 32:
+                networks.add(value.lower())
+                continue
+            mask = (0xffffffff << (32 - prefix_len)) & 0xffffffff
+            networks.add((packed & mask, prefix_len))
+        return frozenset(networks)
+
+    @staticmethod
+    def _normalize_ports(ports):
+        """
+        Converts a list of ports to a set of protocol and port ranges, so that TCP/80 and tcp/80
+        compare equal and overlapping or adjacent ranges are merged
+        :param ports: the list of ports, e.g. ['any', 'icmp', 'TCP/123', 'UDP/123-456']
+        :return: frozenset of (protocol, first port, last port) tuples.  Values without a port
+                 range, such as any and icmp, are kept as lower case strings
+        """
+        if ports is None:
+            return None
+        if not isinstance(ports, list):
+            ports = [ports]
+        result = set()
+        port_ranges = {}
+        for port in ports:
+            value = str(port).strip().lower()
+            protocol, _, port_range = value.partition('/')
+            start, _, end = port_range.partition('-')
+            try:
+                start, end = int(start), int(end or start)
+            except ValueError:
+                result.add(value)
+                continue
+            port_ranges.setdefault(protocol, []).append(
+                (min(start, end), max(start, end)))
+        for protocol, ranges in port_ranges.items():
+            merged = []
+            for start, end in sorted(ranges):
+                if merged and start <= merged[-1][1] + 1:
+                    merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+                else:
+                    merged.append((start, end))
+            result.update((protocol, start, end) for start, end in merged)
+        return frozenset(result)
+
     def _get_firewall_policy(
             self,
             source_account_alias,
@@ -556,6 +915,26 @@ class ClcFirewallPolicy(object):
                         firewall_policy_id, str(e.response_text)))
         return response
 
+    def _get_firewall_policies(
+            self,
+            source_account_alias,
+            location):
+        """
+        Get back every firewall policy of an account alias in a datacenter with a single call
+        :param source_account_alias: the source account alias for the firewall policies
+        :param location: datacenter of the firewall policies
+        :return: the list of firewall policies
+        """
+        try:
+            response = self.clc.v2.API.Call(
+                'GET', '/v2-experimental/firewallPolicies/%s/%s' %
+                (source_account_alias, location))
+        except APIFailedResponse as e:
+            return self.module.fail_json(
+                msg="Unable to fetch the firewall policies for location : {0}. {1}".format(
+                    location, str(e.response_text)))
+        return response or []
+
     def _wait_for_requests_to_complete(
             self,
             source_account_alias,
@@ -585,6 +964,62 @@ class ClcFirewallPolicy(object):
                 sleep(2)
         return firewall_policy
 
+    def _wait_for_policy_set_to_complete(
+            self,
+            source_account_alias,
+            location,
+            changes,
+            wait_limit=50):
+        """
+        Waits until the created and updated firewall policies are active if the wait argument is True.
+        Every check fetches the whole list of policies once instead of one call per policy.
+        :param source_account_alias: The source account alias for the firewall policies
+        :param location: datacenter of the firewall policies
+        :param changes: the list of applied change dictionaries
+        :param wait_limit: The number of times to check the status for completion
+        :return: none
+        """
+        wait = self.module.params.get('wait')
+        count = 0
+        pending_ids = set(change.get('firewall_policy_id') for change in changes
+                          if change['action'] in ('create', 'update'))
+        while wait and pending_ids:
+            count += 1
+            firewall_policies = dict(
+                (policy.get('id'), policy) for policy in self._get_firewall_policies(
+                    source_account_alias, location))
+            for change in changes:
+                if change.get('firewall_policy_id') in firewall_policies:
+                    change['firewall_policy'] = firewall_policies[
+                        change.get('firewall_policy_id')]
+            pending_ids = set(
+                policy_id for policy_id in pending_ids
+                if firewall_policies.get(policy_id, {}).get('status') != 'active')
+            if not pending_ids or count > wait_limit:
+                wait = False
+            else:
+                # wait for 2 seconds
+                sleep(2)
+
+    @staticmethod
+    def _run_in_parallel(func, items, parallelism):
+        """
+        Calls func for every item on a bounded pool of threads
+        :param func: the function to call with each item
+        :param items: the list of items to process
+        :param parallelism: the maximum number of concurrent calls
+        :return: the list of results, in the same order as items
+        """
+        items = list(items)
+        if not parallelism or parallelism < 2 or len(items) < 2:
+            return [func(item) for item in items]
+        pool = ThreadPool(min(parallelism, len(items)))
+        try:
+            return pool.map(func, items)
+        finally:
+            pool.close()
+            pool.join()
+
     @staticmethod
     def _set_user_agent(clc):
         if hasattr(clc, 'SetRequestsSession'):
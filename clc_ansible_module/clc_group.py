@@ -35,8 +35,14 @@ version_added: "2.0"
 options:
   name:
     description:
-      - The name of the Server Group
-    required: True
+      - The name of the Server Group. Required unless groups is provided.
+    required: False
+  groups:
+    description:
+      - A tree of groups to create under the parent group, given as nested dictionaries of group names or as
+        a list of slash separated paths (ex: 'env/app/tier'). The missing groups are created level by level,
+        the groups of a level at the same time. Only supported with state present.
+    required: False
   description:
     description:
       - A description of the Server Group
@@ -44,6 +50,8 @@ options:
   parent:
     description:
       - The parent group of the server group. If parent is not provided, it creates the group at top level.
+        The parent can be given by id, by name or by its full path (ex: 'Default Group/web') when several
+        groups share its name.
     required: False
   location:
     description:
@@ -61,6 +69,11 @@ options:
     choices: [ True, False ]
     default: True
     required: False
+  parallelism:
+    description:
+      - The maximum number of groups of a level created at the same time when groups is provided.
+    default: 10
+    required: False
 requirements:
     - python = 2.7
     - requests >= 2.5.0
@@ -76,6 +89,9 @@ notes:
           - CLC_V2_API_TOKEN, the API token generated from https://api.ctl.io/v2/authentication/login
           - CLC_ACCT_ALIAS, the account alias associated with the centurylink cloud
     - Users can set CLC_V2_API_URL to specify an endpoint for pointing to a different CLC environment.
+    - Users can set CLC_CACHE_TTL to the number of seconds the group tree of a datacenter is cached on disk
+      and shared with the other CLC modules. CLC_CACHE_DIR overrides the default cache directory
+      ~/.ansible/tmp/clc_cache.
 '''
 
 EXAMPLES = '''
@@ -98,6 +114,24 @@ EXAMPLES = '''
     - name: debug
       debug: var=clc
 
+# Create a hierarchy of Server Groups
+
+---
+- name: Create Server Group hierarchy
+  hosts: localhost
+  gather_facts: False
+  connection: local
+  tasks:
+    - name: Create / Verify the groups of an environment at CenturyLink Cloud
+      clc_group:
+        parent: 'Default Group'
+        groups:
+          - 'prod/billing/web'
+          - 'prod/billing/db'
+          - 'prod/crm/web'
+        state: present
+      register: clc
+
 # Delete a Server Group
 
 ---
@@ -124,6 +158,16 @@ changed:
     returned: success
     type: boolean
     sample: True
+groups:
+    description: The groups of the requested tree, with their path under the parent group, their id and whether
+                 they were created. The id is null for a group that would be created in check mode.
+    returned: success, when groups is provided
+    type: list
+    sample:
+        [
+            {"path": "prod", "id": "086ac1dfe0b6411989e8d1b77c4065f0", "changed": false},
+            {"path": "prod/billing", "id": "bb5f12a3c6044ae4ad0a03e73ae12cd1", "changed": true}
+        ]
 group:
     description: The group information
     returned: success
@@ -224,7 +268,11 @@ group:
 
 __version__ = '${version}'
 
+import re
+import tempfile
+import time
 from distutils.version import LooseVersion
+from multiprocessing.pool import ThreadPool
 
 try:
     import requests
@@ -247,6 +295,185 @@ else:
     CLC_FOUND = True
 
 
+class ClcCatalogCache(object):
+    """
+    On disk cache of CLC API listings, shared between tasks and between modules.
+    It is enabled by setting the CLC_CACHE_TTL environment variable to the number
+    of seconds a listing stays valid.  CLC_CACHE_DIR overrides the default cache
+    directory of ~/.ansible/tmp/clc_cache.
+    """
+
+    @staticmethod
+    def _get_ttl():
+        """
+        Read the cache time to live from the environment
+        :return: the time to live in seconds, 0 when caching is disabled
+        """
+        try:
+            return int(os.environ.get('CLC_CACHE_TTL', 0))
+        except ValueError:
+            return 0
+
+    @staticmethod
+    def _get_path(kind, key):
+        """
+        Build the path of the cache file for a listing
+        :param kind: the kind of listing, e.g. alert_policies
+        :param key: the key of the listing, e.g. the account alias
+        :return: the path of the cache file
+        """
+        cache_dir = os.environ.get('CLC_CACHE_DIR') or os.path.join(
+            os.path.expanduser('~'), '.ansible', 'tmp', 'clc_cache')
+        name = re.sub(r'[^\w.-]', '_', '%s_%s' % (kind, str(key).lower()))
+        return os.path.join(cache_dir, name + '.json')
+
+    @staticmethod
+    def get(kind, key):
+        """
+        Get a listing from the cache
+        :param kind: the kind of listing
+        :param key: the key of the listing
+        :return: the cached list of items, or None when missing or expired
+        """
+        ttl = ClcCatalogCache._get_ttl()
+        if ttl <= 0:
+            return None
+        try:
+            with open(ClcCatalogCache._get_path(kind, key)) as cache_file:
+                entry = json.load(cache_file)
+        except (IOError, OSError, ValueError):
+            return None
+        if time.time() - entry.get('timestamp', 0) > ttl:
+            return None
+        return entry.get('items')
+
+    @staticmethod
+    def put(kind, key, items):
+        """
+        Store a listing in the cache. Failures to write the cache are ignored.
+        :param kind: the kind of listing
+        :param key: the key of the listing
+        :param items: the list of items to store
+        :return: none
+        """
+        if ClcCatalogCache._get_ttl() <= 0:
+            return
+        path = ClcCatalogCache._get_path(kind, key)
+        try:
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, 'w') as cache_file:
+                json.dump({'timestamp': time.time(), 'items': items}, cache_file)
+            os.rename(tmp_path, path)
+        except (IOError, OSError):
+            pass
+
+    @staticmethod
+    def invalidate(kind, key):
+        """
+        Remove a listing from the cache
+        :param kind: the kind of listing
+        :param key: the key of the listing
+        :return: none
+        """
+        try:
+            os.remove(ClcCatalogCache._get_path(kind, key))
+        except (IOError, OSError):
+            pass
+
+
+class ClcGroupIndex(object):
+    """
+    Index of a tree of groups by full path, by id and by name. The path of a group is made of
+    the names of its ancestors below the top of the tree and its own name, joined with '/'.
+    Lookups are case insensitive unless case_sensitive is set, and a name shared by several
+    groups resolves to the shallowest of them, then to the first path in alphabetical order.
+    """
+
+    def __init__(self, case_sensitive=False):
+        self.case_sensitive = case_sensitive
+        self.by_path = {}
+        self.by_id = {}
+        self.paths_by_name = {}
+
+    def _key(self, value):
+        """
+        Normalize a path, id or name into an index key
+        :param value: the path, id or name
+        :return: the index key
+        """
+        key = '%s' % value
+        return key if self.case_sensitive else key.lower()
+
+    def add(self, path, group, parent):
+        """
+        Add a group to the index
+        :param path: the full path of the group
+        :param group: clc_sdk.Group - the group
+        :param parent: clc_sdk.Group - the parent group, None for the top of the tree
+        :return: none
+        """
+        entry = (group, parent)
+        path = self._key(path)
+        self.by_path[path] = entry
+        self.by_id[self._key(group.id)] = entry
+        self.paths_by_name.setdefault(self._key(group.name), []).append(path)
+
+    def add_tree(self, group, parent=None, path='', default_only=False):
+        """
+        Add a group and all its subgroups to the index. The subgroups get their paths below
+        path, so the root group of a datacenter is added with an empty path and its top level
+        groups are keyed by their own names.
+        :param group: clc_sdk.Group - the top group of the tree
+        :param parent: clc_sdk.Group - the parent of the top group
+        :param path: the full path of the top group
+        :param default_only: whether to skip the groups that are not of the default type
+        :return: none
+        """
+        self.add(path or '%s' % group.name, group, parent)
+        for subgroup in group.Subgroups().groups:
+            if default_only and subgroup.type != 'default':
+                continue
+            subgroup_path = '/'.join([name for name in (path, '%s' % subgroup.name) if name])
+            self.add_tree(subgroup, group, subgroup_path, default_only)
+
+    def find(self, key, parent=None):
+        """
+        Find the groups matching an id, a full path or a name
+        :param key: the id, full path or name of the group
+        :param parent: clc_sdk.Group - the parent the groups must have, if any
+        :return: the list of (group, parent) tuples, the best match first
+        """
+        key = self._key(key)
+        entries = []
+        if key in self.by_id:
+            entries.append(self.by_id[key])
+        if key in self.by_path:
+            entries.append(self.by_path[key])
+        for path in sorted(self.paths_by_name.get(key, []),
+                           key=lambda path: (path.count('/'), path)):
+            entries.append(self.by_path[path])
+        result = []
+        for entry in entries:
+            if entry in result:
+                continue
+            if parent is not None and (entry[1] is None or entry[1].id != parent.id):
+                continue
+            result.append(entry)
+        return result
+
+    def get(self, key, parent=None):
+        """
+        Get the best group matching an id, a full path or a name
+        :param key: the id, full path or name of the group
+        :param parent: clc_sdk.Group - the parent the group must have, if any
+        :return: the (group, parent) tuple, or None when no group matches
+        """
+        entries = self.find(key, parent)
+        return entries[0] if entries else None
+
+
 class ClcGroup(object):
 
     clc = None
@@ -258,7 +485,9 @@ class ClcGroup(object):
         """
         self.clc = clc_sdk
         self.module = module
-        self.group_dict = {}
+        self.group_index = ClcGroupIndex(case_sensitive=True)
+        self.alias = None
+        self.location = None
 
         if not CLC_FOUND:
             self.module.fail_json(
@@ -281,12 +510,21 @@ class ClcGroup(object):
         group_name = self.module.params.get('name')
         parent_name = self.module.params.get('parent')
         group_description = self.module.params.get('description')
+        group_tree = self.module.params.get('groups')
         state = self.module.params.get('state')
 
+        if group_tree is not None and state != 'present':
+            return self.module.fail_json(
+                msg='groups is only supported with state present')
+
         self._set_clc_credentials_from_env()
-        self.group_dict = self._get_group_tree_for_datacenter(
+        self.group_index = self._get_group_tree_for_datacenter(
             datacenter=location)
 
+        if group_tree is not None:
+            changed, groups = self._ensure_group_tree_is_present(
+                group_tree=group_tree, parent_name=parent_name, group_description=group_description)
+            return self.module.exit_json(changed=changed, groups=groups)
         if state == "absent":
             changed, group, requests = self._ensure_group_is_absent(
                 group_name=group_name, parent_name=parent_name)
@@ -308,12 +546,14 @@ class ClcGroup(object):
         :return: argument spec dictionary
         """
         argument_spec = dict(
-            name=dict(required=True),
+            name=dict(default=None),
+            groups=dict(default=None),
             description=dict(default=None),
             parent=dict(default=None),
             location=dict(default=None),
             state=dict(default='present', choices=['present', 'absent']),
-            wait=dict(type='bool', default=True))
+            wait=dict(type='bool', default=True),
+            parallelism=dict(type='int', default=10))
 
         return argument_spec
 
@@ -359,21 +599,23 @@ class ClcGroup(object):
         if self._group_exists(group_name=group_name, parent_name=parent_name):
             if not self.module.check_mode:
                 group.append(group_name)
-                result = self._delete_group(group_name)
+                result = self._delete_group(group_name, parent_name)
                 results.append(result)
             changed = True
         return changed, group, results
 
-    def _delete_group(self, group_name):
+    def _delete_group(self, group_name, parent_name=None):
         """
         Delete the provided server group
         :param group_name: string - the server group to delete
+        :param parent_name: string - the parent of the server group to delete
         :return: none
         """
         response = None
-        group, parent = self.group_dict.get(group_name)
+        group, parent = self._get_group_entry(group_name, parent_name)
         try:
             response = group.Delete()
+            ClcCatalogCache.invalidate('group_tree', self._get_group_tree_key())
         except CLCException as ex:
             self.module.fail_json(msg='Failed to delete group :{0}. {1}'.format(
                 group_name, ex.response_text
@@ -406,7 +648,7 @@ class ClcGroup(object):
             parent_name=parent)
 
         if parent_exists and child_exists:
-            group, parent = self.group_dict[group_name]
+            group = self._get_group_entry(group_name, parent)[0]
             changed = False
         elif parent_exists and not child_exists:
             if not self.module.check_mode:
@@ -423,6 +665,136 @@ class ClcGroup(object):
 
         return changed, group
 
+    def _ensure_group_tree_is_present(self, group_tree, parent_name, group_description):
+        """
+        Ensure a tree of groups exists under the parent group. The tree is diffed against the
+        fetched group tree, and the missing groups are created level by level, with the groups
+        of a level created concurrently.
+        :param group_tree: the nested dictionaries of group names, or the list of group paths
+        :param parent_name: the name of the parent group of the tree
+        :param group_description: a short description of the created groups
+        :return: (changed, groups) -
+            changed: Boolean- whether a change was made,
+            groups: the list of dictionaries with the path, the id and the changed flag of each group
+        """
+        assert self.root_group, "Implementation Error: Root Group not set"
+        parent = parent_name if parent_name is not None else self.root_group.name
+        if not self._group_exists(group_name=parent, parent_name=None):
+            return self.module.fail_json(
+                msg="parent group: " +
+                parent +
+                " does not exist")
+
+        paths = self._get_group_tree_paths(group_tree)
+        resolved = {(): self._get_group_entry(parent)[0]}
+        created_paths = set()
+        results = {}
+        for depth in range(1, max([len(path) for path in paths] or [0]) + 1):
+            missing = []
+            for path in [path for path in paths if len(path) == depth]:
+                entry = None
+                if path[:-1] not in created_paths:
+                    entry = self.group_index.get(path[-1], parent=resolved[path[:-1]])
+                if entry is None:
+                    missing.append(path)
+                else:
+                    resolved[path] = entry[0]
+                    results[path] = {'path': '/'.join(path), 'id': entry[0].id, 'changed': False}
+            if not missing:
+                continue
+            if self.module.check_mode:
+                groups = [None] * len(missing)
+            else:
+                groups = self._create_groups_concurrently(missing, resolved, group_description)
+            for path, group in zip(missing, groups):
+                resolved[path] = group
+                created_paths.add(path)
+                results[path] = {'path': '/'.join(path),
+                                 'id': group.id if group is not None else None,
+                                 'changed': True}
+        if created_paths and not self.module.check_mode:
+            ClcCatalogCache.invalidate('group_tree', self._get_group_tree_key())
+        return bool(created_paths), [results[path] for path in paths if path in results]
+
+    def _create_groups_concurrently(self, paths, resolved, description):
+        """
+        Create the groups of a level of the tree on a bounded pool of threads
+        :param paths: the list of group paths to create, all of the same depth
+        :param resolved: the dictionary of the existing or created groups by path
+        :param description: a short description of the groups
+        :return: the list of created clc_sdk.Group, in the order of paths
+        """
+        results = self._run_in_parallel(
+            lambda path: self._create_subgroup(resolved[path[:-1]], path[-1], description),
+            paths,
+            self.module.params.get('parallelism'))
+        errors = [error for group, error in results if error]
+        if errors:
+            return self.module.fail_json(msg=' '.join(errors))
+        return [group for group, error in results]
+
+    @staticmethod
+    def _create_subgroup(parent, name, description):
+        """
+        Create a group under a parent group on a worker thread
+        :param parent: clc_sdk.Group - the parent group
+        :param name: string - the name of the group to create
+        :param description: string - a text description of the group
+        :return: (group, error)
+        """
+        try:
+            return parent.Create(name=name, description=description), None
+        except CLCException as ex:
+            return None, 'Failed to create group :{0}. {1}'.format(name, ex.response_text)
+
+    @staticmethod
+    def _get_group_tree_paths(group_tree):
+        """
+        Flatten a tree of groups into the list of group paths, parents first
+        :param group_tree: the nested dictionaries of group names, or the list of slash separated
+                           paths and nested dictionaries
+        :return: the list of group paths, as tuples of group names
+        """
+        paths = []
+        if isinstance(group_tree, dict):
+            for name, children in sorted(group_tree.items()):
+                paths.append((name,))
+                paths.extend([(name,) + path for path in
+                              ClcGroup._get_group_tree_paths(children or {})])
+        else:
+            if isinstance(group_tree, basestring):
+                group_tree = [group_tree]
+            for item in group_tree or []:
+                if isinstance(item, dict):
+                    paths.extend(ClcGroup._get_group_tree_paths(item))
+                    continue
+                names = tuple(name.strip() for name in ('%s' % item).split('/') if name.strip())
+                paths.extend([names[:depth] for depth in range(1, len(names) + 1)])
+        result = []
+        for path in paths:
+            if path not in result:
+                result.append(path)
+        return result
+
+    @staticmethod
+    def _run_in_parallel(func, items, parallelism):
+        """
+        Calls func for every item on a bounded pool of threads
+        :param func: the function to call with each item
+        :param items: the list of items to process
+        :param parallelism: the maximum number of concurrent calls
+        :return: the list of results, in the same order as items
+        """
+        items = list(items)
+        if not parallelism or parallelism < 2 or len(items) < 2:
+            return [func(item) for item in items]
+        pool = ThreadPool(min(parallelism, len(items)))
+        try:
+            return pool.map(func, items)
+        finally:
+            pool.close()
+            pool.join()
+
     def _create_group(self, group, parent, description):
         """
         Create the provided server group
@@ -432,9 +804,10 @@ class ClcGroup(object):
         :return: clc_sdk.Group - the created group
         """
         response = None
-        (parent, grandparent) = self.group_dict[parent]
+        (parent, grandparent) = self._get_group_entry(parent)
         try:
             response = parent.Create(name=group, description=description)
+            ClcCatalogCache.invalidate('group_tree', self._get_group_tree_key())
         except CLCException as ex:
             self.module.fail_json(msg='Failed to create group :{0}. {1}'.format(
                 group, ex.response_text))
@@ -447,41 +820,63 @@ class ClcGroup(object):
         :param parent_name: string - the parent of group_name
         :return: boolean - whether the group exists
         """
-        result = False
-        if group_name in self.group_dict:
-            (group, parent) = self.group_dict[group_name]
-            if parent_name is None or parent_name == parent.name:
-                result = True
-        return result
+        return self._get_group_entry(group_name, parent_name) is not None
+
+    def _get_group_entry(self, group_name, parent_name=None):
+        """
+        Look up a group in the group index
+        :param group_name: string - the id, full path or name of the group
+        :param parent_name: string - the id, full path or name of the parent of group_name
+        :return: the (group, parent) tuple, or None when the group does not exist
+        """
+        parent = None
+        if parent_name is not None:
+            parent_entry = self.group_index.get(parent_name)
+            if parent_entry is None:
+                return None
+            parent = parent_entry[0]
+        return self.group_index.get(group_name, parent=parent)
 
     def _get_group_tree_for_datacenter(self, datacenter=None):
         """
-        Walk the tree of groups for a datacenter
+        Walk the tree of groups for a datacenter. The root group holds the whole tree, so it is
+        fetched once, or read from the shared catalog cache when available.
         :param datacenter: string - the datacenter to walk (ex: 'UC1')
-        :return: a dictionary of groups and parents
+        :return: the ClcGroupIndex of the groups
         """
-        self.root_group = self.clc.v2.Datacenter(
-            location=datacenter).RootGroup()
+        self.alias = self.clc.v2.Account.GetAlias()
+        self.location = datacenter or self.clc.v2.Account.GetLocation()
+        root_group_data = ClcCatalogCache.get('group_tree', self._get_group_tree_key())
+        if root_group_data is not None:
+            self.root_group = self.clc.v2.Group(
+                id=root_group_data.get('id'),
+                alias=self.alias,
+                group_obj=root_group_data)
+        else:
+            self.root_group = self.clc.v2.Datacenter(
+                location=datacenter).RootGroup()
+            ClcCatalogCache.put('group_tree', self._get_group_tree_key(), self.root_group.data)
         return self._walk_groups_recursive(
             parent_group=None,
             child_group=self.root_group)
 
+    def _get_group_tree_key(self):
+        """
+        Build the catalog cache key of the group tree of the datacenter
+        :return: the cache key, made of the account alias and the datacenter
+        """
+        return '{0}_{1}'.format(self.alias, self.location)
+
     def _walk_groups_recursive(self, parent_group, child_group):
         """
         Walk a parent-child tree of groups, starting with the provided child group
         :param parent_group: clc_sdk.Group - the parent group to start the walk
         :param child_group: clc_sdk.Group - the child group to start the walk
-        :return: a dictionary of groups and parents
+        :return: the ClcGroupIndex of the groups
         """
-        result = {str(child_group): (child_group, parent_group)}
-        groups = child_group.Subgroups().groups
-        if len(groups) > 0:
-            for group in groups:
-                if group.type != 'default':
-                    continue
-
-                result.update(self._walk_groups_recursive(child_group, group))
-        return result
+        group_index = ClcGroupIndex(case_sensitive=True)
+        group_index.add_tree(child_group, parent_group, default_only=True)
+        return group_index
 
     def _wait_for_requests_to_complete(self, requests_lst):
         """
@@ -515,6 +910,8 @@ def main():
     """
     module = AnsibleModule(
         argument_spec=ClcGroup._define_module_argument_spec(),
+        mutually_exclusive=[['name', 'groups']],
+        required_one_of=[['name', 'groups']],
         supports_check_mode=True)
 
     clc_group = ClcGroup(module)
@@ -37,6 +37,35 @@ options:
     description:
       - The group id to retrieve facts for.
     required: True
+  recursive:
+    description:
+      - Whether to extract the servers of all the subgroups of the group as well, so that the subgroups in the
+        groups fact get their own servers list.
+    required: False
+    default: False
+    choices: [False, True]
+  include_servers:
+    description:
+      - Whether to fetch the facts of the servers of the group, and of its subgroups when recursive is set, in
+        a server_details list next to the servers list. The servers are fetched at the same time over one
+        pooled connection to the CLC API, and get the same facts as with clc_server_fact.
+    required: False
+    default: False
+    choices: [False, True]
+  parallelism:
+    description:
+      - The maximum number of servers whose facts are fetched at the same time when include_servers is set.
+    required: False
+    default: 10
+  fields:
+    description:
+      - A list of dotted paths of the facts to return (ex: servers). The paths go through
+        lists, and the other facts are left out of the result to shrink it.
+    required: False
+  exclude:
+    description:
+      - A list of dotted paths of the facts to leave out of the result (ex: links).
+    required: False
 requirements:
     - python = 2.7
     - requests >= 2.5.0
@@ -51,6 +80,11 @@ notes:
           - CLC_V2_API_TOKEN, the API token generated from https://api.ctl.io/v2/authentication/login
           - CLC_ACCT_ALIAS, the account alias associated with the centurylink cloud
     - Users can set CLC_V2_API_URL to specify an endpoint for pointing to a different CLC environment.
+    - Users can set CLC_HTTP_CACHE_TTL to cache the API responses on disk and share them with the other CLC
+      modules. The responses with an ETag or a Last-Modified header are revalidated with a conditional GET, the
+      others are reused for CLC_HTTP_CACHE_TTL seconds and can be out of date for that long, so keep it short.
+      It is separate from CLC_CACHE_TTL. CLC_CACHE_DIR overrides the default cache directory
+      ~/.ansible/tmp/clc_cache. The server credentials are never cached.
 '''
 
 EXAMPLES = '''
@@ -60,6 +94,12 @@ EXAMPLES = '''
   clc_group_fact:
     group_id: 31d13f501459411ba59304f3d47486eb
 
+- name: Retrieve The Facts Of A Group Tree And Of All Its Servers
+  clc_group_fact:
+    group_id: 31d13f501459411ba59304f3d47486eb
+    recursive: true
+    include_servers: true
+
 '''
 
 RETURN = '''
@@ -69,7 +109,9 @@ changed:
     type: boolean
     sample: True
 server:
-    description: The retrieved group facts.
+    description: The retrieved group facts. With recursive, each subgroup in groups gets its servers list too.
+                 With include_servers, each of these groups gets a server_details list with the facts of its
+                 servers, in the order of servers.
     returned: success
     type: dict
     sample:
@@ -192,6 +234,11 @@ server:
 
 __version__ = '${version}'
 
+import hashlib
+import tempfile
+import time
+from multiprocessing.pool import ThreadPool
+
 try:
     import requests
 except ImportError:
@@ -200,6 +247,129 @@ else:
     REQUESTS_FOUND = True
 
 
+if REQUESTS_FOUND:
+    class ClcCachingSession(requests.Session):
+        """
+        Requests session with an on disk cache of the GET responses of the CLC API, shared between
+        tasks and between modules. A cached response with an ETag or a Last-Modified validator is
+        revalidated with a conditional GET and reused when the API answers 304 Not Modified, any
+        other cached response is reused for CLC_HTTP_CACHE_TTL seconds. The cache is enabled by
+        setting CLC_HTTP_CACHE_TTL, apart from the catalog caches enabled by CLC_CACHE_TTL, and
+        CLC_CACHE_DIR overrides the default cache directory of ~/.ansible/tmp/clc_cache.
+        The server credentials are never cached.
+        """
+
+        def request(self, method, url, params=None, headers=None, **kwargs):
+            ttl = ClcCachingSession._get_ttl()
+            if method.upper() != 'GET' or ttl <= 0 or not ClcCachingSession._is_cacheable(url):
+                return super(ClcCachingSession, self).request(
+                    method, url, params=params, headers=headers, **kwargs)
+
+            path = ClcCachingSession._get_path(url, params)
+            entry = ClcCachingSession._load(path)
+            headers = dict(headers or {})
+            if entry is not None:
+                if entry.get('etag'):
+                    headers['If-None-Match'] = entry['etag']
+                if entry.get('last_modified'):
+                    headers['If-Modified-Since'] = entry['last_modified']
+                if not entry.get('etag') and not entry.get('last_modified') and \
+                        time.time() - entry.get('timestamp', 0) <= ttl:
+                    return ClcCachingSession._build_response(url, entry)
+
+            response = super(ClcCachingSession, self).request(
+                method, url, params=params, headers=headers, **kwargs)
+            if response.status_code == 304 and entry is not None:
+                return ClcCachingSession._build_response(url, entry)
+            if response.status_code == 200:
+                ClcCachingSession._store(path, {
+                    'timestamp': time.time(),
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified'),
+                    'body': response.text})
+            return response
+
+        @staticmethod
+        def _get_ttl():
+            """
+            Read the cache time to live from the environment
+            :return: the time to live in seconds, 0 when caching is disabled
+            """
+            try:
+                return int(os.environ.get('CLC_HTTP_CACHE_TTL', 0))
+            except ValueError:
+                return 0
+
+        @staticmethod
+        def _is_cacheable(url):
+            """
+            Check whether the response of a url may be stored on disk
+            :param url: the url of the request
+            :return: False for the server credentials, True otherwise
+            """
+            return not url.split('?')[0].rstrip('/').endswith('/credentials')
+
+        @staticmethod
+        def _get_path(url, params):
+            """
+            Build the path of the cache file for a GET request
+            :param url: the url of the request
+            :param params: the query parameters of the request
+            :return: the path of the cache file
+            """
+            cache_dir = os.environ.get('CLC_CACHE_DIR') or os.path.join(
+                os.path.expanduser('~'), '.ansible', 'tmp', 'clc_cache')
+            key = json.dumps([url, params or {}], sort_keys=True)
+            return os.path.join(cache_dir, 'http_%s.json' % hashlib.sha1(key.encode('utf-8')).hexdigest())
+
+        @staticmethod
+        def _load(path):
+            """
+            Load a cached response
+            :param path: the path of the cache file
+            :return: the cached entry, or None when missing or unreadable
+            """
+            try:
+                with open(path) as cache_file:
+                    return json.load(cache_file)
+            except (IOError, OSError, ValueError):
+                return None
+
+        @staticmethod
+        def _store(path, entry):
+            """
+            Store a response in the cache. Failures to write the cache are ignored.
+            :param path: the path of the cache file
+            :param entry: the entry to store
+            :return: none
+            """
+            try:
+                if not os.path.isdir(os.path.dirname(path)):
+                    os.makedirs(os.path.dirname(path))
+                fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+                with os.fdopen(fd, 'w') as cache_file:
+                    json.dump(entry, cache_file)
+                os.rename(tmp_path, path)
+            except (IOError, OSError):
+                pass
+
+        @staticmethod
+        def _build_response(url, entry):
+            """
+            Build a response from a cached entry
+            :param url: the url of the request
+            :param entry: the cached entry
+            :return: the requests.Response
+            """
+            response = requests.models.Response()
+            response.status_code = 200
+            response.url = url
+            response.encoding = 'utf-8'
+            response.headers['Content-Type'] = 'application/json'
+            response._content = entry.get('body', '').encode('utf-8')
+            return response
+
+
 class ClcGroupFact(object):
 
     def __init__(self, module):
@@ -207,6 +377,7 @@ class ClcGroupFact(object):
         Construct module
         """
         self.module = module
+        self.session = None
 
         if not REQUESTS_FOUND:
             self.module.fail_json(
@@ -220,23 +391,35 @@ class ClcGroupFact(object):
         self._set_clc_credentials_from_env()
         group_id = self.module.params.get('group_id')
 
-        r = requests.get(self._get_endpoint(group_id), headers={
+        r = self._get_session().get(self._get_endpoint(group_id), headers={
             'Authorization': 'Bearer ' + self.v2_api_token
         })
 
         if r.status_code not in [200]:
-            self.module.fail_json(
+            return self.module.fail_json(
                 msg='Failed to retrieve group facts: %s' %
                 group_id)
 
         r = r.json()
-        servers = r['servers'] = []
+        groups = self._get_group_tree(r, self.module.params.get('recursive'))
+        for group in groups:
+            group['servers'] = [l['id'] for l in group.get('links', []) if 'server' == l['rel']]
 
-        for l in r['links']:
-            if 'server' == l['rel']:
-                servers.append(l['id'])
+        if self.module.params.get('include_servers'):
+            server_ids = [server_id for group in groups for server_id in group['servers']]
+            results = self._run_in_parallel(
+                self._get_server_facts,
+                server_ids,
+                self.module.params.get('parallelism'))
+            errors = [error for facts, error in results if error]
+            if errors:
+                return self.module.fail_json(msg=' '.join(errors))
+            server_facts = dict(zip(server_ids, [facts for facts, error in results]))
+            for group in groups:
+                group['server_details'] = [server_facts[server_id] for server_id in group['servers']]
 
-        self.module.exit_json(changed=False, group=r)
+        self.module.exit_json(changed=False, group=self._project_fields(
+            r, self.module.params.get('fields'), self.module.params.get('exclude')))
 
     @staticmethod
     def _define_module_argument_spec():
@@ -244,11 +427,151 @@ class ClcGroupFact(object):
         Define the argument spec for the ansible module
         :return: argument spec dictionary
         """
-        return {"argument_spec": dict(group_id=dict(required=True))}
+        return {"argument_spec": dict(
+            group_id=dict(required=True),
+            recursive=dict(type='bool', default=False),
+            include_servers=dict(type='bool', default=False),
+            parallelism=dict(type='int', default=10),
+            fields=dict(type='list', required=False),
+            exclude=dict(type='list', required=False))}
+
+    @staticmethod
+    def _get_group_tree(group, recursive):
+        """
+        Flatten a group document and the documents of its subgroups, parents first
+        :param group: the group document returned by the CLC API, with its subgroups nested in groups
+        :param recursive: whether to include the subgroups
+        :return: the list of group documents
+        """
+        groups = [group]
+        if recursive:
+            for subgroup in group.get('groups', []):
+                groups.extend(ClcGroupFact._get_group_tree(subgroup, recursive))
+        return groups
+
+    def _get_server_facts(self, server_id):
+        """
+        Fetch the facts of a server on a worker thread
+        :param server_id: the id of the server
+        :return: (facts, error)
+        """
+        try:
+            r = self._get_session().get(self._get_server_endpoint(server_id), headers={
+                'Authorization': 'Bearer ' + self.v2_api_token
+            })
+        except requests.exceptions.RequestException as ex:
+            return None, 'Failed to retrieve server facts: %s. %s' % (server_id, ex)
+
+        if r.status_code not in [200]:
+            return None, 'Failed to retrieve server facts: %s' % server_id
+
+        r = r.json()
+        if r['details']['memoryMB']:
+            r['details']['memory'] = int(r['details']['memoryMB'] / 1024)
+        if len(r['details']['ipAddresses']) > 0:
+            r['ipaddress'] = r['details']['ipAddresses'][0]['internal']
+            publicips = [a for a in r['details']['ipAddresses'] if 'public' in a]
+            if len(publicips) > 0:
+                r['publicip'] = publicips[0]
+
+        return r, None
+
+    def _get_session(self):
+        """
+        Get the requests session shared by the calls of the module, so that the calls to the
+        CLC API reuse a pool of connections sized for the parallelism of the module
+        :return: the requests.Session
+        """
+        if self.session is None:
+            pool_size = max(1, self.module.params.get('parallelism') or 1)
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=1, pool_maxsize=pool_size)
+            self.session = ClcCachingSession()
+            self.session.mount('https://', adapter)
+            self.session.mount('http://', adapter)
+        return self.session
+
+    @staticmethod
+    def _run_in_parallel(func, items, parallelism):
+        """
+        Calls func for every item on a bounded pool of threads
+        :param func: the function to call with each item
+        :param items: the list of items to process
+        :param parallelism: the maximum number of concurrent calls
+        :return: the list of results, in the same order as items
+        """
+        items = list(items)
+        if not parallelism or parallelism < 2 or len(items) < 2:
+            return [func(item) for item in items]
+        pool = ThreadPool(min(parallelism, len(items)))
+        try:
+            return pool.map(func, items)
+        finally:
+            pool.close()
+            pool.join()
 
     def _get_endpoint(self, group_id):
         return self.api_url + '/v2/groups/' + self.clc_alias + '/' + group_id
 
+    def _get_server_endpoint(self, server_id):
+        return self.api_url + '/v2/servers/' + self.clc_alias + '/' + server_id
+
+    @staticmethod
+    def _project_fields(document, fields=None, exclude=None):
+        """
+        Project a document returned by the CLC API on dotted paths. The paths go through lists,
+        so 'details.ipAddresses.internal' keeps the internal address of every ip address.
+        :param document: the dictionary or list to project
+        :param fields: the list of dotted paths to keep, None to keep the whole document
+        :param exclude: the list of dotted paths to remove
+        :return: the projected document
+        """
+        if fields:
+            document = ClcGroupFact._select_fields(document, [field.split('.') for field in fields])
+        for field in exclude or []:
+            ClcGroupFact._exclude_field(document, field.split('.'))
+        return document
+
+    @staticmethod
+    def _select_fields(document, paths):
+        """
+        Copy the parts of a document found at a list of paths
+        :param document: the dictionary or list to copy from
+        :param paths: the list of paths, as lists of keys
+        :return: the copy of the selected parts of the document
+        """
+        if isinstance(document, list):
+            return [ClcGroupFact._select_fields(item, paths) for item in document]
+        if not isinstance(document, dict):
+            return document
+        result = {}
+        for key in set([path[0] for path in paths]):
+            if key not in document:
+                continue
+            subpaths = [path[1:] for path in paths if path[0] == key]
+            if [] in subpaths:
+                result[key] = document[key]
+            else:
+                result[key] = ClcGroupFact._select_fields(document[key], subpaths)
+        return result
+
+    @staticmethod
+    def _exclude_field(document, path):
+        """
+        Remove the parts of a document found at a path
+        :param document: the dictionary or list to remove from
+        :param path: the path, as a list of keys
+        :return: none
+        """
+        if isinstance(document, list):
+            for item in document:
+                ClcGroupFact._exclude_field(item, path)
+        elif isinstance(document, dict) and path[0] in document:
+            if len(path) == 1:
+                del document[path[0]]
+            else:
+                ClcGroupFact._exclude_field(document[path[0]], path[1:])
+
     def _set_clc_credentials_from_env(self):
         """
         Set the CLC Credentials by reading environment variables
@@ -268,7 +591,7 @@ class ClcGroupFact(object):
 
         elif v2_api_username and v2_api_passwd:
 
-            r = requests.post(self.api_url + '/v2/authentication/login', json={
+            r = self._get_session().post(self.api_url + '/v2/authentication/login', json={
                 'username': v2_api_username,
                 'password': v2_api_passwd
             })
@@ -34,13 +34,25 @@ description:
 version_added: "2.0"
 options:
   name:
-    - The name of the loadbalancer to gather data
+    description:
+      - The name of the loadbalancer to gather data. When name is not provided, the facts of all the
+        loadbalancers of the location are returned, fetched at the same time.
+    required: False
   location:
     description:
       - The datacenter the loadbalancer is based
     required: True
     default: False
     example: UC1
+  alias:
+    description:
+      - The account alias of the loadbalancer
+    required: True
+  parallelism:
+    description:
+      - The maximum number of loadbalancers whose facts are fetched at the same time when name is not provided.
+    required: False
+    default: 10
 requirements:
   - python = 2.7
   - requests >= 2.5.0
@@ -54,6 +66,11 @@ notes:
       - CLC_V2_API_TOKEN: the API token generated from https://api.ctl.io/v2/authentication/login
       - CLC_ACCT_ALIAS: the account alias associated with CLC
   - Users can set CLC_V2_API_URL to specify an endpoint for pointing to a different CLC environment
+  - Users can set CLC_HTTP_CACHE_TTL to cache the API responses on disk and share them with the other CLC
+    modules. The responses with an ETag or a Last-Modified header are revalidated with a conditional GET, the
+    others are reused for CLC_HTTP_CACHE_TTL seconds and can be out of date for that long, so keep it short.
+    It is separate from CLC_CACHE_TTL. CLC_CACHE_DIR overrides the default cache directory
+    ~/.ansible/tmp/clc_cache. The server credentials are never cached.
 '''
 
 EXAMPLES = '''
@@ -65,6 +82,12 @@ EXAMPLES = '''
     location: UC1
     alias: WFTC
   register: loadbalancer
+
+- name: Retrieve the facts of all the loadbalancers of a location
+  clc_loadbalancer_fact:
+    location: UC1
+    alias: WFTC
+  register: loadbalancers
 '''
 
 RETURN = '''
@@ -73,9 +96,25 @@ changed:
   returned: success
   type: boolean
   sample: True
+loadbalancers:
+  description: The retrieved info of all the loadbalancers of the location, with their pools and nodes, keyed by name.
+               The loadbalancers that share their name with another one are keyed by id instead.
+  returned: success, when name is not provided
+  type: dict
+  sample:
+    "loadbalancers": {
+        "TEST": {
+            "description": "Test VIP",
+            "id": "d95075012d3b462fb711960b4cfa534a",
+            "ipAddress": "206.152.35.15",
+            "name": "TEST",
+            "pools": [],
+            "status": "enabled"
+        }
+    }
 loadbalancer:
   description: The retrieved loadbalancer info
-  returned: success
+  returned: success, when name is provided
   type: dict
   sample:
     "loadbalancer": {
@@ -151,7 +190,11 @@ loadbalancer:
 
 __version__ = '{version}'
 
+import hashlib
+import tempfile
+import time
 from distutils.version import LooseVersion
+from multiprocessing.pool import ThreadPool
 
 try:
     import requests
@@ -170,6 +213,129 @@ else:
     CLC_FOUND = True
 
 
+if REQUESTS_FOUND:
+    class ClcCachingSession(requests.Session):
+        """
+        Requests session with an on disk cache of the GET responses of the CLC API, shared between
+        tasks and between modules. A cached response with an ETag or a Last-Modified validator is
+        revalidated with a conditional GET and reused when the API answers 304 Not Modified, any
+        other cached response is reused for CLC_HTTP_CACHE_TTL seconds. The cache is enabled by
+        setting CLC_HTTP_CACHE_TTL, apart from the catalog caches enabled by CLC_CACHE_TTL, and
+        CLC_CACHE_DIR overrides the default cache directory of ~/.ansible/tmp/clc_cache.
+        The server credentials are never cached.
+        """
+
+        def request(self, method, url, params=None, headers=None, **kwargs):
+            ttl = ClcCachingSession._get_ttl()
+            if method.upper() != 'GET' or ttl <= 0 or not ClcCachingSession._is_cacheable(url):
+                return super(ClcCachingSession, self).request(
+                    method, url, params=params, headers=headers, **kwargs)
+
+            path = ClcCachingSession._get_path(url, params)
+            entry = ClcCachingSession._load(path)
+            headers = dict(headers or {})
+            if entry is not None:
+                if entry.get('etag'):
+                    headers['If-None-Match'] = entry['etag']
+                if entry.get('last_modified'):
+                    headers['If-Modified-Since'] = entry['last_modified']
+                if not entry.get('etag') and not entry.get('last_modified') and \
+                        time.time() - entry.get('timestamp', 0) <= ttl:
+                    return ClcCachingSession._build_response(url, entry)
+
+            response = super(ClcCachingSession, self).request(
+                method, url, params=params, headers=headers, **kwargs)
+            if response.status_code == 304 and entry is not None:
+                return ClcCachingSession._build_response(url, entry)
+            if response.status_code == 200:
+                ClcCachingSession._store(path, {
+                    'timestamp': time.time(),
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified'),
+                    'body': response.text})
+            return response
+
+        @staticmethod
+        def _get_ttl():
+            """
+            Read the cache time to live from the environment
+            :return: the time to live in seconds, 0 when caching is disabled
+            """
+            try:
+                return int(os.environ.get('CLC_HTTP_CACHE_TTL', 0))
+            except ValueError:
+                return 0
+
+        @staticmethod
+        def _is_cacheable(url):
+            """
+            Check whether the response of a url may be stored on disk
+            :param url: the url of the request
+            :return: False for the server credentials, True otherwise
+            """
+            return not url.split('?')[0].rstrip('/').endswith('/credentials')
+
+        @staticmethod
+        def _get_path(url, params):
+            """
+            Build the path of the cache file for a GET request
+            :param url: the url of the request
+            :param params: the query parameters of the request
+            :return: the path of the cache file
+            """
+            cache_dir = os.environ.get('CLC_CACHE_DIR') or os.path.join(
+                os.path.expanduser('~'), '.ansible', 'tmp', 'clc_cache')
+            key = json.dumps([url, params or {}], sort_keys=True)
+            return os.path.join(cache_dir, 'http_%s.json' % hashlib.sha1(key.encode('utf-8')).hexdigest())
+
+        @staticmethod
+        def _load(path):
+            """
+            Load a cached response
+            :param path: the path of the cache file
+            :return: the cached entry, or None when missing or unreadable
+            """
+            try:
+                with open(path) as cache_file:
+                    return json.load(cache_file)
+            except (IOError, OSError, ValueError):
+                return None
+
+        @staticmethod
+        def _store(path, entry):
+            """
+            Store a response in the cache. Failures to write the cache are ignored.
+            :param path: the path of the cache file
+            :param entry: the entry to store
+            :return: none
+            """
+            try:
+                if not os.path.isdir(os.path.dirname(path)):
+                    os.makedirs(os.path.dirname(path))
+                fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+                with os.fdopen(fd, 'w') as cache_file:
+                    json.dump(entry, cache_file)
+                os.rename(tmp_path, path)
+            except (IOError, OSError):
+                pass
+
+        @staticmethod
+        def _build_response(url, entry):
+            """
+            Build a response from a cached entry
+            :param url: the url of the request
+            :param entry: the cached entry
+            :return: the requests.Response
+            """
+            response = requests.models.Response()
+            response.status_code = 200
+            response.url = url
+            response.encoding = 'utf-8'
+            response.headers['Content-Type'] = 'application/json'
+            response._content = entry.get('body', '').encode('utf-8')
+            return response
+
+
 class ClcLoadbalancerFact(object):
 
     def __init__(self, module):
@@ -191,6 +357,17 @@ class ClcLoadbalancerFact(object):
             self.module.fail_json(
                 msg='requests library  version should be >= 2.5.0')
 
+        self._set_user_agent(self.clc)
+
+    @staticmethod
+    def _set_user_agent(clc):
+        if hasattr(clc, 'SetRequestsSession'):
+            agent_string = "ClcAnsibleModule/" + __version__
+            ses = ClcCachingSession()
+            ses.headers.update({"Api-Client": agent_string})
+            ses.headers['User-Agent'] += " " + agent_string
+            clc.SetRequestsSession(ses)
+
     def process_request(self):
         """
         Process the request - Main Code Path
@@ -206,6 +383,11 @@ class ClcLoadbalancerFact(object):
             alias=alias,
             location=location)
 
+        if not name:
+            return self.module.exit_json(
+                changed=False,
+                loadbalancers=self._get_all_loadbalancers(alias, location))
+
         try:
             result = self._get_endpoint(alias, location, name)
         except APIFailedResponse as e:
@@ -219,9 +401,10 @@ class ClcLoadbalancerFact(object):
         Define the argument spec for the ansible module
         :return: argument spec dictionaries
         """
-        return {"argument_spec": dict(name=dict(required=True),
+        return {"argument_spec": dict(name=dict(required=False),
                                       location=dict(required=True),
-                                      alias=dict(required=True))}
+                                      alias=dict(required=True),
+                                      parallelism=dict(type='int', default=10))}
 
     def _set_clc_credentials_from_env(self):
         """
@@ -280,6 +463,61 @@ class ClcLoadbalancerFact(object):
                 lb_id = lb.get('id')
         return lb_id
 
+    def _get_all_loadbalancers(self, alias, location):
+        """
+        Retrieve the facts of all the loadbalancers of a location on a bounded pool of threads
+        :param alias: Alias for account
+        :param location: Datacenter
+        :return: the dictionary of the loadbalancers, with their pools and nodes, keyed by name,
+                 or by id for the loadbalancers sharing their name with another one
+        """
+        loadbalancers = list(self.lb_dict or [])
+        results = self._run_in_parallel(
+            lambda lb: self._get_loadbalancer(alias, location, lb),
+            loadbalancers,
+            self.module.params.get('parallelism'))
+        errors = [error for loadbalancer, error in results if error]
+        if errors:
+            return self.module.fail_json(msg=' '.join(errors))
+        names = [loadbalancer.get('name') for loadbalancer, error in results]
+        return dict([(loadbalancer.get('id') if names.count(loadbalancer.get('name')) > 1
+                      else loadbalancer.get('name'), loadbalancer)
+                     for loadbalancer, error in results])
+
+    def _get_loadbalancer(self, alias, location, lb):
+        """
+        Retrieve the facts of a loadbalancer on a worker thread
+        :param alias: Alias for account
+        :param location: Datacenter
+        :param lb: the loadbalancer from the list of loadbalancers
+        :return: (loadbalancer, error)
+        """
+        try:
+            return self.clc.v2.API.Call(
+                'GET', '/v2/sharedLoadBalancers/%s/%s/%s' % (alias, location, lb.get('id'))), None
+        except APIFailedResponse as e:
+            return None, 'Unable to get information for load balancer {0} with account: {1} at location: {2}. {3}'.format(
+                lb.get('name'), alias, location, str(e.message))
+
+    @staticmethod
+    def _run_in_parallel(func, items, parallelism):
+        """
+        Calls func for every item on a bounded pool of threads
+        :param func: the function to call with each item
+        :param items: the list of items to process
+        :param parallelism: the maximum number of concurrent calls
+        :return: the list of results, in the same order as items
+        """
+        items = list(items)
+        if not parallelism or parallelism < 2 or len(items) < 2:
+            return [func(item) for item in items]
+        pool = ThreadPool(min(parallelism, len(items)))
+        try:
+            return pool.map(func, items)
+        finally:
+            pool.close()
+            pool.join()
+
     def _get_endpoint(self, alias, location, name):
         lb_id = self._get_loadbalancer_id(name=name)
         if not lb_id:
@@ -88,6 +88,24 @@ options:
     default: True
     required: False
     choices: [ True, False]
+  parallelism:
+    description:
+      - The maximum number of servers to modify at the same time.
+    default: 10
+    required: False
+  batch_size:
+    description:
+      - Modify the servers in waves of this many servers. Each wave is completed, and its
+        requests waited for, before the next wave starts, so wait must be true when it is set.
+        By default all the servers are modified in one wave.
+    default: None
+    required: False
+  max_failures:
+    description:
+      - The number of failed servers tolerated before the remaining waves are aborted when
+        batch_size is set. The task fails if any server failed.
+    default: 0
+    required: False
 requirements:
     - python = 2.7
     - requests >= 2.5.0
@@ -103,6 +121,9 @@ notes:
           - CLC_V2_API_TOKEN, the API token generated from https://api.ctl.io/v2/authentication/login
           - CLC_ACCT_ALIAS, the account alias associated with the centurylink cloud
     - Users can set CLC_V2_API_URL to specify an endpoint for pointing to a different CLC environment.
+    - Users can set CLC_CACHE_TTL to the number of seconds the policy and network lists of an account are cached on disk
+      and shared with the other CLC modules. CLC_CACHE_DIR overrides the default cache directory
+      ~/.ansible/tmp/clc_cache.
 '''
 
 EXAMPLES = '''
@@ -354,11 +375,35 @@ servers:
               "type":"standard"
            }
         ]
+plan:
+    description: The changes that would be made to every requested server, returned in check mode.
+                 A NIC change is reported when the server has, or lacks, an internal ip address
+                 on the additional_network.
+    returned: check mode
+    type: list
+    sample:
+        [
+            {
+                "id": "UC1TEST-SVR01",
+                "cpu": {"before": 2, "after": 4},
+                "memory": {"before": 4, "after": 8},
+                "anti_affinity_policy": {"action": "attach", "before": null,
+                                         "after": "1a28dd0988984d87b9cd61fa8da15424"},
+                "alert_policy": {"action": "attach", "id": "ba54ac54a60d4a4f1ed6d48c1ce240a7"},
+                "nic": {"action": "add", "network_id": "613a25aff2124d10a71b16cd6fb28975"}
+            }
+        ]
 '''
 
 __version__ = '${version}'
 
+import re
+import socket
+import struct
+import tempfile
+import time
 from distutils.version import LooseVersion
+from multiprocessing.pool import ThreadPool
 
 try:
     import requests
@@ -381,6 +426,244 @@ except ImportError:
 else:
     CLC_FOUND = True
 
+if REQUESTS_FOUND:
+    class ClcRequestsSession(requests.Session):
+        """
+        Requests session that sets the content type of each request from its payload.
+        The clc-sdk sets the content type on the shared session headers before every call,
+        which is not safe when the session is used by several threads at the same time.
+        """
+
+        def request(self, method, url, data=None, headers=None, **kwargs):
+            headers = dict(headers or {})
+            if isinstance(data, basestring):
+                headers.setdefault('content-type', 'Application/json')
+            else:
+                headers.setdefault('content-type', 'application/x-www-form-urlencoded')
+            return super(ClcRequestsSession, self).request(
+                method, url, data=data, headers=headers, **kwargs)
+
+
+class ClcTaskFailure(Exception):
+    """
+    Raised in place of fail_json while a server is modified on a worker thread
+    """
+    pass
+
+
+class ClcWorkerModule(object):
+    """
+    Wraps the AnsibleModule used by worker threads, so a failure is raised to the worker
+    instead of exiting the module from a thread
+    """
+
+    def __init__(self, module):
+        self._module = module
+
+    def __getattr__(self, name):
+        return getattr(self._module, name)
+
+    def fail_json(self, **kwargs):
+        raise ClcTaskFailure(kwargs.get('msg'))
+
+
+class ClcCatalogCache(object):
+    """
+    On disk cache of CLC API listings, shared between tasks and between modules.
+    It is enabled by setting the CLC_CACHE_TTL environment variable to the number
+    of seconds a listing stays valid.  CLC_CACHE_DIR overrides the default cache
+    directory of ~/.ansible/tmp/clc_cache.
+    """
+
+    @staticmethod
+    def _get_ttl():
+        """
+        Read the cache time to live from the environment
+        :return: the time to live in seconds, 0 when caching is disabled
+        """
+        try:
+            return int(os.environ.get('CLC_CACHE_TTL', 0))
+        except ValueError:
+            return 0
+
+    @staticmethod
+    def _get_path(kind, key):
+        """
+        Build the path of the cache file for a listing
+        :param kind: the kind of listing, e.g. alert_policies
+        :param key: the key of the listing, e.g. the account alias
+        :return: the path of the cache file
+        """
+        cache_dir = os.environ.get('CLC_CACHE_DIR') or os.path.join(
+            os.path.expanduser('~'), '.ansible', 'tmp', 'clc_cache')
+        name = re.sub(r'[^\w.-]', '_', '%s_%s' % (kind, str(key).lower()))
+        return os.path.join(cache_dir, name + '.json')
+
+    @staticmethod
+    def get(kind, key):
+        """
+        Get a listing from the cache
+        :param kind: the kind of listing
+        :param key: the key of the listing
+        :return: the cached list of items, or None when missing or expired
+        """
+        ttl = ClcCatalogCache._get_ttl()
+        if ttl <= 0:
+            return None
+        try:
+            with open(ClcCatalogCache._get_path(kind, key)) as cache_file:
+                entry = json.load(cache_file)
+        except (IOError, OSError, ValueError):
+            return None
+        if time.time() - entry.get('timestamp', 0) > ttl:
+            return None
+        return entry.get('items')
+
+    @staticmethod
+    def put(kind, key, items):
+        """
+        Store a listing in the cache. Failures to write the cache are ignored.
+        :param kind: the kind of listing
+        :param key: the key of the listing
+        :param items: the list of items to store
+        :return: none
+        """
+        if ClcCatalogCache._get_ttl() <= 0:
+            return
+        path = ClcCatalogCache._get_path(kind, key)
+        try:
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, 'w') as cache_file:
+                json.dump({'timestamp': time.time(), 'items': items}, cache_file)
+            os.rename(tmp_path, path)
+        except (IOError, OSError):
+            pass
+
+    @staticmethod
+    def invalidate(kind, key):
+        """
+        Remove a listing from the cache
+        :param kind: the kind of listing
+        :param key: the key of the listing
+        :return: none
+        """
+        try:
+            os.remove(ClcCatalogCache._get_path(kind, key))
+        except (IOError, OSError):
+            pass
+
+
+class ClcNetworkCatalog(object):
+    """
+    Catalog of the networks of a datacenter, indexed by id, name and cidr like the lookups of
+    clc.v2.Networks, with a containment index to find the network holding an ip address.
+    The network listing is shared between tasks through the ClcCatalogCache.
+    """
+
+    def __init__(self, networks):
+        self.networks = list(networks)
+        self.by_id = {}
+        self.by_name = {}
+        self.by_cidr = {}
+        self.by_prefix = {}
+        for network in self.networks:
+            data = network.data or {}
+            self.by_id.setdefault(network.id, network)
+            self.by_name.setdefault(data.get('name'), network)
+            self.by_cidr.setdefault(data.get('cidr'), network)
+            prefix = ClcNetworkCatalog._parse_cidr(data.get('cidr'))
+            if prefix is not None:
+                self.by_prefix.setdefault(prefix, network)
+        self.prefix_lengths = sorted(set([length for _, length in self.by_prefix]), reverse=True)
+
+    @staticmethod
+    def load(alias, location, loader):
+        """
+        Load the network catalog of a datacenter from the cache, or from the CLC API on a miss
+        :param alias: the account alias
+        :param location: the datacenter of the networks
+        :param loader: function returning the clc.v2.Networks of the datacenter
+        :return: the ClcNetworkCatalog of the datacenter
+        """
+        key = '{0}_{1}'.format(alias, location)
+        networks_data = ClcCatalogCache.get('networks', key)
+        if networks_data is not None:
+            return ClcNetworkCatalog(
+                [clc_sdk.v2.Network(network['id'], alias=alias, network_obj=network)
+                 for network in networks_data])
+        networks = loader().networks
+        ClcCatalogCache.put('networks', key, [network.data for network in networks])
+        return ClcNetworkCatalog(networks)
+
+    @staticmethod
+    def invalidate(alias, location):
+        """
+        Drop the cached network catalog of a datacenter
+        :param alias: the account alias
+        :param location: the datacenter of the networks
+        :return: none
+        """
+        ClcCatalogCache.invalidate('networks', '{0}_{1}'.format(alias, location))
+
+    def Get(self, key):
+        """
+        Get a network by id, name or cidr, the same way clc.v2.Networks.Get does
+        :param key: the id, name or cidr of the network
+        :return: clc-sdk.Network, or None when no network matches
+        """
+        for index in (self.by_id, self.by_name, self.by_cidr):
+            if key in index:
+                return index[key]
+        return None
+
+    def find_by_ip(self, ip_address):
+        """
+        Find the network holding an ip address, the most specific network first
+        :param ip_address: the ip address (ex: '10.101.216.12')
+        :return: clc-sdk.Network, or None when no network holds the address
+        """
+        address = ClcNetworkCatalog._ip_to_int(ip_address)
+        if address is None:
+            return None
+        for length in self.prefix_lengths:
+            mask = (0xffffffff << (32 - length)) & 0xffffffff
+            network = self.by_prefix.get((address & mask, length))
+            if network is not None:
+                return network
+        return None
+
+    @staticmethod
+    def _parse_cidr(cidr):
+        """
+        Parse a cidr block into its network address and prefix length
+        :param cidr: the cidr block (ex: '10.101.216.0/24')
+        :return: the (address, prefix length) tuple, or None when cidr is not a valid block
+        """
+        try:
+            address, length = cidr.split('/')
+            length = int(length)
+        except (AttributeError, ValueError):
+            return None
+        address = ClcNetworkCatalog._ip_to_int(address)
+        if address is None or not 0 <= length <= 32:
+            return None
+        mask = (0xffffffff << (32 - length)) & 0xffffffff
+        return address & mask, length
+
+    @staticmethod
+    def _ip_to_int(ip_address):
+        """
+        Convert a dotted ipv4 address to an integer
+        :param ip_address: the ip address
+        :return: the address as an integer, or None when ip_address is not an ipv4 address
+        """
+        try:
+            return struct.unpack('!I', socket.inet_aton(ip_address))[0]
+        except (socket.error, TypeError, UnicodeError):
+            return None
+
 
 class ClcModifyServer(object):
     clc = clc_sdk
@@ -426,6 +709,14 @@ class ClcModifyServer(object):
                 msg='server_ids needs to be a list of instances to modify: %s' %
                 server_ids)
 
+        if self.module.check_mode:
+            changed, plan = self._plan_server_changes(server_ids)
+            return self.module.exit_json(
+                changed=changed,
+                server_ids=[entry['id'] for entry in plan if len(entry) > 1],
+                servers=[],
+                plan=plan)
+
         (changed, server_dict_array, changed_server_ids) = self._modify_servers(
             server_ids=server_ids)
 
@@ -452,6 +743,9 @@ class ClcModifyServer(object):
             alert_policy_name=dict(),
             wait=dict(type='bool', default=True),
             additional_network=dict(),
+            parallelism=dict(type='int', default=10),
+            batch_size=dict(type='int', default=None),
+            max_failures=dict(type='int', default=0),
         )
         mutually_exclusive = [
             ['anti_affinity_policy_id', 'anti_affinity_policy_name'],
@@ -508,7 +802,52 @@ class ClcModifyServer(object):
         """
         p = self.module.params
         state = p.get('state')
-        server_params = {
+        server_params = self._get_server_params()
+        changed = False
+        server_dict_array = []
+        result_server_ids = []
+        changed_servers = []
+
+        if not isinstance(server_ids, list) or len(server_ids) < 1:
+            return self.module.fail_json(
+                msg='server_ids should be a list of servers, aborting')
+
+        servers = self._get_servers_from_clc(
+            server_ids,
+            'Failed to obtain server list from the CLC API')
+        server_params = self._resolve_task_context(server_params)
+        if p.get('batch_size'):
+            results = self._modify_servers_in_batches(servers, state, server_params)
+        else:
+            results = self._modify_server_wave(servers, state, server_params)
+            errors = [result['error'] for result in results if result.get('error')]
+            if errors:
+                return self.module.fail_json(
+                    msg='Unable to modify the servers. {0}'.format(' '.join(errors)))
+            self._wait_for_requests(
+                self.module,
+                [result['request'] for result in results if result.get('request')])
+
+        for result in results:
+            if result.get('changed'):
+                changed_servers.append(result['server'])
+                changed = True
+
+        self._refresh_servers(self.module, changed_servers)
+
+        for server in changed_servers:
+            server_dict_array.append(server.data)
+            result_server_ids.append(server.id)
+
+        return changed, server_dict_array, result_server_ids
+
+    def _get_server_params(self):
+        """
+        Build the dictionary of requested server parameters from the module params
+        :return: the dictionary of server parameters
+        """
+        p = self.module.params
+        return {
             'cpu': p.get('cpu'),
             'memory': p.get('memory'),
             'anti_affinity_policy_id': p.get('anti_affinity_policy_id'),
@@ -517,29 +856,199 @@ class ClcModifyServer(object):
             'alert_policy_name': p.get('alert_policy_name'),
             'additional_network': p.get('additional_network'),
         }
-        changed = False
-        server_changed = False
-        aa_changed = False
-        ap_changed = False
-        nic_changed = False
-        server_dict_array = []
-        result_server_ids = []
-        request_list = []
-        changed_servers = []
 
+    def _plan_server_changes(self, server_ids):
+        """
+        Compute the changes the module would make to every requested server, without making them.
+        The servers and their anti affinity policies are fetched concurrently in a single pass.
+        :param server_ids: list of servers to modify
+        :return: (changed, plan) -
+            changed: Boolean whether any server would be changed
+            plan: list of dictionaries describing the changes of each server
+        """
+        p = self.module.params
         if not isinstance(server_ids, list) or len(server_ids) < 1:
             return self.module.fail_json(
                 msg='server_ids should be a list of servers, aborting')
+        server_params = self._resolve_task_context(self._get_server_params())
+
+        module = self.module
+        self.module = ClcWorkerModule(module)
+        try:
+            plan = self._run_in_parallel(
+                lambda server_id: self._plan_server(server_id, p.get('state'), server_params),
+                server_ids,
+                p.get('parallelism'))
+        finally:
+            self.module = module
+
+        errors = [entry.pop('error') for entry in plan if entry.get('error')]
+        if errors:
+            return self.module.fail_json(
+                msg='Unable to plan the server changes. {0}'.format(' '.join(errors)))
+        return any(len(entry) > 1 for entry in plan), plan
+
+    def _plan_server(self, server_id, state, server_params):
+        """
+        Compute the changes of a single server. This runs on a worker thread while
+        self.module is a ClcWorkerModule, so a failure is recorded on the entry.
+        :param server_id: the CLC server id
+        :param state: the requested state, present or absent
+        :param server_params: the dictionary of resolved server parameters
+        :return: dictionary with the server id and one key per planned change
+        """
+        entry = {'id': server_id}
+        alias = server_params.get('alias')
+        try:
+            server = self.clc.v2.Server(id=server_id, alias=alias)
+            aa_policy_id = server_params.get('anti_affinity_policy_id')
+            if aa_policy_id:
+                current_aa_policy_id = self._get_aa_policy_id_of_server(
+                    self.clc, self.module, alias, server_id)
+            alert_policy_id = server_params.get('alert_policy_id')
+            alert_policy_exists = alert_policy_id and self._alert_policy_exists(
+                server, alert_policy_id)
+            network_id = server_params.get('network_id')
+            nic_exists = network_id and server_params.get('networks') and \
+                network_id in self._get_server_network_ids(server, server_params.get('networks'))
 
-        servers = self._get_servers_from_clc(
-            server_ids,
-            'Failed to obtain server list from the CLC API')
-        for server in servers:
             if state == 'present':
-                server_changed, server_result = self._ensure_server_config(
+                for member in ('cpu', 'memory'):
+                    value = server_params.get(member)
+                    if value and value != getattr(server, member):
+                        entry[member] = {'before': getattr(server, member), 'after': value}
+                if aa_policy_id and aa_policy_id != current_aa_policy_id:
+                    entry['anti_affinity_policy'] = {
+                        'action': 'attach', 'before': current_aa_policy_id, 'after': aa_policy_id}
+                if alert_policy_id and not alert_policy_exists:
+                    entry['alert_policy'] = {'action': 'attach', 'id': alert_policy_id}
+                if network_id and not nic_exists:
+                    entry['nic'] = {'action': 'add', 'network_id': network_id}
+            elif state == 'absent':
+                if aa_policy_id and aa_policy_id == current_aa_policy_id:
+                    entry['anti_affinity_policy'] = {
+                        'action': 'detach', 'before': current_aa_policy_id, 'after': None}
+                if alert_policy_exists:
+                    entry['alert_policy'] = {'action': 'detach', 'id': alert_policy_id}
+                if nic_exists:
+                    entry['nic'] = {'action': 'remove', 'network_id': network_id}
+        except ClcTaskFailure as ex:
+            entry['error'] = str(ex)
+        except CLCException as ex:
+            entry['error'] = 'Unable to fetch the server {0}. {1}'.format(server_id, str(ex))
+        return entry
+
+    @staticmethod
+    def _get_server_network_ids(server, networks):
+        """
+        Find the networks a server has an adapter on, from its internal ip addresses
+        :param server: the CLC server object
+        :param networks: the ClcNetworkCatalog of the datacenter of the server
+        :return: the set of network ids
+        """
+        network_ids = set()
+        details = (server.data or {}).get('details') or {}
+        for ip_address in details.get('ipAddresses') or []:
+            network = networks.find_by_ip(ip_address.get('internal'))
+            if network is not None:
+                network_ids.add(network.id)
+        return network_ids
+
+    def _modify_servers_in_batches(self, servers, state, server_params):
+        """
+        Modify the servers in waves of batch_size servers, waiting for the requests of each
+        wave before starting the next one. The remaining waves are aborted once more than
+        max_failures servers have failed.
+        :param servers: the list of CLC server objects
+        :param state: the requested state, present or absent
+        :param server_params: the dictionary of resolved server parameters
+        :return: the list of server results, in the same order as servers
+        """
+        p = self.module.params
+        batch_size = p.get('batch_size')
+        max_failures = p.get('max_failures') or 0
+        results = []
+        errors = []
+        if batch_size < 1:
+            return self.module.fail_json(
+                msg='batch_size must be a positive number: {0}'.format(batch_size))
+        if not p.get('wait', True):
+            return self.module.fail_json(
+                msg='batch_size waits for each wave and cannot be used with wait set to false')
+        for start in range(0, len(servers), batch_size):
+            wave = self._modify_server_wave(
+                servers[start:start + batch_size], state, server_params)
+            self._wait_for_wave(wave, p.get('parallelism'))
+            results.extend(wave)
+            errors.extend([result['error'] for result in wave if result.get('error')])
+            skipped = len(servers) - len(results)
+            if len(errors) > max_failures and skipped:
+                errors.append('Aborted the modification of the {0} remaining servers.'.format(skipped))
+                break
+        if errors:
+            return self.module.fail_json(
+                msg='Unable to modify the servers. {0}'.format(' '.join(errors)),
+                server_ids=[result['server'].id for result in results
+                            if result.get('changed') and not result.get('error')])
+        return results
+
+    def _modify_server_wave(self, servers, state, server_params):
+        """
+        Modify a list of servers concurrently
+        :param servers: the list of CLC server objects
+        :param state: the requested state, present or absent
+        :param server_params: the dictionary of resolved server parameters
+        :return: the list of server results, in the same order as servers
+        """
+        module = self.module
+        self.module = ClcWorkerModule(module)
+        try:
+            return self._run_in_parallel(
+                lambda server: self._modify_server(server, state, server_params),
+                servers,
+                module.params.get('parallelism'))
+        finally:
+            self.module = module
+
+    @staticmethod
+    def _wait_for_wave(results, parallelism):
+        """
+        Wait concurrently for the pending requests of a wave of servers, and record
+        the servers whose request failed
+        :param results: the list of server results of the wave
+        :param parallelism: the maximum number of requests to wait for at the same time
+        :return: none
+        """
+        pending = [result for result in results if result.get('request')]
+        # Requests.WaitUntilComplete() returns the count of failed requests
+        failed_counts = ClcModifyServer._run_in_parallel(
+            lambda result: result['request'].WaitUntilComplete(),
+            pending,
+            parallelism)
+        for result, failed_count in zip(pending, failed_counts):
+            if failed_count > 0:
+                result['error'] = 'Unable to process modify server request for server : "{0}".'.format(
+                    result['server'].id)
+
+    def _modify_server(self, server, state, server_params):
+        """
+        Reconcile a single server with the requested configuration. This runs on a worker
+        thread while self.module is a ClcWorkerModule, so a failure is recorded on the
+        result instead of failing the module.
+        :param server: the CLC server object
+        :param state: the requested state, present or absent
+        :param server_params: the dictionary of resolved server parameters
+        :return: dictionary with the server, the changed flag, the pending request and the error
+        """
+        result = {'server': server, 'changed': False, 'request': None, 'error': None}
+        server_changed = False
+        aa_changed = False
+        ap_changed = False
+        nic_changed = False
+        try:
+            if state == 'present':
+                server_changed, result['request'] = self._ensure_server_config(
                     server, server_params)
-                if server_result:
-                    request_list.append(server_result)
                 aa_changed = self._ensure_aa_policy_present(
                     server,
                     server_params)
@@ -559,18 +1068,59 @@ class ClcModifyServer(object):
                 nic_changed = self._ensure_nic_absent(
                     server,
                     server_params)
-            if server_changed or aa_changed or ap_changed or nic_changed:
-                changed_servers.append(server)
-                changed = True
-
-        self._wait_for_requests(self.module, request_list)
-        self._refresh_servers(self.module, changed_servers)
+        except (ClcTaskFailure, CLCException) as ex:
+            result['error'] = str(ex)
+        result['changed'] = bool(
+            server_changed or aa_changed or ap_changed or nic_changed)
+        return result
 
-        for server in changed_servers:
-            server_dict_array.append(server.data)
-            result_server_ids.append(server.id)
+    @staticmethod
+    def _run_in_parallel(func, items, parallelism):
+        """
+        Calls func for every item on a bounded pool of threads
+        :param func: the function to call with each item
+        :param items: the list of items to process
+        :param parallelism: the maximum number of concurrent calls
+        :return: the list of results, in the same order as items
+        """
+        items = list(items)
+        if not parallelism or parallelism < 2 or len(items) < 2:
+            return [func(item) for item in items]
+        pool = ThreadPool(min(parallelism, len(items)))
+        try:
+            return pool.map(func, items)
+        finally:
+            pool.close()
+            pool.join()
 
-        return changed, server_dict_array, result_server_ids
+    def _resolve_task_context(self, server_params):
+        """
+        Resolve the account alias, the additional network and the policy ids once per task,
+        so they are not looked up again for every server that is modified
+        :param server_params: the dictionary of server parameters
+        :return: a copy of server_params with the alias, network_id and policy ids resolved
+        """
+        context = dict(server_params)
+        context['alias'] = self.clc.v2.Account.GetAlias()
+        if context.get('additional_network'):
+            datacenter = self._find_datacenter(self.clc, self.module)
+            context['networks'] = ClcNetworkCatalog.load(
+                datacenter.alias, datacenter.location, lambda: datacenter.Networks(forced_load=True))
+            context['network_id'] = self._find_network_id(
+                self.module, datacenter, context['networks'])
+        if not context.get('anti_affinity_policy_id') and context.get('anti_affinity_policy_name'):
+            context['anti_affinity_policy_id'] = self._get_aa_policy_id_by_name(
+                self.clc,
+                self.module,
+                context['alias'],
+                context.get('anti_affinity_policy_name'))
+        if not context.get('alert_policy_id') and context.get('alert_policy_name'):
+            context['alert_policy_id'] = self._get_alert_policy_id_by_name(
+                self.clc,
+                self.module,
+                context['alias'],
+                context.get('alert_policy_name'))
+        return context
 
     def _ensure_server_config(
             self, server, server_params):
@@ -598,12 +1148,13 @@ class ClcModifyServer(object):
                     self.module,
                     server.id,
                     cpu,
-                    memory)
+                    memory,
+                    server_params.get('alias'))
             changed = True
         return changed, result
 
     @staticmethod
-    def _modify_clc_server(clc, module, server_id, cpu, memory):
+    def _modify_clc_server(clc, module, server_id, cpu, memory, acct_alias=None):
         """
         Modify the memory or CPU of a clc server.
         :param clc: the clc-sdk instance to use
@@ -611,10 +1162,12 @@ class ClcModifyServer(object):
         :param server_id: id of the server to modify
         :param cpu: the new cpu value
         :param memory: the new memory value
+        :param acct_alias: the CLC account alias, looked up when not provided
         :return: the result of CLC API call
         """
         result = None
-        acct_alias = clc.v2.Account.GetAlias()
+        if not acct_alias:
+            acct_alias = clc.v2.Account.GetAlias()
         try:
             # Update the server configuration
             job_obj = clc.v2.API.Call('PATCH',
@@ -634,18 +1187,23 @@ class ClcModifyServer(object):
         return result
 
     @staticmethod
-    def _modify_add_nic(clc, module, server_id):
+    def _modify_add_nic(clc, module, server_id, acct_alias=None, network_id=None):
         """
         Add a secondary nic to existing clc server
         :param clc: the clc-sdk instance to use
         :param module: the AnsibleModule object
         :param server_id: id of the server to modify
+        :param acct_alias: the CLC account alias, looked up when not provided
+        :param network_id: the id of the network to add, looked up when not provided
         :return:
         """
         result = None
-        acct_alias = clc.v2.Account.GetAlias()
-        datacenter = ClcModifyServer._find_datacenter(clc, module)
-        additional_network = ClcModifyServer._find_network_id(module, datacenter)
+        if not acct_alias:
+            acct_alias = clc.v2.Account.GetAlias()
+        additional_network = network_id
+        if not additional_network:
+            datacenter = ClcModifyServer._find_datacenter(clc, module)
+            additional_network = ClcModifyServer._find_network_id(module, datacenter)
         wait = module.params.get('wait', False)
         if not module.check_mode:
             try:
@@ -667,12 +1225,15 @@ class ClcModifyServer(object):
         return result
 
     @staticmethod
-    def _modify_remove_nic(clc, module, server_id):
+    def _modify_remove_nic(clc, module, server_id, acct_alias=None, network_id=None):
       result = None
 
-      acct_alias = clc.v2.Account.GetAlias()
-      dc = ClcModifyServer._find_datacenter(clc, module)
-      network = ClcModifyServer._find_network_id(module, dc)
+      if not acct_alias:
+        acct_alias = clc.v2.Account.GetAlias()
+      network = network_id
+      if not network:
+        dc = ClcModifyServer._find_datacenter(clc, module)
+        network = ClcModifyServer._find_network_id(module, dc)
       wait = module.params.get('wait', False)
 
       if not module.check_mode:
@@ -713,11 +1274,12 @@ class ClcModifyServer(object):
                     "Unable to find location: {0}. {1}".format(location, ex.message)))
 
     @staticmethod
-    def _find_network_id(module, datacenter):
+    def _find_network_id(module, datacenter, networks=None):
         """
         Validate the provided network id or return a default.
         :param module: the module to validate
         :param datacenter: the datacenter to search for a network id
+        :param networks: the ClcNetworkCatalog of the datacenter, loaded when not provided
         :return: a valid network id
         """
         additional_network = module.params.get('additional_network')
@@ -726,7 +1288,10 @@ class ClcModifyServer(object):
         # Validates provided network id
         # Allows lookup of network by id, name, or cidr notation
         if additional_network:
-            network = datacenter.Networks(forced_load=True).Get(additional_network)
+            if networks is None:
+                networks = ClcNetworkCatalog.load(
+                    datacenter.alias, datacenter.location, lambda: datacenter.Networks(forced_load=True))
+            network = networks.Get(additional_network)
             if network:
                 network_id = network.id
             else:
@@ -767,7 +1332,9 @@ class ClcModifyServer(object):
                 add_nic = self._modify_add_nic(
                     self.clc,
                     self.module,
-                    server.id)
+                    server.id,
+                    server_params.get('alias'),
+                    server_params.get('network_id'))
                 changed = add_nic
         return changed
 
@@ -786,7 +1353,9 @@ class ClcModifyServer(object):
           changed = self._modify_remove_nic(
             self.clc
             , self.module
-            , server.id)
+            , server.id
+            , server_params.get('alias')
+            , server_params.get('network_id'))
 
       return changed
 
@@ -801,8 +1370,10 @@ class ClcModifyServer(object):
         wait = module.params.get('wait')
         if wait:
             # Requests.WaitUntilComplete() returns the count of failed requests
-            failed_requests_count = sum(
-                [request.WaitUntilComplete() for request in request_list])
+            failed_requests_count = sum(ClcModifyServer._run_in_parallel(
+                lambda request: request.WaitUntilComplete(),
+                request_list,
+                module.params.get('parallelism')))
 
             if failed_requests_count > 0:
                 module.fail_json(
@@ -835,7 +1406,7 @@ class ClcModifyServer(object):
             result: The result from the CLC API call
         """
         changed = False
-        acct_alias = self.clc.v2.Account.GetAlias()
+        acct_alias = server_params.get('alias') or self.clc.v2.Account.GetAlias()
 
         aa_policy_id = server_params.get('anti_affinity_policy_id')
         aa_policy_name = server_params.get('anti_affinity_policy_name')
@@ -872,7 +1443,7 @@ class ClcModifyServer(object):
             result: The result from the CLC API call
         """
         changed = False
-        acct_alias = self.clc.v2.Account.GetAlias()
+        acct_alias = server_params.get('alias') or self.clc.v2.Account.GetAlias()
         aa_policy_id = server_params.get('anti_affinity_policy_id')
         aa_policy_name = server_params.get('anti_affinity_policy_name')
         if not aa_policy_id and aa_policy_name:
@@ -957,24 +1528,45 @@ class ClcModifyServer(object):
         """
         aa_policy_id = None
         try:
-            aa_policies = clc.v2.API.Call(method='GET',
-                                          url='antiAffinityPolicies/%s' % alias)
+            aa_policies = ClcModifyServer._get_aa_policy_catalog(clc, alias)
         except APIFailedResponse as ex:
             return module.fail_json(
                 msg='Unable to fetch anti affinity policies from account alias : "{0}". {1}'.format(
                     alias, str(ex.response_text)))
-        for aa_policy in aa_policies.get('items'):
-            if aa_policy.get('name') == aa_policy_name:
-                if not aa_policy_id:
-                    aa_policy_id = aa_policy.get('id')
-                else:
-                    return module.fail_json(
-                        msg='multiple anti affinity policies were found with policy name : %s' % aa_policy_name)
+        policy_ids = [aa_policy.get('id') for aa_policy in aa_policies
+                      if aa_policy.get('name') == aa_policy_name]
+        if len(policy_ids) > 1:
+            return module.fail_json(
+                msg='multiple anti affinity policies were found with policy name : %s' % aa_policy_name)
+        if policy_ids:
+            aa_policy_id = policy_ids[0]
         if not aa_policy_id:
             module.fail_json(
                 msg='No anti affinity policy was found with policy name : %s' % aa_policy_name)
         return aa_policy_id
 
+    @staticmethod
+    def _get_aa_policy_catalog(clc, alias):
+        """
+        Returns the anti affinity policies of the account, in every location.
+        The policy list is read from the shared catalog cache when available.
+        :param clc: the clc-sdk instance to use
+        :param alias: the CLC account alias
+        :return: list of dictionaries with the id, name, location and servers of each policy
+        """
+        aa_policies = ClcCatalogCache.get('aa_policies', alias)
+        if aa_policies is None:
+            response = clc.v2.API.Call(method='GET',
+                                       url='antiAffinityPolicies/%s' % alias)
+            aa_policies = [{'id': aa_policy.get('id'),
+                            'name': aa_policy.get('name'),
+                            'location': aa_policy.get('location'),
+                            'servers': [link.get('id') for link in aa_policy.get('links', [])
+                                        if link.get('rel') == 'server']}
+                           for aa_policy in response.get('items')]
+            ClcCatalogCache.put('aa_policies', alias, aa_policies)
+        return aa_policies
+
     @staticmethod
     def _get_aa_policy_id_of_server(clc, module, alias, server_id):
         """
@@ -1008,7 +1600,7 @@ class ClcModifyServer(object):
             result: The result from the CLC API call
         """
         changed = False
-        acct_alias = self.clc.v2.Account.GetAlias()
+        acct_alias = server_params.get('alias') or self.clc.v2.Account.GetAlias()
         alert_policy_id = server_params.get('alert_policy_id')
         alert_policy_name = server_params.get('alert_policy_name')
         if not alert_policy_id and alert_policy_name:
@@ -1040,7 +1632,7 @@ class ClcModifyServer(object):
         """
         changed = False
 
-        acct_alias = self.clc.v2.Account.GetAlias()
+        acct_alias = server_params.get('alias') or self.clc.v2.Account.GetAlias()
         alert_policy_id = server_params.get('alert_policy_id')
         alert_policy_name = server_params.get('alert_policy_name')
         if not alert_policy_id and alert_policy_name:
@@ -1120,19 +1712,22 @@ class ClcModifyServer(object):
         :return: alert_policy_id: The alert policy id
         """
         alert_policy_id = None
-        try:
-            alert_policies = clc.v2.API.Call(method='GET',
-                                             url='alertPolicies/%s' % alias)
-        except APIFailedResponse as ex:
-            return module.fail_json(msg='Unable to fetch alert policies for account : "{0}". {1}'.format(
-                alias, str(ex.response_text)))
-        for alert_policy in alert_policies.get('items'):
-            if alert_policy.get('name') == alert_policy_name:
-                if not alert_policy_id:
-                    alert_policy_id = alert_policy.get('id')
-                else:
-                    return module.fail_json(
-                        msg='multiple alert policies were found with policy name : %s' % alert_policy_name)
+        policies = ClcCatalogCache.get('alert_policies', alias)
+        if policies is None:
+            try:
+                policies = clc.v2.API.Call(method='GET',
+                                           url='alertPolicies/%s' % alias).get('items')
+            except APIFailedResponse as ex:
+                return module.fail_json(msg='Unable to fetch alert policies for account : "{0}". {1}'.format(
+                    alias, str(ex.response_text)))
+            ClcCatalogCache.put('alert_policies', alias, policies)
+        policy_ids = [alert_policy.get('id') for alert_policy in policies
+                      if alert_policy.get('name') == alert_policy_name]
+        if len(policy_ids) > 1:
+            return module.fail_json(
+                msg='multiple alert policies were found with policy name : %s' % alert_policy_name)
+        if policy_ids:
+            alert_policy_id = policy_ids[0]
         return alert_policy_id
 
     @staticmethod
@@ -1155,7 +1750,7 @@ class ClcModifyServer(object):
     def _set_user_agent(clc):
         if hasattr(clc, 'SetRequestsSession'):
             agent_string = "ClcAnsibleModule/" + __version__
-            ses = requests.Session()
+            ses = ClcRequestsSession()
             ses.headers.update({"Api-Client": agent_string})
             ses.headers['User-Agent'] += " " + agent_string
             clc.SetRequestsSession(ses)
@@ -48,6 +48,17 @@ options:
     description:
       - The name of the network.  Used to find an existing network when state='present'.
     required: False
+  networks:
+    description:
+      - A list of networks to claim, each given by its name and an optional description. The networks are
+        found by name like with the name option, and all the missing networks are claimed at the same time.
+        Only supported with state present. Mutually exclusive with id and name.
+    required: False
+  parallelism:
+    description:
+      - The maximum number of networks claimed and updated at the same time when networks is provided.
+    default: 10
+    required: False
   state:
     description:
       - Whether to claim or release the network.
@@ -75,6 +86,9 @@ notes:
           - CLC_V2_API_TOKEN, the API token generated from https://api.ctl.io/v2/authentication/login
           - CLC_ACCT_ALIAS, the account alias associated with the centurylink cloud
     - Users can set CLC_V2_API_URL to specify an endpoint for pointing to a different CLC environment.
+    - Users can set CLC_CACHE_TTL to the number of seconds the network list of a datacenter is cached on disk
+      and shared with the other CLC modules. CLC_CACHE_DIR overrides the default cache directory
+      ~/.ansible/tmp/clc_cache.
 '''
 
 EXAMPLES = '''
@@ -96,6 +110,25 @@ EXAMPLES = '''
 
     - debug: var=net
 
+---
+- name: Create Networks
+  hosts: localhost
+  gather_facts: False
+  connection: local
+  tasks:
+    - name: Claim the networks of a new datacenter footprint at the same time
+      clc_network:
+        location: 'ut1'
+        state: present
+        networks:
+          - name: 'ProdWeb'
+            description: 'Production web tier'
+          - name: 'ProdApp'
+          - name: 'ProdDb'
+      register: net
+
+    - debug: var=net
+
 ---
 - name: Delete Network
   hosts: localhost
@@ -157,11 +190,37 @@ network:
             "type": "private",
             "vlan": 716
         }
+networks:
+    description: The information of the requested networks, in the order of the networks option. The claim
+                 request id and uri are returned instead for the networks claimed with wait false, and
+                 the name with claimed false for the networks not claimed, in check mode or after a failure.
+                 When a claim fails, the networks already claimed are still returned with the failure.
+    returned: when networks is provided, also when claiming them fails
+    type: list
+    sample:
+        [
+            {
+                "cidr": "10.101.216.0/24",
+                "description": "Production web tier",
+                "gateway": "10.101.216.1",
+                "id": "7c5fc52fd9dd48d5a6ab879bf6ab3db9",
+                "name": "ProdWeb",
+                "netmask": "255.255.255.0",
+                "type": "private",
+                "vlan": 716
+            }
+        ]
 '''
 
 __version__ = '${version}'
 
+import re
+import socket
+import struct
+import tempfile
+import time
 from distutils.version import LooseVersion
+from multiprocessing.pool import ThreadPool
 
 try:
     import requests
@@ -184,6 +243,204 @@ else:
     CLC_FOUND = True
 
 
+class ClcCatalogCache(object):
+    """
+    On disk cache of CLC API listings, shared between tasks and between modules.
+    It is enabled by setting the CLC_CACHE_TTL environment variable to the number
+    of seconds a listing stays valid.  CLC_CACHE_DIR overrides the default cache
+    directory of ~/.ansible/tmp/clc_cache.
+    """
+
+    @staticmethod
+    def _get_ttl():
+        """
+        Read the cache time to live from the environment
+        :return: the time to live in seconds, 0 when caching is disabled
+        """
+        try:
+            return int(os.environ.get('CLC_CACHE_TTL', 0))
+        except ValueError:
+            return 0
+
+    @staticmethod
+    def _get_path(kind, key):
+        """
+        Build the path of the cache file for a listing
+        :param kind: the kind of listing, e.g. alert_policies
+        :param key: the key of the listing, e.g. the account alias
+        :return: the path of the cache file
+        """
+        cache_dir = os.environ.get('CLC_CACHE_DIR') or os.path.join(
+            os.path.expanduser('~'), '.ansible', 'tmp', 'clc_cache')
+        name = re.sub(r'[^\w.-]', '_', '%s_%s' % (kind, str(key).lower()))
+        return os.path.join(cache_dir, name + '.json')
+
+    @staticmethod
+    def get(kind, key):
+        """
+        Get a listing from the cache
+        :param kind: the kind of listing
+        :param key: the key of the listing
+        :return: the cached list of items, or None when missing or expired
+        """
+        ttl = ClcCatalogCache._get_ttl()
+        if ttl <= 0:
+            return None
+        try:
+            with open(ClcCatalogCache._get_path(kind, key)) as cache_file:
+                entry = json.load(cache_file)
+        except (IOError, OSError, ValueError):
+            return None
+        if time.time() - entry.get('timestamp', 0) > ttl:
+            return None
+        return entry.get('items')
+
+    @staticmethod
+    def put(kind, key, items):
+        """
+        Store a listing in the cache. Failures to write the cache are ignored.
+        :param kind: the kind of listing
+        :param key: the key of the listing
+        :param items: the list of items to store
+        :return: none
+        """
+        if ClcCatalogCache._get_ttl() <= 0:
+            return
+        path = ClcCatalogCache._get_path(kind, key)
+        try:
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, 'w') as cache_file:
+                json.dump({'timestamp': time.time(), 'items': items}, cache_file)
+            os.rename(tmp_path, path)
+        except (IOError, OSError):
+            pass
+
+    @staticmethod
+    def invalidate(kind, key):
+        """
+        Remove a listing from the cache
+        :param kind: the kind of listing
+        :param key: the key of the listing
+        :return: none
+        """
+        try:
+            os.remove(ClcCatalogCache._get_path(kind, key))
+        except (IOError, OSError):
+            pass
+
+
+class ClcNetworkCatalog(object):
+    """
+    Catalog of the networks of a datacenter, indexed by id, name and cidr like the lookups of
+    clc.v2.Networks, with a containment index to find the network holding an ip address.
+    The network listing is shared between tasks through the ClcCatalogCache.
+    """
+
+    def __init__(self, networks):
+        self.networks = list(networks)
+        self.by_id = {}
+        self.by_name = {}
+        self.by_cidr = {}
+        self.by_prefix = {}
+        for network in self.networks:
+            data = network.data or {}
+            self.by_id.setdefault(network.id, network)
+            self.by_name.setdefault(data.get('name'), network)
+            self.by_cidr.setdefault(data.get('cidr'), network)
+            prefix = ClcNetworkCatalog._parse_cidr(data.get('cidr'))
+            if prefix is not None:
+                self.by_prefix.setdefault(prefix, network)
+        self.prefix_lengths = sorted(set([length for _, length in self.by_prefix]), reverse=True)
+
+    @staticmethod
+    def load(alias, location, loader):
+        """
+        Load the network catalog of a datacenter from the cache, or from the CLC API on a miss
+        :param alias: the account alias
+        :param location: the datacenter of the networks
+        :param loader: function returning the clc.v2.Networks of the datacenter
+        :return: the ClcNetworkCatalog of the datacenter
+        """
+        key = '{0}_{1}'.format(alias, location)
+        networks_data = ClcCatalogCache.get('networks', key)
+        if networks_data is not None:
+            return ClcNetworkCatalog(
+                [clc_sdk.v2.Network(network['id'], alias=alias, network_obj=network)
+                 for network in networks_data])
+        networks = loader().networks
+        ClcCatalogCache.put('networks', key, [network.data for network in networks])
+        return ClcNetworkCatalog(networks)
+
+    @staticmethod
+    def invalidate(alias, location):
+        """
+        Drop the cached network catalog of a datacenter
+        :param alias: the account alias
+        :param location: the datacenter of the networks
+        :return: none
+        """
+        ClcCatalogCache.invalidate('networks', '{0}_{1}'.format(alias, location))
+
+    def Get(self, key):
+        """
+        Get a network by id, name or cidr, the same way clc.v2.Networks.Get does
+        :param key: the id, name or cidr of the network
+        :return: clc-sdk.Network, or None when no network matches
+        """
+        for index in (self.by_id, self.by_name, self.by_cidr):
+            if key in index:
+                return index[key]
+        return None
+
+    def find_by_ip(self, ip_address):
+        """
+        Find the network holding an ip address, the most specific network first
+        :param ip_address: the ip address (ex: '10.101.216.12')
+        :return: clc-sdk.Network, or None when no network holds the address
+        """
+        address = ClcNetworkCatalog._ip_to_int(ip_address)
+        if address is None:
+            return None
+        for length in self.prefix_lengths:
+            mask = (0xffffffff << (32 - length)) & 0xffffffff
+            network = self.by_prefix.get((address & mask, length))
+            if network is not None:
+                return network
+        return None
+
+    @staticmethod
+    def _parse_cidr(cidr):
+        """
+        Parse a cidr block into its network address and prefix length
+        :param cidr: the cidr block (ex: '10.101.216.0/24')
+        :return: the (address, prefix length) tuple, or None when cidr is not a valid block
+        """
+        try:
+            address, length = cidr.split('/')
+            length = int(length)
+        except (AttributeError, ValueError):
+            return None
+        address = ClcNetworkCatalog._ip_to_int(address)
+        if address is None or not 0 <= length <= 32:
+            return None
+        mask = (0xffffffff << (32 - length)) & 0xffffffff
+        return address & mask, length
+
+    @staticmethod
+    def _ip_to_int(ip_address):
+        """
+        Convert a dotted ipv4 address to an integer
+        :param ip_address: the ip address
+        :return: the address as an integer, or None when ip_address is not an ipv4 address
+        """
+        try:
+            return struct.unpack('!I', socket.inet_aton(ip_address))[0]
+        except (socket.error, TypeError, UnicodeError):
+            return None
+
+
 class ClcNetwork(object):
 
     clc = clc_sdk
@@ -196,6 +453,7 @@ class ClcNetwork(object):
         self.module = module
         self.network_dict = {}
         self.networks = None
+        self.alias = None
 
         if not CLC_FOUND:
             self.module.fail_json(
@@ -221,6 +479,8 @@ class ClcNetwork(object):
             name=dict(required=False),
             location=dict(required=True),
             description=dict(required=False),
+            networks=dict(type='list', required=False),
+            parallelism=dict(type='int', default=10),
             wait=dict(default=True, type='bool'),
             state=dict(default='present', choices=['present', 'absent']),
         )
@@ -267,11 +527,32 @@ class ClcNetwork(object):
 
         self.networks = self._populate_networks(p.get('location'))
 
+        if p.get('networks'):
+            if p.get('state') == 'absent':
+                return self.module.fail_json(
+                    msg='networks is only supported with state present')
+            changed, networks = self._ensure_networks_present(p)
+            if changed and not self.module.check_mode:
+                ClcNetworkCatalog.invalidate(self.alias, p.get('location'))
+            return self.module.exit_json(changed=changed, networks=networks)
+
         if p.get('state') == 'absent':
             changed = self._ensure_network_absent(p)
         else:
             changed, network = self._ensure_network_present(p)
 
+        if changed and not self.module.check_mode:
+            ClcNetworkCatalog.invalidate(self.alias, p.get('location'))
+
+        self.module.exit_json(changed=changed, network=self._get_network_result(network))
+
+    @staticmethod
+    def _get_network_result(network):
+        """
+        Get the information of a network, or of its claim request when the claim was not waited for
+        :param network: clc-sdk.Network, or the clc-sdk.Requests of the claim
+        :return: the dictionary of the network information
+        """
         if hasattr(network, 'data'):
             network = network.data
         elif hasattr(network, 'requests'):
@@ -279,11 +560,17 @@ class ClcNetwork(object):
                 "id": network.requests[0].id,
                 "uri": network.requests[0].uri
             }
-
-        self.module.exit_json(changed=changed, network=network)
+        return network
 
     def _populate_networks(self, location):
-        return self.clc.v2.Networks(location=location)
+        """
+        Load the networks of a datacenter
+        :param location: the datacenter of the networks
+        :return: the ClcNetworkCatalog of the datacenter
+        """
+        self.alias = self.clc.v2.Account.GetAlias()
+        return ClcNetworkCatalog.load(
+            self.alias, location, lambda: self.clc.v2.Networks(location=location))
 
     @staticmethod
     def _set_user_agent(clc):
@@ -320,22 +607,160 @@ class ClcNetwork(object):
 
         return changed, network
 
-    def _create_network(self, params):
-        name = params.get('name', None)
-        desc = params.get('description', None)
-        request = self.clc.v2.Network.Create(location=params.get('location'))
+    def _ensure_networks_present(self, params):
+        """
+        Ensure a list of networks is claimed. The existing networks are updated and the missing
+        networks are claimed, waited for and named on a bounded pool of threads.
+        :param params: the module params, with the list of networks
+        :return: (changed, the list of the network information in the order of the networks)
+        """
+        network_params = [dict(params, name=network.get('name'), description=network.get('description'))
+                          for network in self._get_network_specs(params.get('networks'))]
+        results = [None] * len(network_params)
+        missing = []
+        changed = False
 
-        if params.get('wait', True):
+        for index, network_param in enumerate(network_params):
+            network = self.networks.Get(network_param.get('name'))
+            if network is None:
+                missing.append(index)
+            else:
+                updated, results[index] = self._update_network(network, network_param)
+                changed = changed or updated
+
+        if missing:
+            changed = True
+            if not self.module.check_mode:
+                claims = self._claim_networks(params.get('location'), len(missing))
+                if params.get('wait', True):
+                    claims = self._complete_network_claims(
+                        claims, [network_params[index] for index in missing])
+                for index, (network, error) in zip(missing, claims):
+                    results[index] = network
+                errors = [error for network, error in claims if error]
+                if errors:
+                    ClcNetworkCatalog.invalidate(self.alias, params.get('location'))
+                    return self.module.fail_json(
+                        msg=' '.join(errors),
+                        networks=self._get_networks_result(network_params, results))
+
+        return changed, self._get_networks_result(network_params, results)
+
+    @staticmethod
+    def _get_networks_result(network_params, networks):
+        """
+        Get the information of a list of networks, with a placeholder for the networks that were not claimed
+        :param network_params: the list of the params of the networks
+        :param networks: the list of clc-sdk.Network or clc-sdk.Requests, None for the networks not claimed
+        :return: the list of the network information, in the order of network_params
+        """
+        return [ClcNetwork._get_network_result(network) if network is not None
+                else {'name': params.get('name'), 'claimed': False}
+                for params, network in zip(network_params, networks)]
+
+    def _get_network_specs(self, networks):
+        """
+        Validate the list of networks to claim
+        :param networks: the list of network names or dictionaries with a name and a description
+        :return: the list of dictionaries with a name and a description
+        """
+        specs = []
+        for network in networks:
+            if not isinstance(network, dict):
+                network = {'name': network}
+            if not network.get('name'):
+                return self.module.fail_json(msg='networks items require a name')
+            specs.append(network)
+        return specs
+
+    def _claim_networks(self, location, count):
+        """
+        Submit the claims of several networks at the same time
+        :param location: the datacenter of the networks
+        :param count: the number of networks to claim
+        :return: the list of (clc-sdk.Requests, error) of the claims
+        """
+        return self._run_in_parallel(
+            lambda index: self._claim_network(location),
+            range(count),
+            self.module.params.get('parallelism'))
+
+    def _claim_network(self, location):
+        """
+        Submit the claim of a network on a worker thread
+        :param location: the datacenter of the network
+        :return: (request, error)
+        """
+        try:
+            return self.clc.v2.Network.Create(location=location), None
+        except CLCException as ex:
+            return None, 'Unable to claim a network in location {0}. {1}'.format(location, ex.message)
+
+    def _complete_network_claims(self, claims, network_params):
+        """
+        Wait for the successful network claims and name the claimed networks at the same time
+        :param claims: the list of (clc-sdk.Requests, error) of the claims
+        :param network_params: the list of the params of the networks, in the order of claims
+        :return: the list of (network, error), in the order of claims. The network is the claimed
+                 clc-sdk.Network, the clc-sdk.Requests of a claim that did not complete, or None
+        """
+        return self._run_in_parallel(
+            lambda item: item[0] if item[0][1] else self._complete_network_claim(item[0][0], item[1]),
+            zip(claims, network_params),
+            self.module.params.get('parallelism'))
+
+    def _complete_network_claim(self, request, params):
+        """
+        Wait for the claim of a network, then set its name and description
+        :param request: the clc-sdk.Requests of the claim
+        :param params: the params of the network
+        :return: (network, error)
+        """
+        try:
             uri = request.requests[0].uri
             if request.WaitUntilComplete() > 0:
-                self.module.fail_json(msg="Unable to create network")
+                return request, 'Unable to create network'
             network_payload = self.clc.v2.API.Call('GET',
                                                    self.clc.v2.API.Call('GET', uri)['summary']['links'][0]['href'])
-            request = self.clc.v2.Network(
+            network = self.clc.v2.Network(
                 network_payload['id'], network_obj=network_payload)
+        except CLCException as ex:
+            return request, 'Unable to create network. {0}'.format(ex.message)
+
+        try:
+            if params.get('name') is not None or params.get('description') is not None:
+                ignored, network = self._update_network(network, params)
+            return network, None
+        except CLCException as ex:
+            return network, 'Unable to name the network {0}. {1}'.format(network.id, ex.message)
+
+    @staticmethod
+    def _run_in_parallel(func, items, parallelism):
+        """
+        Calls func for every item on a bounded pool of threads
+        :param func: the function to call with each item
+        :param items: the list of items to process
+        :param parallelism: the maximum number of concurrent calls
+        :return: the list of results, in the same order as items
+        """
+        items = list(items)
+        if not parallelism or parallelism < 2 or len(items) < 2:
+            return [func(item) for item in items]
+        pool = ThreadPool(min(parallelism, len(items)))
+        try:
+            return pool.map(func, items)
+        finally:
+            pool.close()
+            pool.join()
 
-            if name is not None or desc is not None:
-                ignored, request = self._update_network(request, params)
+    def _create_network(self, params):
+        request = self.clc.v2.Network.Create(location=params.get('location'))
+
+        if params.get('wait', True):
+            network, error = self._complete_network_claim(request, params)
+            if error:
+                return self.module.fail_json(msg=error)
+            request = network
 
         return request
 
@@ -368,6 +793,7 @@ def main():
     """
     module = AnsibleModule(
         argument_spec=ClcNetwork._define_module_argument_spec(),
+        mutually_exclusive=[['networks', 'id'], ['networks', 'name']],
         supports_check_mode=True)
     clc_network = ClcNetwork(module)
     clc_network.process_request()
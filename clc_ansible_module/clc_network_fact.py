@@ -33,7 +33,24 @@ description:
   - An Ansible module to retrieve facts about networks in the Centurylink Cloud
 version_added: "2.0"
 options:
-
+  id:
+    description:
+      - The id, name or cidr of the network to retrieve facts for, or an ip address held by the network.
+        The facts of all the networks of the location are returned when id is not provided.
+    required: False
+  location:
+    description:
+      - The datacenter of the networks.
+    required: True
+  fields:
+    description:
+      - A list of dotted paths of the facts to return (ex: cidr). The paths go through
+        lists, and the other facts are left out of the result to shrink it.
+    required: False
+  exclude:
+    description:
+      - A list of dotted paths of the facts to leave out of the result (ex: links).
+    required: False
 
 requirements:
   - python = 2.7
@@ -48,6 +65,12 @@ notes:
       - CLC_V2_API_TOKEN: the API token generated from https://api.ctl.io/v2/authentication/login
       - CLC_ACCT_ALIAS: the account alias associated with CLC
   - Users can set CLC_V2_API_URL to specify an endpoint for pointing to a different CLC environment
+  - Users can set CLC_CACHE_TTL to the number of seconds the network list of a datacenter is cached on disk
+    and shared with the other CLC modules. CLC_CACHE_DIR overrides the default cache directory
+    ~/.ansible/tmp/clc_cache.
+  - Users can set CLC_HTTP_CACHE_TTL to also cache the API responses on disk. The responses with an ETag or a
+    Last-Modified header are revalidated with a conditional GET, the others are reused for
+    CLC_HTTP_CACHE_TTL seconds and can be out of date for that long, so keep it short.
 '''
 
 EXAMPLES = '''
@@ -65,6 +88,11 @@ EXAMPLES = '''
   clc_network_fact:
     id: 10.101.236.0/24
     location: CA3
+
+- name: Retrieve the facts of the network holding an ip address
+  clc_network_fact:
+    id: 10.101.236.12
+    location: CA3
 '''
 
 RETURN = '''
@@ -120,6 +148,12 @@ network:
 
 __version__ = '{version}'
 
+import hashlib
+import re
+import socket
+import struct
+import tempfile
+import time
 from distutils.version import LooseVersion
 
 try:
@@ -139,6 +173,327 @@ else:
     CLC_FOUND = True
 
 
+if REQUESTS_FOUND:
+    class ClcCachingSession(requests.Session):
+        """
+        Requests session with an on disk cache of the GET responses of the CLC API, shared between
+        tasks and between modules. A cached response with an ETag or a Last-Modified validator is
+        revalidated with a conditional GET and reused when the API answers 304 Not Modified, any
+        other cached response is reused for CLC_HTTP_CACHE_TTL seconds. The cache is enabled by
+        setting CLC_HTTP_CACHE_TTL, apart from the catalog caches enabled by CLC_CACHE_TTL, and
+        CLC_CACHE_DIR overrides the default cache directory of ~/.ansible/tmp/clc_cache.
+        The server credentials are never cached.
+        """
+
+        def request(self, method, url, params=None, headers=None, **kwargs):
+            ttl = ClcCachingSession._get_ttl()
+            if method.upper() != 'GET' or ttl <= 0 or not ClcCachingSession._is_cacheable(url):
+                return super(ClcCachingSession, self).request(
+                    method, url, params=params, headers=headers, **kwargs)
+
+            path = ClcCachingSession._get_path(url, params)
+            entry = ClcCachingSession._load(path)
+            headers = dict(headers or {})
+            if entry is not None:
+                if entry.get('etag'):
+                    headers['If-None-Match'] = entry['etag']
+                if entry.get('last_modified'):
+                    headers['If-Modified-Since'] = entry['last_modified']
+                if not entry.get('etag') and not entry.get('last_modified') and \
+                        time.time() - entry.get('timestamp', 0) <= ttl:
+                    return ClcCachingSession._build_response(url, entry)
+
+            response = super(ClcCachingSession, self).request(
+                method, url, params=params, headers=headers, **kwargs)
+            if response.status_code == 304 and entry is not None:
+                return ClcCachingSession._build_response(url, entry)
+            if response.status_code == 200:
+                ClcCachingSession._store(path, {
+                    'timestamp': time.time(),
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified'),
+                    'body': response.text})
+            return response
+
+        @staticmethod
+        def _get_ttl():
+            """
+            Read the cache time to live from the environment
+            :return: the time to live in seconds, 0 when caching is disabled
+            """
+            try:
+                return int(os.environ.get('CLC_HTTP_CACHE_TTL', 0))
+            except ValueError:
+                return 0
+
+        @staticmethod
+        def _is_cacheable(url):
+            """
+            Check whether the response of a url may be stored on disk
+            :param url: the url of the request
+            :return: False for the server credentials, True otherwise
+            """
+            return not url.split('?')[0].rstrip('/').endswith('/credentials')
+
+        @staticmethod
+        def _get_path(url, params):
+            """
+            Build the path of the cache file for a GET request
+            :param url: the url of the request
+            :param params: the query parameters of the request
+            :return: the path of the cache file
+            """
+            cache_dir = os.environ.get('CLC_CACHE_DIR') or os.path.join(
+                os.path.expanduser('~'), '.ansible', 'tmp', 'clc_cache')
+            key = json.dumps([url, params or {}], sort_keys=True)
+            return os.path.join(cache_dir, 'http_%s.json' % hashlib.sha1(key.encode('utf-8')).hexdigest())
+
+        @staticmethod
+        def _load(path):
+            """
+            Load a cached response
+            :param path: the path of the cache file
+            :return: the cached entry, or None when missing or unreadable
+            """
+            try:
+                with open(path) as cache_file:
+                    return json.load(cache_file)
+            except (IOError, OSError, ValueError):
+                return None
+
+        @staticmethod
+        def _store(path, entry):
+            """
+            Store a response in the cache. Failures to write the cache are ignored.
+            :param path: the path of the cache file
+            :param entry: the entry to store
+            :return: none
+            """
+            try:
+                if not os.path.isdir(os.path.dirname(path)):
+                    os.makedirs(os.path.dirname(path))
+                fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+                with os.fdopen(fd, 'w') as cache_file:
+                    json.dump(entry, cache_file)
+                os.rename(tmp_path, path)
+            except (IOError, OSError):
+                pass
+
+        @staticmethod
+        def _build_response(url, entry):
+            """
+            Build a response from a cached entry
+            :param url: the url of the request
+            :param entry: the cached entry
+            :return: the requests.Response
+            """
+            response = requests.models.Response()
+            response.status_code = 200
+            response.url = url
+            response.encoding = 'utf-8'
+            response.headers['Content-Type'] = 'application/json'
+            response._content = entry.get('body', '').encode('utf-8')
+            return response
+
+
+class ClcCatalogCache(object):
+    """
+    On disk cache of CLC API listings, shared between tasks and between modules.
+    It is enabled by setting the CLC_CACHE_TTL environment variable to the number
+    of seconds a listing stays valid.  CLC_CACHE_DIR overrides the default cache
+    directory of ~/.ansible/tmp/clc_cache.
+    """
+
+    @staticmethod
+    def _get_ttl():
+        """
+        Read the cache time to live from the environment
+        :return: the time to live in seconds, 0 when caching is disabled
+        """
+        try:
+            return int(os.environ.get('CLC_CACHE_TTL', 0))
+        except ValueError:
+            return 0
+
+    @staticmethod
+    def _get_path(kind, key):
+        """
+        Build the path of the cache file for a listing
+        :param kind: the kind of listing, e.g. alert_policies
+        :param key: the key of the listing, e.g. the account alias
+        :return: the path of the cache file
+        """
+        cache_dir = os.environ.get('CLC_CACHE_DIR') or os.path.join(
+            os.path.expanduser('~'), '.ansible', 'tmp', 'clc_cache')
+        name = re.sub(r'[^\w.-]', '_', '%s_%s' % (kind, str(key).lower()))
+        return os.path.join(cache_dir, name + '.json')
+
+    @staticmethod
+    def get(kind, key):
+        """
+        Get a listing from the cache
+        :param kind: the kind of listing
+        :param key: the key of the listing
+        :return: the cached list of items, or None when missing or expired
+        """
+        ttl = ClcCatalogCache._get_ttl()
+        if ttl <= 0:
+            return None
+        try:
+            with open(ClcCatalogCache._get_path(kind, key)) as cache_file:
+                entry = json.load(cache_file)
+        except (IOError, OSError, ValueError):
+            return None
+        if time.time() - entry.get('timestamp', 0) > ttl:
+            return None
+        return entry.get('items')
+
+    @staticmethod
+    def put(kind, key, items):
+        """
+        Store a listing in the cache. Failures to write the cache are ignored.
+        :param kind: the kind of listing
+        :param key: the key of the listing
+        :param items: the list of items to store
+        :return: none
+        """
+        if ClcCatalogCache._get_ttl() <= 0:
+            return
+        path = ClcCatalogCache._get_path(kind, key)
+        try:
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, 'w') as cache_file:
+                json.dump({'timestamp': time.time(), 'items': items}, cache_file)
+            os.rename(tmp_path, path)
+        except (IOError, OSError):
+            pass
+
+    @staticmethod
+    def invalidate(kind, key):
+        """
+        Remove a listing from the cache
+        :param kind: the kind of listing
+        :param key: the key of the listing
+        :return: none
+        """
+        try:
+            os.remove(ClcCatalogCache._get_path(kind, key))
+        except (IOError, OSError):
+            pass
+
+
+class ClcNetworkCatalog(object):
+    """
+    Catalog of the networks of a datacenter, indexed by id, name and cidr like the lookups of
+    clc.v2.Networks, with a containment index to find the network holding an ip address.
+    The network listing is shared between tasks through the ClcCatalogCache.
+    """
+
+    def __init__(self, networks):
+        self.networks = list(networks)
+        self.by_id = {}
+        self.by_name = {}
+        self.by_cidr = {}
+        self.by_prefix = {}
+        for network in self.networks:
+            data = network.data or {}
+            self.by_id.setdefault(network.id, network)
+            self.by_name.setdefault(data.get('name'), network)
+            self.by_cidr.setdefault(data.get('cidr'), network)
+            prefix = ClcNetworkCatalog._parse_cidr(data.get('cidr'))
+            if prefix is not None:
+                self.by_prefix.setdefault(prefix, network)
+        self.prefix_lengths = sorted(set([length for _, length in self.by_prefix]), reverse=True)
+
+    @staticmethod
+    def load(alias, location, loader):
+        """
+        Load the network catalog of a datacenter from the cache, or from the CLC API on a miss
+        :param alias: the account alias
+        :param location: the datacenter of the networks
+        :param loader: function returning the clc.v2.Networks of the datacenter
+        :return: the ClcNetworkCatalog of the datacenter
+        """
+        key = '{0}_{1}'.format(alias, location)
+        networks_data = ClcCatalogCache.get('networks', key)
+        if networks_data is not None:
+            return ClcNetworkCatalog(
+                [clc_sdk.v2.Network(network['id'], alias=alias, network_obj=network)
+                 for network in networks_data])
+        networks = loader().networks
+        ClcCatalogCache.put('networks', key, [network.data for network in networks])
+        return ClcNetworkCatalog(networks)
+
+    @staticmethod
+    def invalidate(alias, location):
+        """
+        Drop the cached network catalog of a datacenter
+        :param alias: the account alias
+        :param location: the datacenter of the networks
+        :return: none
+        """
+        ClcCatalogCache.invalidate('networks', '{0}_{1}'.format(alias, location))
+
+    def Get(self, key):
+        """
+        Get a network by id, name or cidr, the same way clc.v2.Networks.Get does
+        :param key: the id, name or cidr of the network
+        :return: clc-sdk.Network, or None when no network matches
+        """
+        for index in (self.by_id, self.by_name, self.by_cidr):
+            if key in index:
+                return index[key]
+        return None
+
+    def find_by_ip(self, ip_address):
+        """
+        Find the network holding an ip address, the most specific network first
+        :param ip_address: the ip address (ex: '10.101.216.12')
+        :return: clc-sdk.Network, or None when no network holds the address
+        """
+        address = ClcNetworkCatalog._ip_to_int(ip_address)
+        if address is None:
+            return None
+        for length in self.prefix_lengths:
+            mask = (0xffffffff << (32 - length)) & 0xffffffff
+            network = self.by_prefix.get((address & mask, length))
+            if network is not None:
+                return network
+        return None
+
+    @staticmethod
+    def _parse_cidr(cidr):
+        """
+        Parse a cidr block into its network address and prefix length
+        :param cidr: the cidr block (ex: '10.101.216.0/24')
+        :return: the (address, prefix length) tuple, or None when cidr is not a valid block
+        """
+        try:
+            address, length = cidr.split('/')
+            length = int(length)
+        except (AttributeError, ValueError):
+            return None
+        address = ClcNetworkCatalog._ip_to_int(address)
+        if address is None or not 0 <= length <= 32:
+            return None
+        mask = (0xffffffff << (32 - length)) & 0xffffffff
+        return address & mask, length
+
+    @staticmethod
+    def _ip_to_int(ip_address):
+        """
+        Convert a dotted ipv4 address to an integer
+        :param ip_address: the ip address
+        :return: the address as an integer, or None when ip_address is not an ipv4 address
+        """
+        try:
+            return struct.unpack('!I', socket.inet_aton(ip_address))[0]
+        except (socket.error, TypeError, UnicodeError):
+            return None
+
+
 class ClcNetworkFact(object):
 
     def __init__(self, module):
@@ -167,7 +522,7 @@ class ClcNetworkFact(object):
     def _set_user_agent(clc):
         if hasattr(clc, 'SetRequestsSession'):
             agent_string = "ClcAnsibleModule/" + __version__
-            ses = requests.Session()
+            ses = ClcCachingSession()
             ses.headers.update({"Api-Client": agent_string})
             ses.headers['User-Agent'] += " " + agent_string
             clc.SetRequestsSession(ses)
@@ -184,18 +539,28 @@ class ClcNetworkFact(object):
 
         self.networks = self._get_clc_networks(params.get('location'))
         requested = params.get('id', None)
+        fields = params.get('fields')
+        exclude = params.get('exclude')
         if requested == None:
-            self.module.exit_json(networks=[n.data for n in self.networks.networks])
+            self.module.exit_json(networks=self._project_fields(
+                [n.data for n in self.networks.networks], fields, exclude))
         else:
-            network = self.networks.Get(requested)
+            network = self.networks.Get(requested) or self.networks.find_by_ip(requested)
             if network is None:
                 return self.module.fail_json(msg='Network: "{0}" does not exist'.format(requested))
-            self.module.exit_json(network=network.data)
+            self.module.exit_json(network=self._project_fields(network.data, fields, exclude))
 
     def _get_clc_networks(self, location):
+        """
+        Load the networks of a datacenter
+        :param location: the datacenter of the networks
+        :return: the ClcNetworkCatalog of the datacenter
+        """
         result = None
         try:
-            result = self.clc.v2.Networks(location=location)
+            alias = self.clc.v2.Account.GetAlias()
+            result = ClcNetworkCatalog.load(
+                alias, location, lambda: self.clc.v2.Networks(alias=alias, location=location))
         except self.clc.CLCException as ex:
                 self.module.fail_json(msg='Unable to fetch networks for location {0}. {1}'.format(
                     location, ex.message
@@ -210,10 +575,68 @@ class ClcNetworkFact(object):
         """
         argument_spec = dict(
             id=dict(required=False),
-            location=dict(required=True)
+            location=dict(required=True),
+            fields=dict(type='list', required=False),
+            exclude=dict(type='list', required=False)
         )
         return argument_spec
 
+    @staticmethod
+    def _project_fields(document, fields=None, exclude=None):
+        """
+        Project a document returned by the CLC API on dotted paths. The paths go through lists,
+        so 'details.ipAddresses.internal' keeps the internal address of every ip address.
+        :param document: the dictionary or list to project
+        :param fields: the list of dotted paths to keep, None to keep the whole document
+        :param exclude: the list of dotted paths to remove
+        :return: the projected document
+        """
+        if fields:
+            document = ClcNetworkFact._select_fields(document, [field.split('.') for field in fields])
+        for field in exclude or []:
+            ClcNetworkFact._exclude_field(document, field.split('.'))
+        return document
+
+    @staticmethod
+    def _select_fields(document, paths):
+        """
+        Copy the parts of a document found at a list of paths
+        :param document: the dictionary or list to copy from
+        :param paths: the list of paths, as lists of keys
+        :return: the copy of the selected parts of the document
+        """
+        if isinstance(document, list):
+            return [ClcNetworkFact._select_fields(item, paths) for item in document]
+        if not isinstance(document, dict):
+            return document
+        result = {}
+        for key in set([path[0] for path in paths]):
+            if key not in document:
+                continue
+            subpaths = [path[1:] for path in paths if path[0] == key]
+            if [] in subpaths:
+                result[key] = document[key]
+            else:
+                result[key] = ClcNetworkFact._select_fields(document[key], subpaths)
+        return result
+
+    @staticmethod
+    def _exclude_field(document, path):
+        """
+        Remove the parts of a document found at a path
+        :param document: the dictionary or list to remove from
+        :param path: the path, as a list of keys
+        :return: none
+        """
+        if isinstance(document, list):
+            for item in document:
+                ClcNetworkFact._exclude_field(item, path)
+        elif isinstance(document, dict) and path[0] in document:
+            if len(path) == 1:
+                del document[path[0]]
+            else:
+                ClcNetworkFact._exclude_field(document[path[0]], path[1:])
+
     def _set_clc_credentials_from_env(self):
         """
         Set the CLC Credentials on the sdk by reading environment variables
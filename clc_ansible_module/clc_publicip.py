@@ -54,6 +54,13 @@ options:
         The IP range allowed to access the public IP should be specified using CIDR notation.
     required: False
     default: None
+  reconcile:
+    description:
+      - Whether to update the existing public ips of the servers in place when their ports or source restrictions
+        differ from the requested ones. Each drifted public ip is updated with a single request.
+    choices: [ True, False ]
+    default: False
+    required: False
   state:
     description:
       - Determine whether to create or delete public IPs. If present module will not create a second public ip if one
@@ -67,6 +74,11 @@ options:
     choices: [ True, False ]
     default: True
     required: False
+  parallelism:
+    description:
+      - The maximum number of servers whose public ips are loaded, added or removed at the same time.
+    default: 10
+    required: False
 requirements:
     - python = 2.7
     - requests >= 2.5.0
@@ -106,6 +118,25 @@ EXAMPLES = '''
     - name: debug
       debug: var=clc
 
+- name: Reconcile the ports and source restrictions of existing Public IPs
+  hosts: localhost
+  gather_facts: False
+  connection: local
+  tasks:
+    - name: Reconcile Public IP For Servers
+      clc_publicip:
+        protocol: 'TCP'
+        ports:
+            - 443
+        source_restrictions:
+            - 10.0.0.0/8
+        server_ids:
+            - UC1TEST-SVR01
+            - UC1TEST-SVR02
+        reconcile: True
+        state: present
+      register: clc
+
 - name: Delete Public IP from Server
   hosts: localhost
   gather_facts: False
@@ -143,6 +174,7 @@ server_ids:
 __version__ = '${version}'
 
 from distutils.version import LooseVersion
+from multiprocessing.pool import ThreadPool
 
 try:
     import requests
@@ -165,6 +197,47 @@ else:
     CLC_FOUND = True
 
 
+if REQUESTS_FOUND:
+    class ClcRequestsSession(requests.Session):
+        """
+        Requests session that sets the content type of each request from its payload.
+        The clc-sdk sets the content type on the shared session headers before every call,
+        which is not safe when the session is used by several threads at the same time.
+        """
+
+        def request(self, method, url, data=None, headers=None, **kwargs):
+            headers = dict(headers or {})
+            if isinstance(data, basestring):
+                headers.setdefault('content-type', 'Application/json')
+            else:
+                headers.setdefault('content-type', 'application/x-www-form-urlencoded')
+            return super(ClcRequestsSession, self).request(
+                method, url, data=data, headers=headers, **kwargs)
+
+
+class ClcTaskFailure(Exception):
+    """
+    Raised in place of fail_json while a server is handled on a worker thread
+    """
+    pass
+
+
+class ClcWorkerModule(object):
+    """
+    Wraps the AnsibleModule used by worker threads, so a failure is raised to the worker
+    instead of exiting the module from a thread
+    """
+
+    def __init__(self, module):
+        self._module = module
+
+    def __getattr__(self, name):
+        return getattr(self._module, name)
+
+    def fail_json(self, **kwargs):
+        raise ClcTaskFailure(kwargs.get('msg'))
+
+
 class ClcPublicIp(object):
     clc = clc_sdk
     module = None
@@ -197,11 +270,13 @@ class ClcPublicIp(object):
         ports = params['ports']
         protocol = params['protocol']
         restrictions = params.get('source_restrictions')
+        reconcile = params.get('reconcile')
         state = params['state']
 
         if state == 'present':
             changed, changed_server_ids, requests = self.ensure_public_ip_present(
-                server_ids=server_ids, protocol=protocol, ports=ports, source_restrictions=restrictions)
+                server_ids=server_ids, protocol=protocol, ports=ports, source_restrictions=restrictions,
+                reconcile=reconcile)
         elif state == 'absent':
             changed, changed_server_ids, requests = self.ensure_public_ip_absent(
                 server_ids=server_ids)
@@ -222,18 +297,21 @@ class ClcPublicIp(object):
             protocol=dict(default='TCP', choices=['TCP', 'UDP', 'ICMP']),
             ports=dict(type='list'),
             source_restrictions=dict(type='list'),
+            reconcile=dict(type='bool', default=False),
             wait=dict(type='bool', default=True),
+            parallelism=dict(type='int', default=10),
             state=dict(default='present', choices=['present', 'absent']),
         )
         return argument_spec
 
-    def ensure_public_ip_present(self, server_ids, protocol, ports, source_restrictions=None):
+    def ensure_public_ip_present(self, server_ids, protocol, ports, source_restrictions=None, reconcile=False):
         """
         Ensures the given server ids having the public ip available
         :param server_ids: the list of server ids
         :param protocol: the ip protocol
         :param ports: the list of ports to expose
         :param source_restrictions: The list of IP range allowed to access the public IP, specified using CIDR notation.
+        :param reconcile: A flag indicating if existing public ips are updated to the requested ports and restrictions
         :return: (changed, changed_server_ids, results)
                   changed: A flag indicating if there is any change
                   changed_server_ids : the list of server ids that are changed
@@ -251,24 +329,131 @@ class ClcPublicIp(object):
         servers = self._get_servers_from_clc(
             server_ids,
             'Failed to obtain server list from the CLC API')
-        servers_to_change = [
-            server for server in servers if len(
-                server.PublicIPs().public_ips) == 0]
+        public_ip_state = self._get_public_ip_state(servers)
         ports_to_expose = [{'protocol': protocol, 'port': port}
                            for port in ports]
 
         ports_to_expose.append({'protocol': 'ICMP', 'port':0})
         if source_restrictions:
             restrictions_list = [{'cidr': cidr} for cidr in source_restrictions]
-        for server in servers_to_change:
-            if not self.module.check_mode:
-                result = self._add_publicip_to_server(server, ports_to_expose, source_restrictions=restrictions_list)
-                results.append(result)
-            changed_server_ids.append(server.id)
+
+        drifted_public_ips = {}
+        if reconcile:
+            servers_with_ips = [
+                (server, public_ips) for server, public_ips in public_ip_state
+                if len(public_ips) > 0]
+            drift = self._run_in_parallel(
+                lambda item: self._get_drifted_public_ips(
+                    item[1], ports_to_expose, restrictions_list),
+                servers_with_ips,
+                self.module.params.get('parallelism'))
+            for (server, public_ips), drifted in zip(servers_with_ips, drift):
+                if drifted:
+                    drifted_public_ips[server.id] = drifted
+
+        # a server without public ip gets a new one, a drifted server gets its public ips updated
+        servers_to_change = [
+            (server, drifted_public_ips.get(server.id)) for server, public_ips in public_ip_state
+            if len(public_ips) == 0 or server.id in drifted_public_ips]
+        if servers_to_change:
             changed = True
+            changed_server_ids = [server.id for server, drifted in servers_to_change]
+            if not self.module.check_mode:
+                results = self._submit_public_ip_requests(
+                    servers_to_change,
+                    lambda item: self._apply_public_ip_change(
+                        item[0], item[1], ports_to_expose, restrictions_list))
         return changed, changed_server_ids, results
 
+    def _apply_public_ip_change(self, server, drifted_public_ips, ports_to_expose, source_restrictions):
+        """
+        Adds a public ip to a server, or updates its drifted public ips
+        :param server: the CLC server object
+        :param drifted_public_ips: the public ips to update, or None to add a public ip
+        :param ports_to_expose: the list of ports to expose
+        :param source_restrictions: the list of source restrictions
+        :return: the list of requests from the CLC API
+        """
+        if drifted_public_ips is None:
+            return [self._add_publicip_to_server(
+                server, ports_to_expose, source_restrictions=source_restrictions)]
+        return [self._update_public_ip(server, public_ip, ports_to_expose, source_restrictions)
+                for public_ip in drifted_public_ips]
+
+    @staticmethod
+    def _get_drifted_public_ips(public_ips, ports_to_expose, source_restrictions):
+        """
+        Finds the public ips whose ports or source restrictions differ from the requested ones
+        :param public_ips: the public ips of a server
+        :param ports_to_expose: the list of ports to expose
+        :param source_restrictions: the list of source restrictions
+        :return: the list of drifted public ips
+        """
+        desired_ports = set(
+            ClcPublicIp._get_port_key(port['protocol'], port['port'], port.get('port_to'))
+            for port in ports_to_expose)
+        desired_cidrs = set(restriction['cidr'] for restriction in source_restrictions or [])
+        drifted = []
+        for public_ip in public_ips:
+            current_ports = set(
+                ClcPublicIp._get_port_key(port.protocol, port.port, port.port_to)
+                for port in public_ip.ports)
+            current_cidrs = set(restriction.cidr for restriction in public_ip.source_restrictions)
+            if current_ports != desired_ports or current_cidrs != desired_cidrs:
+                drifted.append(public_ip)
+        return drifted
+
+    @staticmethod
+    def _get_port_key(protocol, port, port_to=None):
+        """
+        Normalizes a port definition so requested and existing ports can be compared
+        :param protocol: the ip protocol
+        :param port: the port
+        :param port_to: the end of the port range, if any
+        :return: the (protocol, port, port_to) tuple
+        """
+        return (str(protocol).upper(),
+                int(port),
+                int(port_to) if port_to is not None else None)
+
+    def _update_public_ip(self, server, public_ip, ports_to_expose, source_restrictions):
+        """
+        Updates the ports and source restrictions of a public ip with a single request
+        :param server: the CLC server object
+        :param public_ip: the public ip to update
+        :param ports_to_expose: the list of ports to expose
+        :param source_restrictions: the list of source restrictions
+        :return: the update request from the CLC API
+        """
+        result = None
+        ports = []
+        for port in ports_to_expose:
+            payload_port = {'protocol': port['protocol'], 'port': port['port']}
+            if port.get('port_to') is not None:
+                payload_port['portTo'] = port['port_to']
+            ports.append(payload_port)
+        try:
+            result = self.clc.v2.Requests(
+                self.clc.v2.API.Call(
+                    'PUT',
+                    'servers/%s/%s/publicIPAddresses/%s' % (server.alias, server.id, public_ip.id),
+                    json.dumps({'ports': ports,
+                                'sourceRestrictions': source_restrictions or []})),
+                alias=server.alias)
+        except CLCException as ex:
+            self.module.fail_json(msg='Failed to update public ip {0} on the server : {1}. {2}'.format(
+                public_ip.id, server.id, ex.response_text
+            ))
+        return result
+
     def _add_publicip_to_server(self, server, ports_to_expose, source_restrictions=None):
+        """
+        Adds a public ip to a server
+        :param server: the CLC server object
+        :param ports_to_expose: the list of ports to expose
+        :param source_restrictions: the list of source restrictions
+        :return: the add request from the CLC API
+        """
         result = None
         try:
             result = server.PublicIPs().Add(ports=ports_to_expose, source_restrictions=source_restrictions)
@@ -294,26 +479,111 @@ class ClcPublicIp(object):
             server_ids,
             'Failed to obtain server list from the CLC API')
         servers_to_change = [
-            server for server in servers if len(
-                server.PublicIPs().public_ips) > 0]
-        for server in servers_to_change:
-            if not self.module.check_mode:
-                result = self._remove_publicip_from_server(server)
-                results.append(result)
-            changed_server_ids.append(server.id)
+            (server, public_ips) for server, public_ips in self._get_public_ip_state(servers)
+            if len(public_ips) > 0]
+        if servers_to_change:
             changed = True
+            changed_server_ids = [server.id for server, public_ips in servers_to_change]
+            if not self.module.check_mode:
+                results = self._submit_public_ip_requests(
+                    servers_to_change,
+                    lambda item: self._remove_publicip_from_server(*item))
         return changed, changed_server_ids, results
 
-    def _remove_publicip_from_server(self, server):
-        result = None
+    def _remove_publicip_from_server(self, server, public_ips=None):
+        """
+        Removes the public ips of a server
+        :param server: the CLC server object
+        :param public_ips: the public ips already loaded for the server
+        :return: the list of delete requests from the CLC API
+        """
+        results = []
+        if public_ips is None:
+            public_ips = server.PublicIPs().public_ips
         try:
-            for ip_address in server.PublicIPs().public_ips:
-                    result = ip_address.Delete()
+            for ip_address in list(public_ips):
+                results.append(ip_address.Delete())
         except CLCException as ex:
             self.module.fail_json(msg='Failed to remove public ip from the server : {0}. {1}'.format(
                 server.id, ex.response_text
             ))
-        return result
+        return results
+
+    def _get_public_ip_state(self, servers):
+        """
+        Loads the public ips of every server once, on a bounded pool of threads
+        :param servers: the list of CLC server objects
+        :return: the list of (server, public_ips) tuples, in the order of servers
+        """
+        public_ips = self._run_in_parallel(
+            self._load_public_ips,
+            servers,
+            self.module.params.get('parallelism'))
+        return zip(servers, public_ips)
+
+    @staticmethod
+    def _load_public_ips(server):
+        """
+        Loads the public ips of a single server on a worker thread
+        :param server: the CLC server object
+        :return: the list of public ip objects of the server
+        """
+        return list(server.PublicIPs().public_ips)
+
+    def _submit_public_ip_requests(self, items, submit):
+        """
+        Submits the public ip requests of every server on a bounded pool of threads
+        :param items: the list of servers, or of (server, public_ips) tuples, to change
+        :param submit: the function submitting the requests of an item, returning a list of requests
+        :return: the list of clc request objects from the CLC API calls
+        """
+        module = self.module
+        self.module = ClcWorkerModule(module)
+        try:
+            results = self._run_in_parallel(
+                lambda item: self._submit_public_ip_request(item, submit),
+                items,
+                module.params.get('parallelism'))
+        finally:
+            self.module = module
+
+        errors = [error for requests_lst, error in results if error]
+        if errors:
+            return self.module.fail_json(msg=' '.join(errors))
+        return [request for requests_lst, error in results
+                for request in requests_lst if request]
+
+    @staticmethod
+    def _submit_public_ip_request(item, submit):
+        """
+        Submits the public ip requests of a single server on a worker thread
+        :param item: the server, or (server, public_ips) tuple, to change
+        :param submit: the function submitting the requests of the item
+        :return: (requests, error)
+        """
+        try:
+            return submit(item), None
+        except ClcTaskFailure as ex:
+            return [], str(ex)
+
+    @staticmethod
+    def _run_in_parallel(func, items, parallelism):
+        """
+        Calls func for every item on a bounded pool of threads
+        :param func: the function to call with each item
+        :param items: the list of items to process
+        :param parallelism: the maximum number of concurrent calls
+        :return: the list of results, in the same order as items
+        """
+        items = list(items)
+        if not parallelism or parallelism < 2 or len(items) < 2:
+            return [func(item) for item in items]
+        pool = ThreadPool(min(parallelism, len(items)))
+        try:
+            return pool.map(func, items)
+        finally:
+            pool.close()
+            pool.join()
 
     def _wait_for_requests_to_complete(self, requests_lst):
         """
@@ -371,7 +641,7 @@ class ClcPublicIp(object):
     def _set_user_agent(clc):
         if hasattr(clc, 'SetRequestsSession'):
             agent_string = "ClcAnsibleModule/" + __version__
-            ses = requests.Session()
+            ses = ClcRequestsSession()
             ses.headers.update({"Api-Client": agent_string})
             ses.headers['User-Agent'] += " " + agent_string
             clc.SetRequestsSession(ses)
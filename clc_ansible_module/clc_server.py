@@ -119,7 +119,8 @@ options:
     required: False
   group:
     description:
-      - The Server Group to create servers under.
+      - The Server Group to create servers under. The group can be given by id, by name or by its full
+        path (ex: 'Default Group/web') when several groups share its name.
     default: 'Default Group'
     required: False
   ip_address:
@@ -150,7 +151,7 @@ options:
     required: False
   network_id:
     description:
-      - The network UUID on which to create servers.
+      - The network UUID on which to create servers. The network can also be given by name or by cidr.
     default: None
     required: False
   packages:
@@ -242,6 +243,19 @@ options:
     default: True
     required: False
     choices: [True, False]
+  batch_size:
+    description:
+      - When starting or stopping servers, change the power state in waves of this many servers.
+        Each wave is waited for before the next wave starts, so wait must be true when it is
+        set. By default all the servers are changed in one wave.
+    default: None
+    required: False
+  max_failures:
+    description:
+      - The number of servers that may fail to change power state before the remaining waves
+        are aborted when batch_size is set. The task fails if any server failed.
+    default: 0
+    required: False
 requirements:
     - python = 2.7
     - requests >= 2.5.0
@@ -257,6 +271,9 @@ notes:
           - CLC_V2_API_TOKEN, the API token generated from https://api.ctl.io/v2/authentication/login
           - CLC_ACCT_ALIAS, the account alias associated with the centurylink cloud
     - Users can set CLC_V2_API_URL to specify an endpoint for pointing to a different CLC environment.
+    - Users can set CLC_CACHE_TTL to the number of seconds the policy and network lists of an account are cached on disk
+      and shared with the other CLC modules. CLC_CACHE_DIR overrides the default cache directory
+      ~/.ansible/tmp/clc_cache.
 '''
 
 EXAMPLES = '''
@@ -508,12 +525,41 @@ servers:
               "type":"standard"
            }
         ]
+plan:
+    description: The changes the task would make, returned in check mode. create holds the number and
+                 configuration of the servers to provision, delete the ids of the servers to delete and
+                 power the power state changes.
+    returned: check mode
+    type: dict
+    sample:
+        {
+            "create": {
+                "count": 2,
+                "name": "test",
+                "template": "UBUNTU-14-64-TEMPLATE",
+                "type": "standard",
+                "group": "86d7a3d7f1d34fe1b2cc9d49a1a1e3f1",
+                "location": "UC1",
+                "cpu": 1,
+                "memory": 1
+            },
+            "delete": [],
+            "power": [
+                {"id": "UC1TEST-SVR01", "before": "stopped", "after": "started"}
+            ]
+        }
 '''
 
 __version__ = '${version}'
 
+import re
+import socket
+import struct
+import tempfile
+import time
 from time import sleep
 from distutils.version import LooseVersion
+from multiprocessing.pool import ThreadPool
 
 try:
     import requests
@@ -537,6 +583,295 @@ else:
     CLC_FOUND = True
 
 
+class ClcCatalogCache(object):
+    """
+    On disk cache of CLC API listings, shared between tasks and between modules.
+    It is enabled by setting the CLC_CACHE_TTL environment variable to the number
+    of seconds a listing stays valid.  CLC_CACHE_DIR overrides the default cache
+    directory of ~/.ansible/tmp/clc_cache.
+    """
+
+    @staticmethod
+    def _get_ttl():
+        """
+        Read the cache time to live from the environment
+        :return: the time to live in seconds, 0 when caching is disabled
+        """
+        try:
+            return int(os.environ.get('CLC_CACHE_TTL', 0))
+        except ValueError:
+            return 0
+
+    @staticmethod
+    def _get_path(kind, key):
+        """
+        Build the path of the cache file for a listing
+        :param kind: the kind of listing, e.g. alert_policies
+        :param key: the key of the listing, e.g. the account alias
+        :return: the path of the cache file
+        """
+        cache_dir = os.environ.get('CLC_CACHE_DIR') or os.path.join(
+            os.path.expanduser('~'), '.ansible', 'tmp', 'clc_cache')
+        name = re.sub(r'[^\w.-]', '_', '%s_%s' % (kind, str(key).lower()))
+        return os.path.join(cache_dir, name + '.json')
+
+    @staticmethod
+    def get(kind, key):
+        """
+        Get a listing from the cache
+        :param kind: the kind of listing
+        :param key: the key of the listing
+        :return: the cached list of items, or None when missing or expired
+        """
+        ttl = ClcCatalogCache._get_ttl()
+        if ttl <= 0:
+            return None
+        try:
+            with open(ClcCatalogCache._get_path(kind, key)) as cache_file:
+                entry = json.load(cache_file)
+        except (IOError, OSError, ValueError):
+            return None
+        if time.time() - entry.get('timestamp', 0) > ttl:
+            return None
+        return entry.get('items')
+
+    @staticmethod
+    def put(kind, key, items):
+        """
+        Store a listing in the cache. Failures to write the cache are ignored.
+        :param kind: the kind of listing
+        :param key: the key of the listing
+        :param items: the list of items to store
+        :return: none
+        """
+        if ClcCatalogCache._get_ttl() <= 0:
+            return
+        path = ClcCatalogCache._get_path(kind, key)
+        try:
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, 'w') as cache_file:
+                json.dump({'timestamp': time.time(), 'items': items}, cache_file)
+            os.rename(tmp_path, path)
+        except (IOError, OSError):
+            pass
+
+    @staticmethod
+    def invalidate(kind, key):
+        """
+        Remove a listing from the cache
+        :param kind: the kind of listing
+        :param key: the key of the listing
+        :return: none
+        """
+        try:
+            os.remove(ClcCatalogCache._get_path(kind, key))
+        except (IOError, OSError):
+            pass
+
+
+class ClcNetworkCatalog(object):
+    """
+    Catalog of the networks of a datacenter, indexed by id, name and cidr like the lookups of
+    clc.v2.Networks, with a containment index to find the network holding an ip address.
+    The network listing is shared between tasks through the ClcCatalogCache.
+    """
+
+    def __init__(self, networks):
+        self.networks = list(networks)
+        self.by_id = {}
+        self.by_name = {}
+        self.by_cidr = {}
+        self.by_prefix = {}
+        for network in self.networks:
+            data = network.data or {}
+            self.by_id.setdefault(network.id, network)
+            self.by_name.setdefault(data.get('name'), network)
+            self.by_cidr.setdefault(data.get('cidr'), network)
+            prefix = ClcNetworkCatalog._parse_cidr(data.get('cidr'))
+            if prefix is not None:
+                self.by_prefix.setdefault(prefix, network)
+        self.prefix_lengths = sorted(set([length for _, length in self.by_prefix]), reverse=True)
+
+    @staticmethod
+    def load(alias, location, loader):
+        """
+        Load the network catalog of a datacenter from the cache, or from the CLC API on a miss
+        :param alias: the account alias
+        :param location: the datacenter of the networks
+        :param loader: function returning the clc.v2.Networks of the datacenter
+        :return: the ClcNetworkCatalog of the datacenter
+        """
+        key = '{0}_{1}'.format(alias, location)
+        networks_data = ClcCatalogCache.get('networks', key)
+        if networks_data is not None:
+            return ClcNetworkCatalog(
+                [clc_sdk.v2.Network(network['id'], alias=alias, network_obj=network)
+                 for network in networks_data])
+        networks = loader().networks
+        ClcCatalogCache.put('networks', key, [network.data for network in networks])
+        return ClcNetworkCatalog(networks)
+
+    @staticmethod
+    def invalidate(alias, location):
+        """
+        Drop the cached network catalog of a datacenter
+        :param alias: the account alias
+        :param location: the datacenter of the networks
+        :return: none
+        """
+        ClcCatalogCache.invalidate('networks', '{0}_{1}'.format(alias, location))
+
+    def Get(self, key):
+        """
+        Get a network by id, name or cidr, the same way clc.v2.Networks.Get does
+        :param key: the id, name or cidr of the network
+        :return: clc-sdk.Network, or None when no network matches
+        """
+        for index in (self.by_id, self.by_name, self.by_cidr):
+            if key in index:
+                return index[key]
+        return None
+
+    def find_by_ip(self, ip_address):
+        """
+        Find the network holding an ip address, the most specific network first
+        :param ip_address: the ip address (ex: '10.101.216.12')
+        :return: clc-sdk.Network, or None when no network holds the address
+        """
+        address = ClcNetworkCatalog._ip_to_int(ip_address)
+        if address is None:
+            return None
+        for length in self.prefix_lengths:
+            mask = (0xffffffff << (32 - length)) & 0xffffffff
+            network = self.by_prefix.get((address & mask, length))
+            if network is not None:
+                return network
+        return None
+
+    @staticmethod
+    def _parse_cidr(cidr):
+        """
+        Parse a cidr block into its network address and prefix length
+        :param cidr: the cidr block (ex: '10.101.216.0/24')
+        :return: the (address, prefix length) tuple, or None when cidr is not a valid block
+        """
+        try:
+            address, length = cidr.split('/')
+            length = int(length)
+        except (AttributeError, ValueError):
+            return None
+        address = ClcNetworkCatalog._ip_to_int(address)
+        if address is None or not 0 <= length <= 32:
+            return None
+        mask = (0xffffffff << (32 - length)) & 0xffffffff
+        return address & mask, length
+
+    @staticmethod
+    def _ip_to_int(ip_address):
+        """
+        Convert a dotted ipv4 address to an integer
+        :param ip_address: the ip address
+        :return: the address as an integer, or None when ip_address is not an ipv4 address
+        """
+        try:
+            return struct.unpack('!I', socket.inet_aton(ip_address))[0]
+        except (socket.error, TypeError, UnicodeError):
+            return None
+
+
+class ClcGroupIndex(object):
+    """
+    Index of a tree of groups by full path, by id and by name. The path of a group is made of
+    the names of its ancestors below the top of the tree and its own name, joined with '/'.
+    Lookups are case insensitive unless case_sensitive is set, and a name shared by several
+    groups resolves to the shallowest of them, then to the first path in alphabetical order.
+    """
+
+    def __init__(self, case_sensitive=False):
+        self.case_sensitive = case_sensitive
+        self.by_path = {}
+        self.by_id = {}
+        self.paths_by_name = {}
+
+    def _key(self, value):
+        """
+        Normalize a path, id or name into an index key
+        :param value: the path, id or name
+        :return: the index key
+        """
+        key = '%s' % value
+        return key if self.case_sensitive else key.lower()
+
+    def add(self, path, group, parent):
+        """
+        Add a group to the index
+        :param path: the full path of the group
+        :param group: clc_sdk.Group - the group
+        :param parent: clc_sdk.Group - the parent group, None for the top of the tree
+        :return: none
+        """
+        entry = (group, parent)
+        path = self._key(path)
+        self.by_path[path] = entry
+        self.by_id[self._key(group.id)] = entry
+        self.paths_by_name.setdefault(self._key(group.name), []).append(path)
+
+    def add_tree(self, group, parent=None, path='', default_only=False):
+        """
+        Add a group and all its subgroups to the index. The subgroups get their paths below
+        path, so the root group of a datacenter is added with an empty path and its top level
+        groups are keyed by their own names.
+        :param group: clc_sdk.Group - the top group of the tree
+        :param parent: clc_sdk.Group - the parent of the top group
+        :param path: the full path of the top group
+        :param default_only: whether to skip the groups that are not of the default type
+        :return: none
+        """
+        self.add(path or '%s' % group.name, group, parent)
+        for subgroup in group.Subgroups().groups:
+            if default_only and subgroup.type != 'default':
+                continue
+            subgroup_path = '/'.join([name for name in (path, '%s' % subgroup.name) if name])
+            self.add_tree(subgroup, group, subgroup_path, default_only)
+
+    def find(self, key, parent=None):
+        """
+        Find the groups matching an id, a full path or a name
+        :param key: the id, full path or name of the group
+        :param parent: clc_sdk.Group - the parent the groups must have, if any
+        :return: the list of (group, parent) tuples, the best match first
+        """
+        key = self._key(key)
+        entries = []
+        if key in self.by_id:
+            entries.append(self.by_id[key])
+        if key in self.by_path:
+            entries.append(self.by_path[key])
+        for path in sorted(self.paths_by_name.get(key, []),
+                           key=lambda path: (path.count('/'), path)):
+            entries.append(self.by_path[path])
+        result = []
+        for entry in entries:
+            if entry in result:
+                continue
+            if parent is not None and (entry[1] is None or entry[1].id != parent.id):
+                continue
+            result.append(entry)
+        return result
+
+    def get(self, key, parent=None):
+        """
+        Get the best group matching an id, a full path or a name
+        :param key: the id, full path or name of the group
+        :param parent: clc_sdk.Group - the parent the group must have, if any
+        :return: the (group, parent) tuple, or None when no group matches
+        """
+        entries = self.find(key, parent)
+        return entries[0] if entries else None
+
+
 class ClcServer(object):
     clc = clc_sdk
 
@@ -571,6 +906,16 @@ class ClcServer(object):
         server_dict_array = []
 
         self._set_clc_credentials_from_env()
+        if self.module.check_mode:
+            changed, plan = self._plan_request(self.module, self.clc)
+            return self.module.exit_json(
+                changed=changed,
+                server_ids=[],
+                group=None,
+                partially_created_server_ids=[],
+                servers=[],
+                plan=plan)
+
         self.module.params = self._validate_module_params(
             self.clc,
             self.module)
@@ -703,7 +1048,9 @@ class ClcServer(object):
             public_ip_ports=dict(type='list', default=[]),
             configuration_id=dict(default=None),
             os_type=dict(),
-            wait=dict(type='bool', default=True))
+            wait=dict(type='bool', default=True),
+            batch_size=dict(type='int', default=None),
+            max_failures=dict(type='int', default=0))
 
         mutually_exclusive = [
             ['exact_count', 'count'],
@@ -1024,7 +1371,9 @@ class ClcServer(object):
         # Validates provided network id
         # Allows lookup of network by id, name, or cidr notation
         if network_id:
-          network_id = datacenter.Networks(forced_load=True).Get(network_id).id
+            networks = ClcNetworkCatalog.load(
+                datacenter.alias, datacenter.location, lambda: datacenter.Networks(forced_load=True))
+            network_id = networks.Get(network_id).id
 
         if not network_id:
             try:
@@ -1192,60 +1541,126 @@ class ClcServer(object):
         partial_servers_ids = []
         changed_server_ids = []
 
-        # fail here if the exact count was specified without filtering
-        # on a group, as this may lead to a undesired removal of instances
-        if exact_count and count_group is None:
-            return module.fail_json(
-                msg="you must use the 'count_group' option with exact_count")
-
-        if min_count and count_group is None:
-            return module.fail_json(
-                msg="you must use the 'count_group' option with min_count")
-
-        if max_count and count_group is None:
-            return module.fail_json(
-                msg="you must use the 'count_group option with max_count")
+        count_group_error = self._get_count_group_error(p)
+        if count_group_error:
+            return module.fail_json(msg=count_group_error)
 
         servers, running_servers = self._find_running_servers_by_group(
             module, datacenter, count_group)
 
-        if exact_count:
-            if len(running_servers) < exact_count:
-                to_create = exact_count - len(running_servers)
-                server_dict_array, changed_server_ids, partial_servers_ids, changed \
-                    = self._create_servers(module, clc, override_count=to_create)
+        to_create, remove_ids = self._get_count_changes(
+            [server.id for server in running_servers], exact_count, min_count, max_count)
+        if to_create > 0:
+            server_dict_array, changed_server_ids, partial_servers_ids, changed \
+                = self._create_servers(module, clc, override_count=to_create)
+        elif remove_ids:
+            changed, server_dict_array, changed_server_ids \
+                = self._delete_servers(module, clc, remove_ids)
 
-                for server in server_dict_array:
-                    running_servers.append(server)
-
-            elif len(running_servers) > exact_count:
-                to_remove = len(running_servers) - exact_count
-                all_server_ids = sorted([x.id for x in running_servers])
-                remove_ids = all_server_ids[0:to_remove]
-
-                (changed, server_dict_array, changed_server_ids) \
-                    = ClcServer._delete_servers(module, clc, remove_ids)
+        return server_dict_array, changed_server_ids, partial_servers_ids, changed
 
-        if min_count:
-            if len(running_servers) < min_count:
-                to_create = min_count - len(running_servers)
-                server_dict_array, changed_server_ids, partial_servers_ids, changed \
-                    = self._create_servers(module, clc, override_count=to_create)
+    @staticmethod
+    def _get_count_group_error(params):
+        """
+        Check that a server count is not requested without a count_group
+        :param params: the module params
+        :return: the error message, or None when the params are valid
+        """
+        count_group = params.get('count_group')
+        # fail here if the exact count was specified without filtering
+        # on a group, as this may lead to a undesired removal of instances
+        if params.get('exact_count') and count_group is None:
+            return "you must use the 'count_group' option with exact_count"
 
-                for server in server_dict_array:
-                    running_servers.append(server)
+        if params.get('min_count') and count_group is None:
+            return "you must use the 'count_group' option with min_count"
 
-        if max_count:
-            if len(running_servers) > max_count:
-                to_remove = len(running_servers) - max_count
-                all_server_ids = sorted([x.id for x in running_servers])
-                remove_ids = all_server_ids[0:to_remove]
+        if params.get('max_count') and count_group is None:
+            return "you must use the 'count_group option with max_count"
+        return None
 
-                changed, server_dict_array, changed_server_ids \
-                    = self._delete_servers(module, clc, remove_ids)
+    def _plan_request(self, module, clc):
+        """
+        Compute the changes the task would make without making them. The servers to start, stop
+        or delete are fetched in one batch, and the lookups needed to provision servers are only
+        made when state is present.
+        :param module: the AnsibleModule object
+        :param clc: the clc-sdk instance to use
+        :return: (changed, plan) -
+            changed: Boolean whether the task would change anything
+            plan: dictionary with the servers to create, delete and start or stop
+        """
+        p = module.params
+        state = p.get('state')
+        plan = {'create': None, 'delete': [], 'power': []}
 
+        if state in ('absent', 'started', 'stopped'):
+            server_ids = p.get('server_ids')
+            if not isinstance(server_ids, list) or len(server_ids) < 1:
+                return module.fail_json(
+                    msg='server_ids should be a list of servers, aborting')
+            servers = clc.v2.Servers(server_ids).Servers()
+            if state == 'absent':
+                plan['delete'] = [server.id for server in servers]
+            else:
+                plan['power'] = [{'id': server.id, 'before': server.powerState, 'after': state}
+                                 for server in servers if server.powerState != state]
+        else:
+            module.params = self._validate_module_params(clc, module)
+            p = module.params
+            if not p.get('template') and p.get('type') != 'bareMetal':
+                return module.fail_json(
+                    msg='template parameter is required for new instance')
+            if p.get('exact_count') is None and p.get('min_count') is None and p.get('max_count') is None:
+                to_create = p.get('count')
+            else:
+                count_group_error = self._get_count_group_error(p)
+                if count_group_error:
+                    return module.fail_json(msg=count_group_error)
+                servers, running_servers = self._find_running_servers_by_group(
+                    module, self._find_datacenter(clc, module), p.get('count_group'))
+                to_create, plan['delete'] = self._get_count_changes(
+                    [server.id for server in running_servers],
+                    p.get('exact_count'),
+                    p.get('min_count'),
+                    p.get('max_count'))
+            if to_create > 0:
+                plan['create'] = {
+                    'count': to_create,
+                    'name': p.get('name'),
+                    'template': p.get('template'),
+                    'type': p.get('type'),
+                    'group': p.get('group'),
+                    'location': p.get('location'),
+                    'cpu': p.get('cpu'),
+                    'memory': p.get('memory')}
+
+        changed = bool(plan['create'] or plan['delete'] or plan['power'])
+        return changed, plan
 
-        return server_dict_array, changed_server_ids, partial_servers_ids, changed
+    @staticmethod
+    def _get_count_changes(running_server_ids, exact_count, min_count, max_count):
+        """
+        Compute the servers to create or delete to enforce the requested server counts
+        :param running_server_ids: the ids of the running servers in the count group
+        :param exact_count: the exact number of servers requested
+        :param min_count: the minimum number of servers requested
+        :param max_count: the maximum number of servers requested
+        :return: (to_create, remove_ids) -
+            to_create: the number of servers to create
+            remove_ids: the ids of the servers to delete
+        """
+        running_count = len(running_server_ids)
+        target_count = running_count
+        if exact_count:
+            target_count = exact_count
+        elif min_count and running_count < min_count:
+            target_count = min_count
+        elif max_count and running_count > max_count:
+            target_count = max_count
+        if target_count > running_count:
+            return target_count - running_count, []
+        return 0, sorted(running_server_ids)[0:running_count - target_count]
 
     @staticmethod
     def _wait_for_requests(module, request_list):
@@ -1379,18 +1794,34 @@ class ClcServer(object):
         :return: alert_policy_id: the alert policy id
         """
         alert_policy_id = None
-        policies = clc.v2.API.Call('GET', '/v2/alertPolicies/%s' % alias)
-        if not policies:
-            return alert_policy_id
-        for policy in policies.get('items'):
-            if policy.get('name') == alert_policy_name:
-                if not alert_policy_id:
-                    alert_policy_id = policy.get('id')
-                else:
-                    return module.fail_json(
-                        msg='multiple alert policies were found with policy name : %s' % alert_policy_name)
+        policy_ids = ClcServer._get_alert_policy_name_index(
+            clc, alias).get(alert_policy_name, [])
+        if len(policy_ids) > 1:
+            return module.fail_json(
+                msg='multiple alert policies were found with policy name : %s' % alert_policy_name)
+        if policy_ids:
+            alert_policy_id = policy_ids[0]
         return alert_policy_id
 
+    @staticmethod
+    def _get_alert_policy_name_index(clc, alias):
+        """
+        Returns the alert policy ids of the account keyed by policy name.
+        The policy list is read from the shared catalog cache when available.
+        :param clc: the clc-sdk instance to use
+        :param alias: the clc account alias
+        :return: dictionary of policy name to list of policy ids
+        """
+        policies = ClcCatalogCache.get('alert_policies', alias)
+        if policies is None:
+            response = clc.v2.API.Call('GET', '/v2/alertPolicies/%s' % alias)
+            policies = response.get('items') if response else []
+            ClcCatalogCache.put('alert_policies', alias, policies)
+        index = {}
+        for policy in policies:
+            index.setdefault(policy.get('name'), []).append(policy.get('id'))
+        return index
+
     @staticmethod
     def _delete_servers(module, clc, server_ids):
         """
@@ -1441,18 +1872,23 @@ class ClcServer(object):
                 msg='server_ids should be a list of servers, aborting')
 
         servers = clc.v2.Servers(server_ids).Servers()
-        for server in servers:
-            if server.powerState != state:
-                changed_servers.append(server)
-                if not module.check_mode:
-                    request_list.append(
-                        ClcServer._change_server_power_state(
-                            module,
-                            server,
-                            state))
-                changed = True
-
-        ClcServer._wait_for_requests(module, request_list)
+        if p.get('batch_size'):
+            changed_servers = ClcServer._start_stop_servers_in_batches(
+                module, servers, state)
+            changed = len(changed_servers) > 0
+        else:
+            for server in servers:
+                if server.powerState != state:
+                    changed_servers.append(server)
+                    if not module.check_mode:
+                        request_list.append(
+                            ClcServer._change_server_power_state(
+                                module,
+                                server,
+                                state))
+                    changed = True
+
+            ClcServer._wait_for_requests(module, request_list)
         ClcServer._refresh_servers(module, changed_servers)
 
         for server in set(changed_servers + servers):
@@ -1463,6 +1899,76 @@ class ClcServer(object):
 
         return changed, server_dict_array, result_server_ids
 
+    @staticmethod
+    def _start_stop_servers_in_batches(module, servers, state):
+        """
+        Start or Stop the servers in waves of batch_size servers. The requests of each wave
+        are waited for concurrently before the next wave starts, and the remaining waves
+        are aborted once more than max_failures servers have failed.
+        :param module: the AnsibleModule object
+        :param servers: list of clc-sdk.Server instances to start or stop
+        :param state: the intended powerState for the servers
+        :return: the list of servers whose power state was changed
+        """
+        p = module.params
+        batch_size = p.get('batch_size')
+        max_failures = p.get('max_failures') or 0
+        changed_servers = []
+        errors = []
+        if batch_size < 1:
+            return module.fail_json(
+                msg='batch_size must be a positive number: {0}'.format(batch_size))
+        if not p.get('wait', True):
+            return module.fail_json(
+                msg='batch_size waits for each wave and cannot be used with wait set to false')
+
+        pending_servers = [server for server in servers if server.powerState != state]
+        for start in range(0, len(pending_servers), batch_size):
+            wave = pending_servers[start:start + batch_size]
+            if module.check_mode:
+                changed_servers.extend(wave)
+                continue
+            submitted = [(server, ClcServer._change_server_power_state(module, server, state))
+                         for server in wave]
+            # Requests.WaitUntilComplete() returns the count of failed requests
+            failed_counts = ClcServer._run_in_parallel(
+                lambda server_request: server_request[1].WaitUntilComplete() if server_request[1] else 0,
+                submitted,
+                batch_size)
+            for (server, request), failed_count in zip(submitted, failed_counts):
+                if failed_count > 0:
+                    errors.append('Unable to change power state for server {0}.'.format(server.id))
+                else:
+                    changed_servers.append(server)
+            skipped = len(pending_servers) - start - len(wave)
+            if len(errors) > max_failures and skipped:
+                errors.append('Aborted the remaining {0} servers.'.format(skipped))
+                break
+        if errors:
+            return module.fail_json(
+                msg='Unable to process server request. {0}'.format(' '.join(errors)),
+                server_ids=[server.id for server in changed_servers])
+        return changed_servers
+
+    @staticmethod
+    def _run_in_parallel(func, items, parallelism):
+        """
+        Calls func for every item on a bounded pool of threads
+        :param func: the function to call with each item
+        :param items: the list of items to process
+        :param parallelism: the maximum number of concurrent calls
+        :return: the list of results, in the same order as items
+        """
+        items = list(items)
+        if not parallelism or parallelism < 2 or len(items) < 2:
+            return [func(item) for item in items]
+        pool = ThreadPool(min(parallelism, len(items)))
+        try:
+            return pool.map(func, items)
+        finally:
+            pool.close()
+            pool.join()
+
     @staticmethod
     def _change_server_power_state(module, server, state):
         """
@@ -1514,7 +2020,7 @@ class ClcServer(object):
         Find a server group in a datacenter by calling the CLC API
         :param module: the AnsibleModule instance
         :param datacenter: clc-sdk.Datacenter instance to search for the group
-        :param lookup_group: string name of the group to search for
+        :param lookup_group: string id, name or full path of the group to search for
         :return: clc-sdk.Group instance
         """
         if not lookup_group:
@@ -1524,7 +2030,7 @@ class ClcServer(object):
         except CLCException:
             pass
 
-        # The search above only acts on the main
+        # The search above only acts on the top level groups
         result = ClcServer._find_group_recursive(
             module,
             datacenter.Groups(),
@@ -1543,27 +2049,19 @@ class ClcServer(object):
     @staticmethod
     def _find_group_recursive(module, group_list, lookup_group):
         """
-        Find a server group by recursively walking the tree
+        Find a server group by indexing the tree below a list of groups by path, id and name
         :param module: the AnsibleModule instance to use
         :param group_list: a list of groups to search
-        :param lookup_group: the group to look for
-        :return: list of groups
+        :param lookup_group: the id, name or full path of the group to look for
+        :return: clc-sdk.Group instance, or None when the group does not exist
         """
-        result = None
+        group_index = ClcGroupIndex()
         for group in group_list.groups:
-            subgroups = group.Subgroups()
-            try:
-                return subgroups.Get(lookup_group)
-            except CLCException:
-                result = ClcServer._find_group_recursive(
-                    module,
-                    subgroups,
-                    lookup_group)
-
-            if result is not None:
-                break
-
-        return result
+            group_index.add_tree(group, None, '%s' % group.name)
+        entry = group_index.get(lookup_group)
+        if entry is None:
+            return None
+        return entry[0]
 
     @staticmethod
     def _retrieve_ip_addresses(module, server, poll_freq=2, retries=5):
@@ -1678,20 +2176,41 @@ class ClcServer(object):
         """
         aa_policy_id = None
         try:
-            aa_policies = clc.v2.API.Call(method='GET',
-                                          url='antiAffinityPolicies/%s' % alias)
+            aa_policies = ClcServer._get_aa_policy_catalog(clc, alias)
         except APIFailedResponse as ex:
             return module.fail_json(msg='Unable to fetch anti affinity policies for account: {0}. {1}'.format(
                 alias, ex.response_text))
-        for aa_policy in aa_policies.get('items'):
-            if aa_policy.get('name') == aa_policy_name:
-                if not aa_policy_id:
-                    aa_policy_id = aa_policy.get('id')
-                else:
-                    return module.fail_json(
-                        msg='multiple anti affinity policies were found with policy name : %s' % aa_policy_name)
+        policy_ids = [aa_policy.get('id') for aa_policy in aa_policies
+                      if aa_policy.get('name') == aa_policy_name]
+        if len(policy_ids) > 1:
+            return module.fail_json(
+                msg='multiple anti affinity policies were found with policy name : %s' % aa_policy_name)
+        if policy_ids:
+            aa_policy_id = policy_ids[0]
         return aa_policy_id
 
+    @staticmethod
+    def _get_aa_policy_catalog(clc, alias):
+        """
+        Returns the anti affinity policies of the account, in every location.
+        The policy list is read from the shared catalog cache when available.
+        :param clc: the clc-sdk instance to use
+        :param alias: the CLC account alias
+        :return: list of dictionaries with the id, name, location and servers of each policy
+        """
+        aa_policies = ClcCatalogCache.get('aa_policies', alias)
+        if aa_policies is None:
+            response = clc.v2.API.Call(method='GET',
+                                       url='antiAffinityPolicies/%s' % alias)
+            aa_policies = [{'id': aa_policy.get('id'),
+                            'name': aa_policy.get('name'),
+                            'location': aa_policy.get('location'),
+                            'servers': [link.get('id') for link in aa_policy.get('links', [])
+                                        if link.get('rel') == 'server']}
+                           for aa_policy in response.get('items')]
+            ClcCatalogCache.put('aa_policies', alias, aa_policies)
+        return aa_policies
+
     #
     #  This is the function that gets patched to the Request.server object using a lamda closure
     #
@@ -35,8 +35,17 @@ version_added: "2.0"
 options:
   server_ids:
     description:
-      - The list of CLC server Ids.
-    required: True
+      - The list of CLC server Ids. Either server_ids or group must be provided.
+    required: False
+  group:
+    description:
+      - The name or id of a server group whose servers are targeted, in addition to any server_ids.
+        The group membership is resolved with a single fetch of the datacenter group tree.
+    required: False
+  location:
+    description:
+      - The datacenter of the group. Defaults to the primary datacenter of the account.
+    required: False
   expiration_days:
     description:
       - The number of days to keep the server snapshot before it expires.
@@ -60,6 +69,17 @@ options:
     default: False
     required: False
     choices: [True, False]
+  parallelism:
+    description:
+      - The maximum number of servers to load, and of snapshot requests to submit, at the same time.
+    default: 10
+    required: False
+  submission_rate:
+    description:
+      - The maximum number of snapshot requests submitted per second, to stay within the API rate limits.
+        Set to 0 to submit the requests without a limit.
+    default: 5
+    required: False
 requirements:
     - python = 2.7
     - requests >= 2.5.0
@@ -97,6 +117,14 @@ EXAMPLES = '''
     wait: True
     state: restore
 
+- name: Create snapshots for every server of a group
+  clc_server_snapshot:
+    group: Web Servers
+    location: UC1
+    submission_rate: 2
+    wait: True
+    state: present
+
 - name: Delete server snapshot
   clc_server_snapshot:
     server_ids:
@@ -125,8 +153,10 @@ server_ids:
 
 __version__ = '${version}'
 
+import threading
 import time
 from distutils.version import LooseVersion
+from multiprocessing.pool import ThreadPool
 
 try:
     import requests
@@ -149,6 +179,62 @@ else:
     CLC_FOUND = True
 
 
+class ClcTaskFailure(Exception):
+    """
+    Raised in place of fail_json while a server is handled on a worker thread
+    """
+    pass
+
+
+class ClcWorkerModule(object):
+    """
+    Wraps the AnsibleModule used by worker threads, so a failure is raised to the worker
+    instead of exiting the module from a thread
+    """
+
+    def __init__(self, module):
+        self._module = module
+
+    def __getattr__(self, name):
+        return getattr(self._module, name)
+
+    def fail_json(self, **kwargs):
+        raise ClcTaskFailure(kwargs.get('msg'))
+
+
+class ClcTokenBucket(object):
+    """
+    Paces the requests submitted by the worker threads to a steady rate, allowing short bursts
+    """
+
+    def __init__(self, rate):
+        self.rate = float(rate or 0)
+        self.capacity = max(1.0, self.rate)
+        self._tokens = self.capacity
+        self._updated = time.time()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Blocks until a request may be submitted
+        :return: none
+        """
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.time()
+                self._tokens = min(
+                    self.capacity,
+                    self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+
+
 class ClcSnapshot(object):
 
     clc = clc_sdk
@@ -179,7 +265,6 @@ class ClcSnapshot(object):
         :return: Returns with either an exit_json or fail_json
         """
         p = self.module.params
-        server_ids = p['server_ids']
         expiration_days = p['expiration_days']
         state = p['state']
         ignore_failures = p['ignore_failures']
@@ -189,6 +274,10 @@ class ClcSnapshot(object):
         failed_servers = []
 
         self._set_clc_credentials_from_env()
+        server_ids = self._get_target_server_ids(
+            p.get('server_ids'),
+            p.get('group'),
+            p.get('location'))
         if state == 'present':
             changed, request_list, changed_servers, failed_servers = self.ensure_server_snapshot_present(
                 server_ids=server_ids,
@@ -230,17 +319,15 @@ class ClcSnapshot(object):
         servers_to_change = [
             server for server in servers if len(
                 server.GetSnapshots()) == 0]
-        for server in servers_to_change:
+        if servers_to_change:
             changed = True
-            if not self.module.check_mode:
-                request = self._create_server_snapshot(server=server,
-                                                       expiration_days=expiration_days,
-                                                       ignore_failures=ignore_failures)
-                if request:
-                    request_list.append(request)
-                    changed_servers.append(server.id)
-                else:
-                    failed_servers.append(server.id)
+        if not self.module.check_mode:
+            request_list, changed_servers, failed_servers = self._submit_server_requests(
+                servers_to_change,
+                lambda server: self._create_server_snapshot(
+                    server=server,
+                    expiration_days=expiration_days,
+                    ignore_failures=ignore_failures))
         return changed, request_list, changed_servers, failed_servers
 
     def _create_server_snapshot(self, server, expiration_days, ignore_failures):
@@ -285,15 +372,12 @@ class ClcSnapshot(object):
         servers_to_change = [
             server for server in servers if len(
                 server.GetSnapshots()) > 0]
-        for server in servers_to_change:
+        if servers_to_change:
             changed = True
-            if not self.module.check_mode:
-                request = self._delete_server_snapshot(server, ignore_failures)
-                if request:
-                    request_list.append(request)
-                    changed_servers.append(server.id)
-                else:
-                    failed_servers.append(server.id)
+        if not self.module.check_mode:
+            request_list, changed_servers, failed_servers = self._submit_server_requests(
+                servers_to_change,
+                lambda server: self._delete_server_snapshot(server, ignore_failures))
         return changed, request_list, changed_servers, failed_servers
 
     def _delete_server_snapshot(self, server, ignore_failures):
@@ -336,15 +420,12 @@ class ClcSnapshot(object):
         servers_to_change = [
             server for server in servers if len(
                 server.GetSnapshots()) > 0]
-        for server in servers_to_change:
+        if servers_to_change:
             changed = True
-            if not self.module.check_mode:
-                request = self._restore_server_snapshot(server, ignore_failures)
-                if request:
-                    request_list.append(request)
-                    changed_servers.append(server.id)
-                else:
-                    failed_servers.append(server.id)
+        if not self.module.check_mode:
+            request_list, changed_servers, failed_servers = self._submit_server_requests(
+                servers_to_change,
+                lambda server: self._restore_server_snapshot(server, ignore_failures))
         return changed, request_list, changed_servers, failed_servers
 
     def _restore_server_snapshot(self, server, ignore_failures):
@@ -366,6 +447,76 @@ class ClcSnapshot(object):
                 ))
         return result
 
+    def _submit_server_requests(self, servers, submit):
+        """
+        Submits a snapshot request for every server on a bounded pool of threads
+        :param servers: the list of CLC server objects
+        :param submit: the function submitting the request of a server, returning the
+                       request or None when the failure is ignored
+        :return: (request_list, changed_servers, failed_servers)
+                 request_list: the list of clc request objects from CLC API call
+                 changed_servers: The list of servers ids that are modified
+                 failed_servers: The list of servers ids whose request failed
+        """
+        request_list = []
+        changed_servers = []
+        failed_servers = []
+        module = self.module
+        throttle = ClcTokenBucket(module.params.get('submission_rate'))
+        self.module = ClcWorkerModule(module)
+        try:
+            results = self._run_in_parallel(
+                lambda server: self._submit_server_request(server, submit, throttle),
+                servers,
+                module.params.get('parallelism'))
+        finally:
+            self.module = module
+
+        errors = [error for server, request, error in results if error]
+        if errors:
+            return self.module.fail_json(msg=' '.join(errors))
+        for server, request, error in results:
+            if request:
+                request_list.append(request)
+                changed_servers.append(server.id)
+            else:
+                failed_servers.append(server.id)
+        return request_list, changed_servers, failed_servers
+
+    @staticmethod
+    def _submit_server_request(server, submit, throttle):
+        """
+        Submits the snapshot request of a single server on a worker thread
+        :param server: the CLC server object
+        :param submit: the function submitting the request of the server
+        :param throttle: the ClcTokenBucket pacing the submissions
+        :return: (server, request, error)
+        """
+        try:
+            throttle.acquire()
+            return server, submit(server), None
+        except ClcTaskFailure as ex:
+            return server, None, str(ex)
+
+    @staticmethod
+    def _run_in_parallel(func, items, parallelism):
+        """
+        Calls func for every item on a bounded pool of threads
+        :param func: the function to call with each item
+        :param items: the list of items to process
+        :param parallelism: the maximum number of concurrent calls
+        :return: the list of results, in the same order as items
+        """
+        items = list(items)
+        if not parallelism or parallelism < 2 or len(items) < 2:
+            return [func(item) for item in items]
+        pool = ThreadPool(min(parallelism, len(items)))
+        try:
+            return pool.map(func, items)
+        finally:
+            pool.close()
+            pool.join()
+
     def _wait_for_requests_to_complete(self, requests_lst, changed_servers):
         """
         Waits until the CLC requests are complete if the wait argument is True
@@ -375,22 +526,50 @@ class ClcSnapshot(object):
         """
         if not self.module.params['wait']:
             return
-        for request in requests_lst:
-            request.WaitUntilComplete()
-            for request_details in request.requests:
-                if request_details.Status() != 'succeeded':
-                    self.module.fail_json(
-                        msg='Unable to process server snapshot request')
+        parallelism = self.module.params.get('parallelism')
+        succeeded = self._run_in_parallel(
+            self._wait_for_request,
+            requests_lst,
+            parallelism)
+        if not all(succeeded):
+            return self.module.fail_json(
+                msg='Unable to process server snapshot request')
 
         if self.module.params['state'] == 'absent':
-            for server in changed_servers:
-                t_end = time.time() + 600
-                while time.time() < t_end:
-                    if len(self.clc.v2.Server(server).GetSnapshots()) == 0:
-                        break
-                if len(self.clc.v2.Server(server).GetSnapshots()) != 0:
-                    self.module.fail_json(msg='Failed to delete snapshot for server : {0}.'.format(server))
+            changed_servers = list(changed_servers)
+            removed = self._run_in_parallel(
+                self._wait_for_snapshot_removal,
+                changed_servers,
+                parallelism)
+            for server, snapshot_removed in zip(changed_servers, removed):
+                if not snapshot_removed:
+                    return self.module.fail_json(msg='Failed to delete snapshot for server : {0}.'.format(server))
+
+    @staticmethod
+    def _wait_for_request(request):
+        """
+        Waits until a single CLC request is complete on a worker thread
+        :param request: the CLC request object
+        :return: True if every request detail succeeded
+        """
+        request.WaitUntilComplete()
+        return all(request_details.Status() == 'succeeded'
+                   for request_details in request.requests)
 
+    def _wait_for_snapshot_removal(self, server_id, timeout=600, poll_freq=2):
+        """
+        Waits until the snapshots of a server are removed on a worker thread
+        :param server_id: the CLC server id
+        :param timeout: the number of seconds to wait
+        :param poll_freq: the number of seconds between polls
+        :return: True if the server has no snapshot left
+        """
+        t_end = time.time() + timeout
+        while time.time() < t_end:
+            if len(self.clc.v2.Server(server_id).GetSnapshots()) == 0:
+                return True
+            time.sleep(poll_freq)
+        return len(self.clc.v2.Server(server_id).GetSnapshots()) == 0
 
     @staticmethod
     def define_argument_spec():
@@ -400,10 +579,14 @@ class ClcSnapshot(object):
         :return: the package dictionary object
         """
         argument_spec = dict(
-            server_ids=dict(type='list', required=True),
+            server_ids=dict(type='list', required=False),
+            group=dict(required=False),
+            location=dict(required=False),
             expiration_days=dict(default=7),
             wait=dict(default=True),
             ignore_failures=dict(type='bool', default=False),
+            parallelism=dict(type='int', default=10),
+            submission_rate=dict(type='float', default=5),
             state=dict(
                 default='present',
                 choices=[
@@ -413,17 +596,85 @@ class ClcSnapshot(object):
         )
         return argument_spec
 
+    def _get_target_server_ids(self, server_ids, group, location):
+        """
+        Builds the list of targeted server ids from the server_ids and the group
+        :param server_ids: The list of server ids
+        :param group: the name or id of the group whose servers are targeted
+        :param location: the datacenter of the group
+        :return: the list of server ids, without duplicates
+        """
+        target_ids = list(server_ids or [])
+        if group:
+            for server_id in self._get_group_server_ids(group, location):
+                if server_id not in target_ids:
+                    target_ids.append(server_id)
+        return target_ids
+
+    def _get_group_server_ids(self, group, location):
+        """
+        Resolves the servers of a group from a single fetch of the datacenter group tree
+        :param group: the name or id of the group
+        :param location: the datacenter of the group
+        :return: the list of server ids in the group
+        """
+        try:
+            datacenter = self.clc.v2.Datacenter(location)
+            root_group = datacenter.RootGroup()
+        except CLCException:
+            return self.module.fail_json(
+                msg='Unable to find location: {0}'.format(location))
+        group_data = self._find_group_data(root_group.data, group)
+        if group_data is None:
+            return self.module.fail_json(
+                msg='Unable to find group: {0} in location: {1}'.format(group, datacenter.id))
+        return [link['id'] for link in group_data.get('links', [])
+                if link.get('rel') == 'server']
+
+    @staticmethod
+    def _find_group_data(root_group_data, group):
+        """
+        Finds a group in the group tree, searching the upper levels first
+        :param root_group_data: the group tree returned by the CLC API
+        :param group: the name or id of the group
+        :return: the group data, or None when the group is not found
+        """
+        pending = [root_group_data]
+        while pending:
+            group_data = pending.pop(0)
+            if group in (group_data.get('id'), group_data.get('name')):
+                return group_data
+            pending.extend(group_data.get('groups', []))
+        return None
+
     def _get_servers_from_clc(self, server_list, message):
         """
         Internal function to fetch list of CLC server objects from a list of server ids
+        The servers are loaded concurrently, and their snapshots come with the server details.
         :param server_list: The list of server ids
         :param message: The error message to throw in case of any error
         :return the list of CLC server objects
         """
+        results = self._run_in_parallel(
+            self._load_server,
+            server_list,
+            self.module.params.get('parallelism'))
+        errors = ['{0} {1}'.format(server_id, error)
+                  for server_id, (server, error) in zip(server_list, results) if error]
+        if errors:
+            return self.module.fail_json(msg=message + ': %s' % ', '.join(errors))
+        return [server for server, error in results]
+
+    def _load_server(self, server_id):
+        """
+        Load a single CLC server, with its snapshots, on a worker thread
+        :param server_id: the CLC server id
+        :return: (server, error)
+        """
         try:
-            return self.clc.v2.Servers(server_list).servers
+            return self.clc.v2.Server(server_id), None
         except CLCException as ex:
-            return self.module.fail_json(msg=message + ': %s' % ex)
+            return None, ex
 
     def _set_clc_credentials_from_env(self):
         """
@@ -470,6 +721,7 @@ def main():
     """
     module = AnsibleModule(
         argument_spec=ClcSnapshot.define_argument_spec(),
+        required_one_of=[['server_ids', 'group']],
         supports_check_mode=True
     )
     clc_snapshot = ClcSnapshot(module)
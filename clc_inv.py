@@ -34,25 +34,169 @@ The following information is returned for each host:
     - ansible_ssh_host:  Set to the first internal ip address
     - clc_custom_fields:  A dictionary of custom fields set on the server in the Control Portal
     - clc_data:  A dictionary of all the data returned by the API
+    - clc_location:  The datacenter of the server, used to build the datacenter groups
+
+The clc_data of the hosts can be projected to shrink the inventory on large accounts, by setting
+comma separated lists of dotted paths (ex: details.ipAddresses,locationId) in:
+
+    export CLC_INVENTORY_FIELDS=<the paths of clc_data to keep>
+    export CLC_INVENTORY_EXCLUDE=<the paths of clc_data to leave out>
+
+The projection only applies to clc_data. The datacenter groups are built from clc_location, so
+they do not depend on the fields that are kept.
+
+The server documents can be cached on disk between runs, and shared with the CLC modules, by setting:
+
+    export CLC_HTTP_CACHE_TTL=<the number of seconds a server document without validators is reused>
+
+The documents returned with an ETag or a Last-Modified header are revalidated with a conditional GET.
+The others can be out of date, power state and ip addresses included, for up to CLC_HTTP_CACHE_TTL
+seconds, so keep it short. It is separate from the CLC_CACHE_TTL of the catalog caches of the modules.
+CLC_CACHE_DIR overrides the default cache directory of ~/.ansible/tmp/clc_cache.
 '''
 
 #  @author: Brian Albrecht
 #
-#  TODO: Add caching
 #  TODO: Add ability to specify AccountAlias
 
 import sys
 import os
 from multiprocessing import Pool
+import hashlib
 import itertools
 import json
+import tempfile
+import time
 from builtins import str
+import requests
 import clc
 from clc import CLCException, APIFailedResponse
 
 HOSTVAR_POOL_CNT = 25
 
 
+class ClcCachingSession(requests.Session):
+    '''
+    Requests session with an on disk cache of the GET responses of the CLC API, shared between
+    tasks and between modules. A cached response with an ETag or a Last-Modified validator is
+    revalidated with a conditional GET and reused when the API answers 304 Not Modified, any
+    other cached response is reused for CLC_HTTP_CACHE_TTL seconds. The cache is enabled by
+    setting CLC_HTTP_CACHE_TTL, apart from the catalog caches enabled by CLC_CACHE_TTL, and
+    CLC_CACHE_DIR overrides the default cache directory of ~/.ansible/tmp/clc_cache.
+    The server credentials are never cached.
+    '''
+
+    def request(self, method, url, params=None, headers=None, **kwargs):
+        ttl = ClcCachingSession._get_ttl()
+        if method.upper() != 'GET' or ttl <= 0 or not ClcCachingSession._is_cacheable(url):
+            return super(ClcCachingSession, self).request(
+                method, url, params=params, headers=headers, **kwargs)
+
+        path = ClcCachingSession._get_path(url, params)
+        entry = ClcCachingSession._load(path)
+        headers = dict(headers or {})
+        if entry is not None:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+            if not entry.get('etag') and not entry.get('last_modified') and \
+                    time.time() - entry.get('timestamp', 0) <= ttl:
+                return ClcCachingSession._build_response(url, entry)
+
+        response = super(ClcCachingSession, self).request(
+            method, url, params=params, headers=headers, **kwargs)
+        if response.status_code == 304 and entry is not None:
+            return ClcCachingSession._build_response(url, entry)
+        if response.status_code == 200:
+            ClcCachingSession._store(path, {
+                'timestamp': time.time(),
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'body': response.text})
+        return response
+
+    @staticmethod
+    def _get_ttl():
+        '''
+        Read the cache time to live from the environment
+        :return: the time to live in seconds, 0 when caching is disabled
+        '''
+        try:
+            return int(os.environ.get('CLC_HTTP_CACHE_TTL', 0))
+        except ValueError:
+            return 0
+
+    @staticmethod
+    def _is_cacheable(url):
+        '''
+        Check whether the response of a url may be stored on disk
+        :param url: the url of the request
+        :return: False for the server credentials, True otherwise
+        '''
+        return not url.split('?')[0].rstrip('/').endswith('/credentials')
+
+    @staticmethod
+    def _get_path(url, params):
+        '''
+        Build the path of the cache file for a GET request
+        :param url: the url of the request
+        :param params: the query parameters of the request
+        :return: the path of the cache file
+        '''
+        cache_dir = os.environ.get('CLC_CACHE_DIR') or os.path.join(
+            os.path.expanduser('~'), '.ansible', 'tmp', 'clc_cache')
+        key = json.dumps([url, params or {}], sort_keys=True)
+        return os.path.join(cache_dir, 'http_%s.json' % hashlib.sha1(key.encode('utf-8')).hexdigest())
+
+    @staticmethod
+    def _load(path):
+        '''
+        Load a cached response
+        :param path: the path of the cache file
+        :return: the cached entry, or None when missing or unreadable
+        '''
+        try:
+            with open(path) as cache_file:
+                return json.load(cache_file)
+        except (IOError, OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _store(path, entry):
+        '''
+        Store a response in the cache. Failures to write the cache are ignored.
+        :param path: the path of the cache file
+        :param entry: the entry to store
+        :return: none
+        '''
+        try:
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, 'w') as cache_file:
+                json.dump(entry, cache_file)
+            os.rename(tmp_path, path)
+        except (IOError, OSError):
+            pass
+
+    @staticmethod
+    def _build_response(url, entry):
+        '''
+        Build a response from a cached entry
+        :param url: the url of the request
+        :param entry: the cached entry
+        :return: the requests.Response
+        '''
+        response = requests.models.Response()
+        response.status_code = 200
+        response.url = url
+        response.encoding = 'utf-8'
+        response.headers['Content-Type'] = 'application/json'
+        response._content = entry.get('body', '').encode('utf-8')
+        return response
+
+
 def main():
     '''
     Main function
@@ -185,7 +329,7 @@ def _find_hostvars_single_server(server_id):
     '''
     result = {}
     try:
-        session = clc.requests.Session()
+        session = ClcCachingSession()
 
         server_obj = clc.v2.API.Call(method='GET',
                                      url='servers/{0}/{1}'.format(clc.ALIAS, server_id),
@@ -200,9 +344,12 @@ def _find_hostvars_single_server(server_id):
         result[server.name] = {
             'ansible_ssh_host': server.data['details']['ipAddresses'][0]['internal'],
             'clc_data': server.data,
-            'clc_custom_fields': server.data['details']['customFields']
+            'clc_custom_fields': server.data['details']['customFields'],
+            'clc_location': server.data.get('locationId')
         }
         result = _add_windows_hostvars(result, server)
+        result[server.name]['clc_data'] = _project_fields(
+            server.data, *_get_clc_data_projection())
     except (CLCException, APIFailedResponse, KeyError):
         return  # Skip any servers that return bad data or an api exception
 
@@ -223,6 +370,74 @@ def _add_windows_hostvars(hostvars, server):
     return hostvars
 
 
+def _get_clc_data_projection():
+    '''
+    Return the projection of the clc_data hostvar set in the CLC_INVENTORY_FIELDS and
+    CLC_INVENTORY_EXCLUDE env vars
+    :return: the list of dotted paths to keep and the list of dotted paths to leave out
+    '''
+    fields = os.environ.get('CLC_INVENTORY_FIELDS')
+    exclude = os.environ.get('CLC_INVENTORY_EXCLUDE')
+    return ([field.strip() for field in fields.split(',') if field.strip()] if fields else None,
+            [field.strip() for field in exclude.split(',') if field.strip()] if exclude else None)
+
+
+def _project_fields(document, fields=None, exclude=None):
+    '''
+    Project a document returned by the CLC API on dotted paths. The paths go through lists,
+    so 'details.ipAddresses.internal' keeps the internal address of every ip address.
+    :param document: the dictionary or list to project
+    :param fields: the list of dotted paths to keep, None to keep the whole document
+    :param exclude: the list of dotted paths to remove
+    :return: the projected document
+    '''
+    if fields:
+        document = _select_fields(document, [field.split('.') for field in fields])
+    for field in exclude or []:
+        _exclude_field(document, field.split('.'))
+    return document
+
+
+def _select_fields(document, paths):
+    '''
+    Copy the parts of a document found at a list of paths
+    :param document: the dictionary or list to copy from
+    :param paths: the list of paths, as lists of keys
+    :return: the copy of the selected parts of the document
+    '''
+    if isinstance(document, list):
+        return [_select_fields(item, paths) for item in document]
+    if not isinstance(document, dict):
+        return document
+    result = {}
+    for key in set([path[0] for path in paths]):
+        if key not in document:
+            continue
+        subpaths = [path[1:] for path in paths if path[0] == key]
+        if [] in subpaths:
+            result[key] = document[key]
+        else:
+            result[key] = _select_fields(document[key], subpaths)
+    return result
+
+
+def _exclude_field(document, path):
+    '''
+    Remove the parts of a document found at a path
+    :param document: the dictionary or list to remove from
+    :param path: the path, as a list of keys
+    :return: none
+    '''
+    if isinstance(document, list):
+        for item in document:
+            _exclude_field(item, path)
+    elif isinstance(document, dict) and path[0] in document:
+        if len(path) == 1:
+            del document[path[0]]
+        else:
+            _exclude_field(document[path[0]], path[1:])
+
+
 def _build_hostvars_dynamic_groups(hostvars):
     '''
     Build a dictionary of dynamically generated groups, parsed from
@@ -245,7 +460,10 @@ def _build_datacenter_groups(hostvars):
     result = {}
     hostvars = hostvars.get('hostvars')
     for server in hostvars:
-        datacenter = hostvars[server]['clc_data']['locationId']
+        datacenter = hostvars[server].get('clc_location') or \
+            hostvars[server]['clc_data'].get('locationId')
+        if datacenter is None:
+            continue
         if datacenter not in result:
             result[datacenter] = []
         result[datacenter] += [server]
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright 2016 CenturyLink
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import mock
+
+
+def build_mock_response(status_code, payload):
+    """
+    Build a mock requests response
+    :param status_code: the http status code of the response
+    :param payload: the value returned by the json() of the response
+    :return: the mock response
+    """
+    response = mock.MagicMock()
+    response.status_code = status_code
+    response.json.return_value = payload
+    return response
+
+
+def build_fact_module(module_class, module, params):
+    """
+    Build a fact module authenticated against a unit test endpoint, with a mock session
+    :param module_class: the class of the fact module
+    :param module: the mock AnsibleModule
+    :param params: the module params
+    :return: the fact module
+    """
+    module.params = params
+    fact_module = module_class(module)
+    fact_module.api_url = 'http://unittest.example.com'
+    fact_module.clc_alias = 'test_alias'
+    fact_module.v2_api_token = 'dummy_token'
+    fact_module.session = mock.MagicMock()
+    return fact_module
@@ -41,6 +41,9 @@ class TestClcAntiAffinityPolicy(unittest.TestCase):
         self.policy = ClcAntiAffinityPolicy(self.module)
         self.policy.module.exit_json = mock.MagicMock()
         self.policy_dict = {}
+        patcher = patch.object(clc_sdk.v2.Account, 'GetAlias', return_value='alias')
+        patcher.start()
+        self.addCleanup(patcher.stop)
 
 
 
@@ -82,6 +85,9 @@ class TestClcAntiAffinityPolicy(unittest.TestCase):
     def testCreateNoChange(self):
         mock_policy = mock.MagicMock(spec=clc_sdk.v2.AntiAffinity)
         mock_policy.name = 'TestMaster3000'
+        mock_policy.location = 'beer'
+        mock_policy.id = '12345'
+        mock_policy.servers = []
         mock_policy.data = {}
         self.policy.module.params = {
             'location': 'beer',
@@ -97,6 +103,9 @@ class TestClcAntiAffinityPolicy(unittest.TestCase):
     def testCreateWithChange(self):
         mock_policy = mock.MagicMock(spec=clc_sdk.v2.AntiAffinity)
         mock_policy.name = 'TestMaster3000'
+        mock_policy.location = 'beer'
+        mock_policy.id = '12345'
+        mock_policy.servers = []
         mock_policy.data = {'a_thing': 'happened'}
         self.policy.module.params = {
             'location': 'beer',
@@ -112,6 +121,9 @@ class TestClcAntiAffinityPolicy(unittest.TestCase):
     def testDeleteNoChange(self):
         mock_policy = mock.MagicMock(spec=clc_sdk.v2.AntiAffinity)
         mock_policy.name = 'TestMaster3000'
+        mock_policy.location = 'beer'
+        mock_policy.id = '12345'
+        mock_policy.servers = []
         mock_policy.data = {}
         self.policy.module.params = {
             'location': 'beer',
@@ -126,6 +138,9 @@ class TestClcAntiAffinityPolicy(unittest.TestCase):
     def testDeleteWithChange(self):
         mock_policy = mock.MagicMock(spec=clc_sdk.v2.AntiAffinity)
         mock_policy.name = 'TestMaster3000'
+        mock_policy.location = 'beer'
+        mock_policy.id = '12345'
+        mock_policy.servers = []
         mock_policy.data = {'a_thing': 'happened'}
         self.policy.module.params = {
             'location': 'beer',
@@ -227,6 +242,48 @@ class TestClcAntiAffinityPolicy(unittest.TestCase):
         mock_ClcAAPolicy.assert_called_once_with(mock_AnsibleModule_instance)
         assert mock_ClcAAPolicy_instance.process_request.call_count ==1
 
+    @patch.object(clc_aa_policy, 'ClcCatalogCache')
+    def test_get_policies_for_datacenter_from_cache(self, mock_cache):
+        mock_cache.get.return_value = [
+            {'id': '111', 'name': 'test1', 'location': 'UC1', 'servers': []},
+            {'id': '222', 'name': 'test2', 'location': 'VA1', 'servers': []}]
+        under_test = ClcAntiAffinityPolicy(self.module)
+        under_test.clc = mock.MagicMock()
+        under_test.clc.v2.AntiAffinity = mock.MagicMock(wraps=clc_sdk.v2.AntiAffinity)
+        under_test.alias = 'alias'
+        policies = under_test._get_policies_for_datacenter({'location': 'uc1'})
+        self.assertEqual(list(policies.keys()), ['test1'])
+        under_test.clc.v2.AntiAffinity.assert_called_once_with(
+            id='111', alias='alias', name='test1', location='UC1', servers=[])
+        self.assertFalse(under_test.clc.v2.AntiAffinity.GetAll.called)
+        mock_cache.get.assert_called_once_with('aa_policies', 'alias')
+
+    @patch.object(clc_aa_policy, 'ClcCatalogCache')
+    def test_get_policies_for_datacenter_fills_cache(self, mock_cache):
+        mock_cache.get.return_value = None
+        policy = mock.MagicMock(id='111', location='UC1', servers=['svr1'])
+        policy.name = 'test1'
+        under_test = ClcAntiAffinityPolicy(self.module)
+        under_test.clc = mock.MagicMock()
+        under_test.clc.v2.AntiAffinity.GetAll.return_value = [policy]
+        under_test.alias = 'alias'
+        policies = under_test._get_policies_for_datacenter({'location': 'VA1'})
+        self.assertEqual(policies, {})
+        under_test.clc.v2.AntiAffinity.GetAll.assert_called_once_with(alias='alias')
+        mock_cache.put.assert_called_once_with('aa_policies', 'alias', [
+            {'id': '111', 'name': 'test1', 'location': 'UC1', 'servers': ['svr1']}])
+
+    @patch.object(clc_aa_policy, 'ClcCatalogCache')
+    def test_create_and_delete_policy_invalidate_cache(self, mock_cache):
+        under_test = ClcAntiAffinityPolicy(self.module)
+        under_test.clc = mock.MagicMock()
+        under_test.alias = 'alias'
+        under_test.policy_dict = {'dummyname': mock.MagicMock()}
+        under_test._create_policy({'name': 'dummyname', 'location': 'UC1'})
+        under_test._delete_policy({'name': 'dummyname', 'location': 'UC1'})
+        self.assertEqual(mock_cache.invalidate.call_args_list,
+                         [mock.call('aa_policies', 'alias')] * 2)
+
     @patch.object(clc_aa_policy, 'clc_sdk')
     def test_create_aa_policy_error(self, mock_clc_sdk):
         under_test = ClcAntiAffinityPolicy(self.module)
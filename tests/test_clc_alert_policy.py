@@ -15,9 +15,13 @@
 
 import clc_ansible_module.clc_alert_policy as clc_alert_policy
 from clc_ansible_module.clc_alert_policy import ClcAlertPolicy
+from clc_ansible_module.clc_alert_policy import ClcCatalogCache
 from clc import APIFailedResponse
+import json
 import mock
 from mock import patch
+import shutil
+import tempfile
 import unittest
 
 # This is a pretty brute-force attack at unit testing.
@@ -242,6 +246,21 @@ class TestClcAlertPolicy(unittest.TestCase):
         under_test._ensure_alert_policy_is_present()
         self.module.fail_json.assert_called_once_with(msg='Policy name is a required')
 
+    @patch.object(ClcAlertPolicy, '_create_alert_policy')
+    @patch.object(ClcAlertPolicy, '_alert_policy_exists')
+    @patch.object(ClcAlertPolicy, '_set_clc_credentials_from_env')
+    def test_ensure_alert_policy_is_present_missing_fields(self, mock_set_clc_creds, mock_alert_policy_exists, mock_create):
+        self.module.params = {'name': 'testname', 'alias': 'testalias', 'metric': 'cpu'}
+        self.module.check_mode = False
+        mock_alert_policy_exists.return_value = False
+
+        under_test = ClcAlertPolicy(self.module)
+        under_test._ensure_alert_policy_is_present()
+        self.module.fail_json.assert_called_once_with(
+            msg='Missing required alert policy fields for "testname": '
+                'alert_recipients, duration, threshold')
+        self.assertFalse(mock_create.called)
+
     @patch.object(ClcAlertPolicy, '_ensure_alert_policy_is_updated')
     @patch.object(ClcAlertPolicy, '_alert_policy_exists')
     @patch.object(ClcAlertPolicy, '_set_clc_credentials_from_env')
@@ -644,6 +663,75 @@ class TestClcAlertPolicy(unittest.TestCase):
         self.assertEqual(res,
                          {'12345': {'id': '12345', 'name': 'test1'}, '23456': {'id': '23456', 'name': 'test2'}})
 
+    def test_catalog_cache_disabled_by_default(self):
+        cache_dir = tempfile.mkdtemp()
+        try:
+            with patch.dict('os.environ', {'CLC_CACHE_DIR': cache_dir}, clear=True):
+                ClcCatalogCache.put('alert_policies', 'alias', [{'id': '1'}])
+                self.assertEqual(ClcCatalogCache.get('alert_policies', 'alias'), None)
+        finally:
+            shutil.rmtree(cache_dir)
+
+    def test_catalog_cache_put_get_invalidate(self):
+        cache_dir = tempfile.mkdtemp()
+        try:
+            with patch.dict('os.environ', {'CLC_CACHE_DIR': cache_dir,
+                                           'CLC_CACHE_TTL': '60'}):
+                ClcCatalogCache.put('alert_policies', 'ALIAS', [{'id': '1'}])
+                self.assertEqual(ClcCatalogCache.get('alert_policies', 'alias'), [{'id': '1'}])
+                ClcCatalogCache.invalidate('alert_policies', 'alias')
+                self.assertEqual(ClcCatalogCache.get('alert_policies', 'alias'), None)
+        finally:
+            shutil.rmtree(cache_dir)
+
+    @patch.object(clc_alert_policy, 'time')
+    def test_catalog_cache_expired(self, mock_time):
+        cache_dir = tempfile.mkdtemp()
+        try:
+            with patch.dict('os.environ', {'CLC_CACHE_DIR': cache_dir,
+                                           'CLC_CACHE_TTL': '60'}):
+                mock_time.time.return_value = 1000
+                ClcCatalogCache.put('alert_policies', 'alias', [{'id': '1'}])
+                mock_time.time.return_value = 1061
+                self.assertEqual(ClcCatalogCache.get('alert_policies', 'alias'), None)
+        finally:
+            shutil.rmtree(cache_dir)
+
+    @patch.object(clc_alert_policy, 'ClcCatalogCache')
+    def test_get_alert_polices_from_cache(self, mock_cache):
+        mock_cache.get.return_value = [{'id': '12345', 'name': 'test1'}]
+        under_test = ClcAlertPolicy(self.module)
+        under_test.clc = mock.MagicMock()
+        res = under_test._get_alert_policies('testalias')
+        self.assertEqual(res, {'12345': {'id': '12345', 'name': 'test1'}})
+        self.assertFalse(under_test.clc.v2.API.Call.called)
+        mock_cache.get.assert_called_once_with('alert_policies', 'testalias')
+
+    @patch.object(clc_alert_policy, 'ClcCatalogCache')
+    def test_create_alert_policy_updates_catalog(self, mock_cache):
+        self.module.params = {
+            'name': 'test2', 'alias': 'testalias', 'alert_recipients': ['test'],
+            'metric': 'disk', 'duration': '00:05:00', 'threshold': 5}
+        under_test = ClcAlertPolicy(self.module)
+        under_test.clc = mock.MagicMock()
+        under_test.clc.v2.API.Call.return_value = {'id': '23456', 'name': 'test2'}
+        under_test.policy_dict = {'12345': {'id': '12345', 'name': 'test1'}}
+        self.assertEqual(under_test._alert_policy_exists('test2'), False)
+        under_test._create_alert_policy()
+        self.assertEqual(under_test._get_alert_policy_id(self.module, 'test2'), '23456')
+        cached = mock_cache.put.call_args[0]
+        self.assertEqual(cached[0:2], ('alert_policies', 'testalias'))
+        self.assertEqual(sorted(p['id'] for p in cached[2]), ['12345', '23456'])
+
+    @patch.object(clc_alert_policy, 'ClcCatalogCache')
+    def test_delete_alert_policy_updates_catalog(self, mock_cache):
+        under_test = ClcAlertPolicy(self.module)
+        under_test.clc = mock.MagicMock()
+        under_test.policy_dict = {'12345': {'id': '12345', 'name': 'test1'}}
+        under_test._delete_alert_policy('testalias', '12345')
+        self.assertEqual(under_test._alert_policy_exists('test1'), False)
+        mock_cache.put.assert_called_once_with('alert_policies', 'testalias', [])
+
     def testArgumentSpecContract(self):
         args = ClcAlertPolicy._define_module_argument_spec()
 
@@ -657,7 +745,117 @@ class TestClcAlertPolicy(unittest.TestCase):
                                      'state': {'default': 'present', 'choices': ['present', 'absent']},
                                      'threshold': {'default': None, 'type': 'int'},
                                      'duration': {'default': None, 'type': 'str'},
-                                     'id': {'default': None}}, 'mutually_exclusive': [['name', 'id']]})
+                                     'policies': {'default': None, 'type': 'list'},
+                                     'parallelism': {'default': 10, 'type': 'int'},
+                                     'id': {'default': None}},
+                                'mutually_exclusive': [['name', 'id'],
+                                                       ['policies', 'name'],
+                                                       ['policies', 'id']]})
+
+    def _build_existing_policies(self):
+        return {
+            '12345': {'id': '12345', 'name': 'cpu',
+                      'actions': [{'action': 'email',
+                                   'settings': {'recipients': ['a@b.com']}}],
+                      'triggers': [{'metric': 'cpu', 'duration': '00:05:00',
+                                    'threshold': 90.0}]},
+            '67890': {'id': '67890', 'name': 'disk',
+                      'actions': [{'action': 'email',
+                                   'settings': {'recipients': ['a@b.com']}}],
+                      'triggers': [{'metric': 'disk', 'duration': '00:05:00',
+                                    'threshold': 80.0}]}}
+
+    def test_plan_alert_policy_changes(self):
+        self.module.params = {'state': 'present'}
+        under_test = ClcAlertPolicy(self.module)
+        under_test.policy_dict = self._build_existing_policies()
+        changes = under_test._plan_alert_policy_changes([
+            {'name': 'cpu', 'metric': 'cpu', 'threshold': 95},
+            {'name': 'disk', 'alert_recipients': ['a@b.com']},
+            {'name': 'memory', 'metric': 'memory', 'duration': '00:05:00',
+             'threshold': 90, 'alert_recipients': ['a@b.com']},
+            {'id': '67890', 'state': 'absent'},
+            {'name': 'gone', 'state': 'absent'}])
+        self.assertEqual([c['action'] for c in changes],
+                         ['update', 'unchanged', 'create', 'delete', 'unchanged'])
+        self.assertEqual(changes[3]['name'], 'disk')
+        self.assertFalse(self.module.fail_json.called)
+
+    def test_plan_alert_policy_changes_duplicate_entry(self):
+        self.module.params = {'state': 'present'}
+        under_test = ClcAlertPolicy(self.module)
+        under_test.policy_dict = self._build_existing_policies()
+        under_test._plan_alert_policy_changes([{'name': 'cpu'}, {'name': 'cpu'}])
+        self.module.fail_json.assert_called_once_with(
+            msg='The alert policy is listed more than once: cpu')
+
+    def test_plan_alert_policy_changes_incomplete_create(self):
+        self.module.params = {'state': 'present'}
+        under_test = ClcAlertPolicy(self.module)
+        under_test.policy_dict = self._build_existing_policies()
+        under_test.clc = mock.MagicMock()
+        under_test._plan_alert_policy_changes([{'name': 'memory', 'metric': 'memory'}])
+        self.module.fail_json.assert_called_once_with(
+            msg='Missing required alert policy fields for "memory": '
+                'alert_recipients, duration, threshold')
+        self.assertFalse(under_test.clc.v2.API.Call.called)
+
+    @patch.object(ClcAlertPolicy, '_update_policy_catalog')
+    def test_ensure_alert_policies_are_reconciled(self, mock_catalog):
+        self.module.params = {'alias': 'testalias', 'state': 'present', 'parallelism': 4}
+        self.module.check_mode = False
+        under_test = ClcAlertPolicy(self.module)
+        under_test.policy_dict = self._build_existing_policies()
+        under_test.clc = mock.MagicMock()
+        under_test.clc.v2.API.Call.side_effect = \
+            lambda method, url, payload: {'id': 'new', 'name': 'memory'} if method == 'POST' else {}
+        changed, report = under_test._ensure_alert_policies_are_reconciled([
+            {'name': 'cpu', 'threshold': 95},
+            {'name': 'memory', 'metric': 'memory', 'duration': '00:05:00',
+             'threshold': 90, 'alert_recipients': ['a@b.com']},
+            {'name': 'disk', 'state': 'absent'}])
+        self.assertTrue(changed)
+        self.assertEqual([(r['name'], r['id'], r['action']) for r in report],
+                         [('cpu', '12345', 'update'), ('memory', 'new', 'create'),
+                          ('disk', '67890', 'delete')])
+        calls = [c[0][:2] for c in under_test.clc.v2.API.Call.call_args_list]
+        self.assertEqual(calls[0], ('DELETE', '/v2/alertPolicies/testalias/67890'))
+        self.assertIn(('PUT', '/v2/alertPolicies/testalias/12345'), calls)
+        self.assertIn(('POST', '/v2/alertPolicies/testalias'), calls)
+        update_payload = [c[0][2] for c in under_test.clc.v2.API.Call.call_args_list
+                          if c[0][0] == 'PUT'][0]
+        self.assertEqual(json.loads(update_payload)['triggers'],
+                         [{'metric': 'cpu', 'duration': '00:05:00', 'threshold': 95}])
+        self.assertEqual(mock_catalog.call_count, 3)
+        self.assertFalse(self.module.fail_json.called)
+
+    def test_ensure_alert_policies_are_reconciled_check_mode(self):
+        self.module.params = {'alias': 'testalias', 'state': 'present'}
+        self.module.check_mode = True
+        under_test = ClcAlertPolicy(self.module)
+        under_test.policy_dict = self._build_existing_policies()
+        under_test.clc = mock.MagicMock()
+        changed, report = under_test._ensure_alert_policies_are_reconciled(
+            [{'name': 'cpu', 'state': 'absent'}])
+        self.assertTrue(changed)
+        self.assertEqual(report[0]['action'], 'delete')
+        self.assertFalse(under_test.clc.v2.API.Call.called)
+
+    def test_ensure_alert_policies_are_reconciled_aggregates_errors(self):
+        self.module.params = {'alias': 'testalias', 'state': 'present'}
+        self.module.check_mode = False
+        under_test = ClcAlertPolicy(self.module)
+        under_test.policy_dict = self._build_existing_policies()
+        under_test.clc = mock.MagicMock()
+        error = APIFailedResponse('Failed')
+        error.response_text = 'Mock failure message'
+        under_test.clc.v2.API.Call.side_effect = error
+        under_test._ensure_alert_policies_are_reconciled(
+            [{'name': 'cpu', 'state': 'absent'}])
+        self.assertEqual(self.module.fail_json.call_count, 1)
+        self.assertEqual(self.module.fail_json.call_args[1]['msg'],
+                         'Unable to reconcile the alert policies. '
+                         'Unable to delete alert policy "cpu". Mock failure message')
 
 
 if __name__ == '__main__':
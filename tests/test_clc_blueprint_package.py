@@ -17,6 +17,9 @@ import clc_ansible_module.clc_blueprint_package as clc_blueprint_package
 from clc_ansible_module.clc_blueprint_package import ClcBlueprintPackage
 import clc as clc_sdk
 from clc import CLCException
+import os
+import shutil
+import tempfile
 import mock
 from mock import patch
 from mock import create_autospec
@@ -225,6 +228,135 @@ class TestClcBluePrintPackageFunctions(unittest.TestCase):
         self.assertEqual(changed, True)
         self.assertEqual(return_servers,['TESTSVR1', 'TESTSVR2'])
 
+    def build_mock_package_servers(self, count, failed_ids=()):
+        servers = []
+        for index in range(count):
+            server = mock.MagicMock()
+            server.id = 'TESTSVR%d' % index
+            request_details = mock.MagicMock()
+            request_details.Status.return_value = 'failed' if server.id in failed_ids else 'succeeded'
+            server.ExecutePackage.return_value.requests = [request_details]
+            servers.append(server)
+        return servers
+
+    @patch.object(ClcBlueprintPackage, '_get_servers_from_clc')
+    def test_ensure_package_installed_records_server_results(self, mock_get_servers_from_clc):
+        self.module.params = {'wait': True, 'parallelism': 3, 'submission_rate': 0}
+        self.module.check_mode = False
+        servers = self.build_mock_package_servers(3)
+        mock_get_servers_from_clc.return_value = servers
+        under_test = ClcBlueprintPackage(self.module)
+        changed, return_servers, requests = under_test.ensure_package_installed(
+            ['TESTSVR0', 'TESTSVR1', 'TESTSVR2'], 'dummyId', {'key': 'value'})
+        self.assertTrue(changed)
+        self.assertEqual(requests, [])
+        self.assertEqual(under_test.server_results, {
+            'TESTSVR0': {'status': 'succeeded'},
+            'TESTSVR1': {'status': 'succeeded'},
+            'TESTSVR2': {'status': 'succeeded'}})
+        for server in servers:
+            server.ExecutePackage.assert_called_once_with(package_id='dummyId', parameters={'key': 'value'})
+        self.assertFalse(self.module.fail_json.called)
+
+    @patch.object(ClcBlueprintPackage, '_get_servers_from_clc')
+    def test_ensure_package_installed_no_wait_returns_requests(self, mock_get_servers_from_clc):
+        self.module.params = {'wait': False, 'parallelism': 2}
+        self.module.check_mode = False
+        servers = self.build_mock_package_servers(2)
+        mock_get_servers_from_clc.return_value = servers
+        under_test = ClcBlueprintPackage(self.module)
+        changed, return_servers, requests = under_test.ensure_package_installed(
+            ['TESTSVR0', 'TESTSVR1'], 'dummyId', {})
+        self.assertEqual(requests, [server.ExecutePackage.return_value for server in servers])
+        self.assertEqual(under_test.server_results['TESTSVR0'], {'status': 'submitted'})
+        self.assertFalse(servers[0].ExecutePackage.return_value.WaitUntilComplete.called)
+
+    @patch.object(ClcBlueprintPackage, '_get_servers_from_clc')
+    def test_ensure_package_installed_aborts_rolling_waves(self, mock_get_servers_from_clc):
+        self.module.params = {'wait': True, 'parallelism': 2, 'batch_size': 2, 'max_fail_percentage': 40}
+        self.module.check_mode = False
+        servers = self.build_mock_package_servers(5, failed_ids=['TESTSVR1'])
+        mock_get_servers_from_clc.return_value = servers
+        under_test = ClcBlueprintPackage(self.module)
+        under_test.ensure_package_installed(
+            [server.id for server in servers], 'dummyId', {})
+        self.assertFalse(servers[2].ExecutePackage.called)
+        self.assertEqual(under_test.server_results, {
+            'TESTSVR0': {'status': 'succeeded'},
+            'TESTSVR1': {'status': 'failed',
+                         'msg': 'Unable to process package install request for server : TESTSVR1.'},
+            'TESTSVR2': {'status': 'aborted'},
+            'TESTSVR3': {'status': 'aborted'},
+            'TESTSVR4': {'status': 'aborted'}})
+        self.module.fail_json.assert_called_once_with(
+            msg='Unable to install package : dummyId. '
+                'Unable to process package install request for server : TESTSVR1. '
+                'Aborted the installation on the 3 remaining servers.',
+            server_results=under_test.server_results)
+
+    @patch.object(ClcBlueprintPackage, '_get_servers_from_clc')
+    def test_ensure_package_installed_tolerates_failures_within_percentage(self, mock_get_servers_from_clc):
+        self.module.params = {'wait': True, 'parallelism': 2, 'batch_size': 2, 'max_fail_percentage': 50}
+        self.module.check_mode = False
+        error = CLCException()
+        error.message = 'Mock failure message'
+        servers = self.build_mock_package_servers(4)
+        servers[0].ExecutePackage.side_effect = error
+        mock_get_servers_from_clc.return_value = servers
+        under_test = ClcBlueprintPackage(self.module)
+        under_test.ensure_package_installed(
+            [server.id for server in servers], 'dummyId', {})
+        self.assertTrue(servers[3].ExecutePackage.called)
+        self.assertEqual(under_test.server_results['TESTSVR3'], {'status': 'succeeded'})
+        self.module.fail_json.assert_called_once_with(
+            msg='Unable to install package : dummyId. '
+                'Failed to install package : dummyId to server TESTSVR0. Mock failure message',
+            server_results=under_test.server_results)
+
+    def test_marker_store_round_trip(self):
+        marker_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(marker_dir, 'markers', 'state.json')
+            store = clc_blueprint_package.ClcPackageMarkerStore(path)
+            params_hash = store.get_params_hash({'b': 2, 'a': 1})
+            self.assertEqual(params_hash, store.get_params_hash({'a': 1, 'b': 2}))
+            self.assertFalse(store.is_applied('TESTSVR1', 'pkg', params_hash))
+            store.mark('TESTSVR1', 'pkg', params_hash)
+            store.save()
+            reloaded = clc_blueprint_package.ClcPackageMarkerStore(path)
+            self.assertTrue(reloaded.is_applied('TESTSVR1', 'pkg', params_hash))
+            self.assertFalse(reloaded.is_applied('TESTSVR1', 'pkg', store.get_params_hash({'a': 2})))
+        finally:
+            shutil.rmtree(marker_dir)
+
+    @patch.object(ClcBlueprintPackage, '_get_servers_from_clc')
+    def test_ensure_package_installed_skips_marked_servers(self, mock_get_servers_from_clc):
+        marker_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(marker_dir, 'state.json')
+            store = clc_blueprint_package.ClcPackageMarkerStore(path)
+            store.mark('TESTSVR0', 'dummyId', store.get_params_hash({'key': 'value'}))
+            store.save()
+            self.module.params = {'wait': True, 'parallelism': 2,
+                                  'install_marker': 'state_file', 'marker_file': path}
+            self.module.check_mode = False
+            servers = self.build_mock_package_servers(2)
+            mock_get_servers_from_clc.return_value = servers
+            under_test = ClcBlueprintPackage(self.module)
+            changed, return_servers, requests = under_test.ensure_package_installed(
+                ['TESTSVR0', 'TESTSVR1'], 'dummyId', {'key': 'value'})
+            self.assertTrue(changed)
+            self.assertEqual(return_servers, ['TESTSVR1'])
+            self.assertFalse(servers[0].ExecutePackage.called)
+            self.assertEqual(under_test.server_results, {
+                'TESTSVR0': {'status': 'skipped'},
+                'TESTSVR1': {'status': 'succeeded'}})
+            reloaded = clc_blueprint_package.ClcPackageMarkerStore(path)
+            self.assertTrue(reloaded.is_applied(
+                'TESTSVR1', 'dummyId', store.get_params_hash({'key': 'value'})))
+        finally:
+            shutil.rmtree(marker_dir)
+
     def test_wait_for_requests_w_mock_request(self):
         mock_r1 = mock.MagicMock()
         mock_r1.WaitUntilComplete.return_value = True
@@ -699,6 +699,41 @@ class TestClcFirewallPolicy(unittest.TestCase):
         res = under_test._compare_get_request_with_dict(response_dict, firewall_dict)
         self.assertEqual(res, True)
 
+    def test_compare_get_request_with_dict_ignores_order_and_format(self):
+        firewall_dict = {
+            'destination_account_alias': 'WFAD',
+            'source': ['10.122.124.0/24', '10.121.41.7/24'],
+            'destination': ['10.1.1.1'],
+            'ports': ['TCP/80', 'tcp/81-90', 'ICMP']
+        }
+        response_dict = {
+            'destinationAccount': 'wfad',
+            'source': ['10.121.41.0/24', '10.122.124.0/24'],
+            'destination': ['10.1.1.1/32'],
+            'ports': ['icmp', 'tcp/80-90'],
+            'enabled': True
+        }
+        under_test = ClcFirewallPolicy(self.module)
+        res = under_test._compare_get_request_with_dict(response_dict, firewall_dict)
+        self.assertEqual(res, False)
+
+    def test_normalize_addresses(self):
+        self.assertEqual(
+            ClcFirewallPolicy._normalize_addresses(['10.1.1.9/24', 'bogus']),
+            frozenset([(0x0a010100, 24), 'bogus']))
+        self.assertNotEqual(
+            ClcFirewallPolicy._normalize_addresses(['10.1.1.0/24']),
+            ClcFirewallPolicy._normalize_addresses(['10.1.1.0/25']))
+        self.assertEqual(ClcFirewallPolicy._normalize_addresses(None), None)
+
+    def test_normalize_ports(self):
+        self.assertEqual(
+            ClcFirewallPolicy._normalize_ports(['Any', 'UDP/10-5', 'udp/11', 'TCP/22']),
+            frozenset(['any', ('udp', 5, 11), ('tcp', 22, 22)]))
+        self.assertNotEqual(
+            ClcFirewallPolicy._normalize_ports(['tcp/80']),
+            ClcFirewallPolicy._normalize_ports(['udp/80']))
+
     @patch.object(ClcFirewallPolicy, '_get_firewall_policy')
     def test_wait_for_requests_to_complete_pending(self, mock_get):
         mock_pending_status = {
@@ -719,6 +754,115 @@ class TestClcFirewallPolicy(unittest.TestCase):
         under_test._wait_for_requests_to_complete('alias', 'location', 'firewall_pol_id', 2)
         self.assertTrue(under_test._get_firewall_policy.called)
 
+    def test_plan_firewall_policy_set_create_update_prune(self):
+        existing = [
+            {'id': 'p1', 'destinationAccount': 'wfad', 'enabled': True,
+             'source': ['10.0.0.0/24'], 'destination': ['10.1.0.0/24'], 'ports': ['any']},
+            {'id': 'p2', 'destinationAccount': 'wfad', 'enabled': True,
+             'source': ['10.0.0.0/24'], 'destination': ['10.2.0.0/24'], 'ports': ['any']},
+            {'id': 'p3', 'destinationAccount': 'wfad', 'enabled': True,
+             'source': ['10.0.0.0/24'], 'destination': ['10.3.0.0/24'], 'ports': ['any']}]
+        desired = [
+            {'destination_account_alias': 'wfad', 'enabled': True,
+             'source': ['10.0.0.0/24'], 'destination': ['10.1.0.0/24'], 'ports': ['any']},
+            {'destination_account_alias': 'wfad', 'enabled': True,
+             'source': ['10.0.0.0/24'], 'destination': ['10.2.0.0/24'], 'ports': ['TCP/22']},
+            {'destination_account_alias': 'wfad', 'enabled': True,
+             'source': ['10.0.0.0/24'], 'destination': ['10.4.0.0/24'], 'ports': ['any']}]
+        under_test = ClcFirewallPolicy(self.module)
+        changes = under_test._plan_firewall_policy_set(
+            desired, existing, 'present', True)
+        self.assertEqual(
+            [(c['action'], c['firewall_policy_id']) for c in changes],
+            [('unchanged', 'p1'), ('update', 'p2'), ('create', None), ('delete', 'p3')])
+
+    def test_plan_firewall_policy_set_absent(self):
+        existing = [
+            {'id': 'p1', 'destinationAccount': 'wfad', 'enabled': True,
+             'source': ['10.0.0.0/24'], 'destination': ['10.1.0.0/24'], 'ports': ['any']}]
+        desired = [
+            {'firewall_policy_id': 'p1'},
+            {'destination_account_alias': 'wfad',
+             'source': ['10.0.0.0/24'], 'destination': ['10.9.0.0/24']}]
+        under_test = ClcFirewallPolicy(self.module)
+        changes = under_test._plan_firewall_policy_set(
+            desired, existing, 'absent', True)
+        self.assertEqual([c['action'] for c in changes], ['delete', 'unchanged'])
+
+    def test_plan_firewall_policy_set_unknown_id(self):
+        under_test = ClcFirewallPolicy(self.module)
+        under_test._plan_firewall_policy_set(
+            [{'firewall_policy_id': 'missing'}], [], 'present', False)
+        self.module.fail_json.assert_called_with(
+            msg='Unable to find the firewall policy id : missing')
+
+    @patch.object(ClcFirewallPolicy, '_wait_for_policy_set_to_complete')
+    @patch.object(ClcFirewallPolicy, '_get_firewall_policies')
+    @patch.object(clc_firewall_policy, 'clc_sdk')
+    def test_ensure_firewall_policy_set_applies_changes(
+            self, mock_clc_sdk, mock_get_policies, mock_wait):
+        self.module.check_mode = False
+        self.module.params = {'state': 'present', 'prune': True,
+                              'parallelism': 4, 'wait': True,
+                              'destination_account_alias': None}
+        mock_get_policies.return_value = [
+            {'id': 'old', 'destinationAccount': 'wfad', 'enabled': True,
+             'source': ['10.0.0.0/24'], 'destination': ['10.3.0.0/24'], 'ports': ['any']}]
+        mock_clc_sdk.v2.API.Call.return_value = {
+            'links': [{'href': '/v2-experimental/firewallPolicies/wfad/va1/new'}]}
+        under_test = ClcFirewallPolicy(self.module)
+        under_test.clc = mock_clc_sdk
+        changed, report = under_test._ensure_firewall_policy_set(
+            'wfad', 'va1', [{'source': '10.0.0.0/24',
+                             'destination': '10.4.0.0/24',
+                             'ports': 'any'}])
+        self.assertTrue(changed)
+        self.assertFalse(self.module.fail_json.called)
+        self.assertEqual(
+            sorted((r['action'], r['firewall_policy_id']) for r in report),
+            [('create', 'new'), ('delete', 'old')])
+        self.assertEqual(mock_clc_sdk.v2.API.Call.call_count, 2)
+        mock_clc_sdk.v2.API.Call.assert_any_call(
+            'DELETE', '/v2-experimental/firewallPolicies/wfad/va1/old')
+        self.assertTrue(mock_wait.called)
+
+    @patch.object(ClcFirewallPolicy, '_get_firewall_policies')
+    @patch.object(clc_firewall_policy, 'clc_sdk')
+    def test_ensure_firewall_policy_set_reports_failures(
+            self, mock_clc_sdk, mock_get_policies):
+        self.module.check_mode = False
+        self.module.params = {'state': 'present', 'prune': False,
+                              'parallelism': 4, 'wait': True,
+                              'destination_account_alias': None}
+        mock_get_policies.return_value = []
+        error = APIFailedResponse()
+        error.response_text = 'Mock failure message'
+        mock_clc_sdk.v2.API.Call.side_effect = error
+        under_test = ClcFirewallPolicy(self.module)
+        under_test.clc = mock_clc_sdk
+        under_test._ensure_firewall_policy_set(
+            'wfad', 'va1', [{'source': ['10.0.0.0/24'],
+                             'destination': ['10.4.0.0/24'],
+                             'ports': ['any']}])
+        self.assertTrue(self.module.fail_json.called)
+        self.assertIn('Mock failure message',
+                      self.module.fail_json.call_args[1]['msg'])
+
+    @patch.object(ClcFirewallPolicy, '_get_firewall_policies')
+    def test_wait_for_policy_set_to_complete(self, mock_get_policies):
+        self.module.params = {'wait': True}
+        mock_get_policies.return_value = [{'id': 'p1', 'status': 'active'}]
+        changes = [{'action': 'create', 'firewall_policy_id': 'p1'}]
+        under_test = ClcFirewallPolicy(self.module)
+        under_test._wait_for_policy_set_to_complete('wfad', 'va1', changes)
+        self.assertEqual(mock_get_policies.call_count, 1)
+        self.assertEqual(changes[0]['firewall_policy'], {'id': 'p1', 'status': 'active'})
+
+    def test_run_in_parallel_preserves_order(self):
+        result = ClcFirewallPolicy._run_in_parallel(
+            lambda x: x * 2, [1, 2, 3, 4], 3)
+        self.assertEqual(result, [2, 4, 6, 8])
+
     @patch.object(clc_firewall_policy, 'clc_sdk')
     def test_set_user_agent(self, mock_clc_sdk):
         clc_firewall_policy.__version__ = "1"
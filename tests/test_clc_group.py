@@ -20,6 +20,8 @@ from clc import CLCException
 import clc as clc_sdk
 import mock
 from mock import patch
+import shutil
+import tempfile
 import unittest
 
 class TestClcServerFunctions(unittest.TestCase):
@@ -161,6 +163,173 @@ class TestClcServerFunctions(unittest.TestCase):
         res = under_test._walk_groups_recursive('parent', mock_child_group)
         self.assertIsNotNone(res)
 
+    def test_group_index_resolves_paths_ids_and_names(self):
+        mock_web_prod = self.build_mock_group('web')
+        mock_web_prod.id = 'web-prod-id'
+        mock_web_dev = self.build_mock_group('Web')
+        mock_web_dev.id = 'web-dev-id'
+        mock_dev = self.build_mock_group('dev', [mock_web_dev])
+        mock_prod = self.build_mock_group('prod', [mock_web_prod])
+        mock_root = self.build_mock_group('Default Group', [mock_prod, mock_dev])
+        group_index = clc_group.ClcGroupIndex()
+        group_index.add_tree(mock_root)
+
+        self.assertEqual(group_index.get('prod/web'), (mock_web_prod, mock_prod))
+        self.assertEqual(group_index.get('DEV/WEB'), (mock_web_dev, mock_dev))
+        self.assertEqual(group_index.get('web-dev-id'), (mock_web_dev, mock_dev))
+        self.assertEqual(group_index.get('web'), (mock_web_dev, mock_dev))
+        self.assertEqual(group_index.get('web', parent=mock_prod), (mock_web_prod, mock_prod))
+        self.assertEqual(len(group_index.find('web')), 2)
+        self.assertEqual(group_index.get('Default Group'), (mock_root, None))
+        self.assertEqual(group_index.get('missing'), None)
+
+    @patch.object(clc_group, 'clc_sdk')
+    def test_get_group_tree_for_datacenter_fetches_and_caches_tree(self, mock_clc_sdk):
+        mock_clc_sdk.v2.Account.GetAlias.return_value = 'ALIAS'
+        mock_root_group = mock_clc_sdk.v2.Datacenter.return_value.RootGroup.return_value
+        mock_root_group.data = {'id': 'root', 'name': 'UC1 Hardware', 'groups': []}
+        mock_root_group.Subgroups.return_value.groups = []
+        under_test = ClcGroup(self.module)
+        with patch.object(clc_group, 'ClcCatalogCache') as mock_cache:
+            mock_cache.get.return_value = None
+            under_test._get_group_tree_for_datacenter(datacenter='UC1')
+        mock_clc_sdk.v2.Datacenter.assert_called_once_with(location='UC1')
+        mock_cache.put.assert_called_once_with(
+            'group_tree', 'ALIAS_UC1', {'id': 'root', 'name': 'UC1 Hardware', 'groups': []})
+        self.assertEqual(under_test.root_group, mock_root_group)
+
+    @patch.object(clc_group, 'clc_sdk')
+    def test_get_group_tree_for_datacenter_from_cache(self, mock_clc_sdk):
+        mock_clc_sdk.v2.Account.GetAlias.return_value = 'ALIAS'
+        mock_clc_sdk.v2.Group.return_value.Subgroups.return_value.groups = []
+        cached_tree = {'id': 'root', 'name': 'UC1 Hardware', 'groups': []}
+        under_test = ClcGroup(self.module)
+        with patch.object(clc_group, 'ClcCatalogCache') as mock_cache:
+            mock_cache.get.return_value = cached_tree
+            res = under_test._get_group_tree_for_datacenter(datacenter='UC1')
+        mock_cache.get.assert_called_once_with('group_tree', 'ALIAS_UC1')
+        self.assertFalse(mock_clc_sdk.v2.Datacenter.called)
+        mock_clc_sdk.v2.Group.assert_called_once_with(id='root', alias='ALIAS', group_obj=cached_tree)
+        self.assertEqual(list(res.by_path.values()), [(mock_clc_sdk.v2.Group.return_value, None)])
+
+    def test_create_group_invalidates_group_tree_cache(self):
+        cache_dir = tempfile.mkdtemp()
+        try:
+            with patch.dict('os.environ', {'CLC_CACHE_DIR': cache_dir,
+                                           'CLC_CACHE_TTL': '60'}):
+                clc_group.ClcCatalogCache.put('group_tree', 'ALIAS_UC1', {'id': 'root'})
+                mock_parent = mock.MagicMock()
+                under_test = ClcGroup(self.module)
+                under_test.alias = 'ALIAS'
+                under_test.location = 'UC1'
+                under_test.group_index = self.build_group_index({'parent': (mock_parent, None)})
+                under_test._create_group('child', 'parent', 'description')
+                mock_parent.Create.assert_called_once_with(name='child', description='description')
+                self.assertEqual(clc_group.ClcCatalogCache.get('group_tree', 'ALIAS_UC1'), None)
+        finally:
+            shutil.rmtree(cache_dir)
+
+    def build_group_index(self, group_dict):
+        group_index = clc_group.ClcGroupIndex(case_sensitive=True)
+        for path, (group, parent) in group_dict.items():
+            group_index.add(path, group, parent)
+        return group_index
+
+    def build_mock_group(self, name, subgroups=()):
+        group = mock.MagicMock()
+        group.name = name
+        group.id = name + '-id'
+        group.type = 'default'
+        group.Subgroups.return_value.groups = list(subgroups)
+        return group
+
+    def test_get_group_tree_paths(self):
+        self.assertEqual(
+            ClcGroup._get_group_tree_paths(['prod/billing/web', '/prod/billing/db', 'prod/crm']),
+            [('prod',), ('prod', 'billing'), ('prod', 'billing', 'web'),
+             ('prod', 'billing', 'db'), ('prod', 'crm')])
+        self.assertEqual(
+            ClcGroup._get_group_tree_paths({'prod': {'billing': {'web': None}}, 'dev': None}),
+            [('dev',), ('prod',), ('prod', 'billing'), ('prod', 'billing', 'web')])
+
+    def test_ensure_group_tree_is_present_creates_missing_levels(self):
+        mock_billing = self.build_mock_group('billing')
+        mock_prod = self.build_mock_group('prod', [mock_billing])
+        mock_parent = self.build_mock_group('Default Group', [mock_prod])
+        mock_crm = self.build_mock_group('crm')
+        mock_prod.Create.side_effect = lambda name, description: {'crm': mock_crm}[name]
+        mock_billing.Create.side_effect = lambda name, description: self.build_mock_group(name)
+        mock_crm.Create.side_effect = lambda name, description: self.build_mock_group(name)
+        self.module.params = {'parallelism': 3}
+        self.module.check_mode = False
+
+        under_test = ClcGroup(self.module)
+        under_test.root_group = mock_parent
+        under_test.group_index = under_test._walk_groups_recursive(None, mock_parent)
+        changed, groups = under_test._ensure_group_tree_is_present(
+            ['prod/billing/web', 'prod/billing/db', 'prod/crm/web'], None, 'Test Group')
+
+        self.assertTrue(changed)
+        self.assertFalse(mock_parent.Create.called)
+        mock_prod.Create.assert_called_once_with(name='crm', description='Test Group')
+        self.assertEqual(mock_billing.Create.call_count, 2)
+        mock_crm.Create.assert_called_once_with(name='web', description='Test Group')
+        self.assertFalse(mock_crm.Subgroups.called)
+        self.assertEqual(groups, [
+            {'path': 'prod', 'id': 'prod-id', 'changed': False},
+            {'path': 'prod/billing', 'id': 'billing-id', 'changed': False},
+            {'path': 'prod/billing/web', 'id': 'web-id', 'changed': True},
+            {'path': 'prod/billing/db', 'id': 'db-id', 'changed': True},
+            {'path': 'prod/crm', 'id': 'crm-id', 'changed': True},
+            {'path': 'prod/crm/web', 'id': 'web-id', 'changed': True}])
+        self.assertFalse(self.module.fail_json.called)
+
+    def test_ensure_group_tree_is_present_check_mode(self):
+        mock_parent = self.build_mock_group('Default Group')
+        self.module.params = {}
+        self.module.check_mode = True
+
+        under_test = ClcGroup(self.module)
+        under_test.root_group = mock_parent
+        under_test.group_index = self.build_group_index({'Default Group': (mock_parent, None)})
+        changed, groups = under_test._ensure_group_tree_is_present({'prod': {'web': None}}, None, None)
+
+        self.assertTrue(changed)
+        self.assertFalse(mock_parent.Create.called)
+        self.assertEqual(groups, [
+            {'path': 'prod', 'id': None, 'changed': True},
+            {'path': 'prod/web', 'id': None, 'changed': True}])
+
+    def test_ensure_group_tree_is_present_aggregates_failures(self):
+        error = CLCException('Failed')
+        error.response_text = 'Mock failure message'
+        mock_parent = self.build_mock_group('Default Group')
+        mock_parent.Create.side_effect = error
+        self.module.params = {'parallelism': 2}
+        self.module.check_mode = False
+
+        under_test = ClcGroup(self.module)
+        under_test.root_group = mock_parent
+        under_test.group_index = self.build_group_index({'Default Group': (mock_parent, None)})
+        under_test._ensure_group_tree_is_present(['dev', 'prod'], None, None)
+
+        self.module.fail_json.assert_called_with(
+            msg='Failed to create group :dev. Mock failure message '
+                'Failed to create group :prod. Mock failure message')
+
+    def test_process_request_groups_require_state_present(self):
+        self.module.params = {
+            'location': 'UC1',
+            'name': None,
+            'groups': ['prod/web'],
+            'state': 'absent',
+            'wait': True
+        }
+        under_test = ClcGroup(self.module)
+        under_test.process_request()
+        self.module.fail_json.assert_called_once_with(
+            msg='groups is only supported with state present')
+
     @patch.object(ClcGroup, '_set_clc_credentials_from_env')
     @patch.object(clc_group, 'clc_sdk')
     def test_process_request_state_present(self, mock_set_creds, mock_clc_sdk):
@@ -240,7 +409,7 @@ class TestClcServerFunctions(unittest.TestCase):
 
         self.module.check_mode = False
         under_test = ClcGroup(self.module)
-        under_test.group_dict = mock_group_dict
+        under_test.group_index = self.build_group_index(mock_group_dict)
         under_test.root_group = mock_rootgroup
 
         # Test
@@ -266,7 +435,7 @@ class TestClcServerFunctions(unittest.TestCase):
         mock_group_dict = {}
 
         under_test = ClcGroup(self.module)
-        under_test.group_dict = mock_group_dict
+        under_test.group_index = self.build_group_index(mock_group_dict)
         under_test.root_group = mock_rootgroup
 
         # Test
@@ -298,7 +467,7 @@ class TestClcServerFunctions(unittest.TestCase):
                            mock_group.name: (mock_group, mock_parent)}
 
         under_test = ClcGroup(self.module)
-        under_test.group_dict = mock_group_dict
+        under_test.group_index = self.build_group_index(mock_group_dict)
         under_test.root_group = mock_rootgroup
 
         # Test
@@ -318,11 +487,12 @@ class TestClcServerFunctions(unittest.TestCase):
         mock_parent = mock.MagicMock()
         mock_parent.name = "MockParent"
 
-        mock_group_dict = {mock_group.name: (mock_group, mock_parent)}
+        mock_group_dict = {mock_parent.name: (mock_parent, None),
+                           mock_group.name: (mock_group, mock_parent)}
 
         self.module.check_mode = False
         under_test = ClcGroup(self.module)
-        under_test.group_dict = mock_group_dict
+        under_test.group_index = self.build_group_index(mock_group_dict)
 
         # Test
         result_changed, result_group, result = under_test._ensure_group_is_absent(
@@ -331,6 +501,20 @@ class TestClcServerFunctions(unittest.TestCase):
         self.assertEqual(result_changed, True)
         assert mock_group.Delete.call_count == 1
 
+    def test_ensure_group_is_absent_matches_name_case(self):
+        mock_parent = self.build_mock_group('Default Group', [self.build_mock_group('Web')])
+        self.module.check_mode = False
+        under_test = ClcGroup(self.module)
+        under_test.root_group = mock_parent
+        under_test.group_index = under_test._walk_groups_recursive(None, mock_parent)
+
+        result_changed, result_group, result = under_test._ensure_group_is_absent(
+            group_name='web', parent_name='Default Group')
+
+        self.assertEqual(result_changed, False)
+        self.assertFalse(mock_parent.Subgroups.return_value.groups[0].Delete.called)
+        self.assertTrue(under_test._group_exists('Web', 'Default Group'))
+
     def test_ensure_group_is_absent_group_not_exists(self):
 
         # Setup Test
@@ -343,7 +527,7 @@ class TestClcServerFunctions(unittest.TestCase):
         mock_group_dict = {}
 
         under_test = ClcGroup(self.module)
-        under_test.group_dict = mock_group_dict
+        under_test.group_index = self.build_group_index(mock_group_dict)
 
         # Test
         result_changed, result_group, response = under_test._ensure_group_is_absent(
@@ -374,7 +558,7 @@ class TestClcServerFunctions(unittest.TestCase):
                            mock_group.name: (mock_group, mock_parent)}
 
         under_test = ClcGroup(self.module)
-        under_test.group_dict = mock_group_dict
+        under_test.group_index = self.build_group_index(mock_group_dict)
         under_test.root_group = mock_rootgroup
         ret = under_test._create_group('test', mock_parent.name, 'test')
         self.assertIsNone(ret, 'The return value should be None')
@@ -402,7 +586,7 @@ class TestClcServerFunctions(unittest.TestCase):
                            mock_group.name: (mock_group, mock_parent)}
 
         under_test = ClcGroup(self.module)
-        under_test.group_dict = mock_group_dict
+        under_test.group_index = self.build_group_index(mock_group_dict)
         under_test.root_group = mock_rootgroup
         ret = under_test._delete_group('test')
         self.assertIsNone(ret, 'The return value should be None')
@@ -17,6 +17,7 @@
 
 import clc_ansible_module.clc_group_fact as clc_group_fact
 from clc_ansible_module.clc_group_fact import ClcGroupFact
+from tests.fact_helpers import build_fact_module, build_mock_response
 
 from clc import CLCException
 import clc as clc_sdk
@@ -60,7 +61,74 @@ class TestClcGroupFactFunctions(unittest.TestCase):
         self.assertTrue('argument_spec' in result)
         self.assertEqual(
             result['argument_spec'],
-            {'group_id': {'required': True}})
+            {'group_id': {'required': True},
+             'recursive': {'type': 'bool', 'default': False},
+             'include_servers': {'type': 'bool', 'default': False},
+             'parallelism': {'type': 'int', 'default': 10},
+             'fields': {'type': 'list', 'required': False},
+             'exclude': {'type': 'list', 'required': False}})
+
+    def build_group_payload(self, group_id, server_ids, subgroups=()):
+        links = [{'rel': 'self', 'href': '/v2/groups/test_alias/' + group_id}]
+        links.extend([{'rel': 'server', 'id': server_id} for server_id in server_ids])
+        return {'id': group_id, 'links': links, 'groups': list(subgroups)}
+
+    @patch.object(ClcGroupFact, '_set_clc_credentials_from_env')
+    def test_process_request_recursive_include_servers(self, mock_set_creds):
+        group = self.build_group_payload('root', ['server1'], [
+            self.build_group_payload('child', ['server2', 'server3'], [
+                self.build_group_payload('grandchild', [])])])
+        under_test = build_fact_module(
+            ClcGroupFact, self.module,
+            {'group_id': 'root', 'recursive': True, 'include_servers': True, 'parallelism': 3})
+        under_test.session.get.side_effect = lambda url, headers: (
+            build_mock_response(200, group) if '/groups/' in url else
+            build_mock_response(200, {'id': url.split('/')[-1],
+                                      'details': {'memoryMB': 1024, 'ipAddresses': []}}))
+
+        under_test.process_request()
+
+        self.assertEqual(under_test.session.get.call_count, 4)
+        result = self.module.exit_json.call_args[1]['group']
+        self.assertEqual(result['servers'], ['server1'])
+        self.assertEqual([server['id'] for server in result['server_details']], ['server1'])
+        child = result['groups'][0]
+        self.assertEqual(child['servers'], ['server2', 'server3'])
+        self.assertEqual([server['id'] for server in child['server_details']], ['server2', 'server3'])
+        self.assertEqual(child['server_details'][0]['details']['memory'], 1)
+        self.assertEqual(child['groups'][0]['server_details'], [])
+        self.assertFalse(self.module.fail_json.called)
+
+    @patch.object(ClcGroupFact, '_set_clc_credentials_from_env')
+    def test_process_request_not_recursive(self, mock_set_creds):
+        group = self.build_group_payload('root', ['server1'], [
+            self.build_group_payload('child', ['server2'])])
+        under_test = build_fact_module(ClcGroupFact, self.module, {'group_id': 'root'})
+        under_test.session.get.return_value = build_mock_response(200, group)
+
+        under_test.process_request()
+
+        self.assertEqual(under_test.session.get.call_count, 1)
+        result = self.module.exit_json.call_args[1]['group']
+        self.assertEqual(result['servers'], ['server1'])
+        self.assertFalse('servers' in result['groups'][0])
+        self.assertFalse('server_details' in result)
+
+    @patch.object(ClcGroupFact, '_set_clc_credentials_from_env')
+    def test_process_request_include_servers_aggregates_failures(self, mock_set_creds):
+        group = self.build_group_payload('root', ['server1', 'server2'])
+        under_test = build_fact_module(
+            ClcGroupFact, self.module,
+            {'group_id': 'root', 'include_servers': True, 'parallelism': 2})
+        under_test.session.get.side_effect = lambda url, headers: (
+            build_mock_response(200, group) if '/groups/' in url else
+            build_mock_response(404, None))
+
+        under_test.process_request()
+
+        self.module.fail_json.assert_called_once_with(
+            msg='Failed to retrieve server facts: server1 Failed to retrieve server facts: server2')
+        self.assertFalse(self.module.exit_json.called)
 
     def test_get_endpoint(self):
         under_test = ClcGroupFact(self.module)
@@ -55,6 +55,34 @@ class TestClcInvFunctions(unittest.TestCase):
     def test_find_hostvars_single_server_uses_unique_session(self):
         pass
 
+    @patch('clc_inv.clc')
+    def test_find_hostvars_single_server_uses_caching_session(self, mock_clc_sdk):
+        mock_clc_sdk.v2.Server.return_value.data = {}
+        clc_inv._find_hostvars_single_server('testServer')
+        session = mock_clc_sdk.v2.API.Call.call_args[1]['session']
+        self.assertIsInstance(session, clc_inv.ClcCachingSession)
+
+    @patch('clc_inv.clc')
+    def test_find_hostvars_single_server_projects_clc_data(self, mock_clc_sdk):
+        server = mock.MagicMock()
+        server.name = 'testServer'
+        server.data = {'os': 'ubuntu14_64Bit',
+                       'locationId': 'UC1',
+                       'links': [{'rel': 'self'}],
+                       'details': {'ipAddresses': [{'internal': '10.0.0.5'}],
+                                   'customFields': [{'name': 'owner'}],
+                                   'partitions': [{'path': '/'}]}}
+        mock_clc_sdk.v2.Server.return_value = server
+        with patch.dict('os.environ', {'CLC_INVENTORY_FIELDS': 'locationId, details',
+                                       'CLC_INVENTORY_EXCLUDE': 'details.partitions'}):
+            result = clc_inv._find_hostvars_single_server('testServer')
+        self.assertEqual(result['testServer']['ansible_ssh_host'], '10.0.0.5')
+        self.assertEqual(result['testServer']['clc_custom_fields'], [{'name': 'owner'}])
+        self.assertEqual(result['testServer']['clc_data'], {
+            'locationId': 'UC1',
+            'details': {'ipAddresses': [{'internal': '10.0.0.5'}],
+                        'customFields': [{'name': 'owner'}]}})
+
     @patch.object(clc_inv, 'clc')
     def test_set_clc_credentials_from_env(self, mock_clc_sdk):
         with patch.dict('os.environ', {'CLC_V2_API_TOKEN': 'dummyToken',
@@ -104,6 +132,23 @@ class TestClcInvFunctions(unittest.TestCase):
         except:
             self.fail('Exception was thrown when it was not expected')
 
+    @patch('clc_inv.clc')
+    def test_find_hostvars_single_server_keeps_location_out_of_projection(self, mock_clc_sdk):
+        server = mock.MagicMock()
+        server.name = 'testServer'
+        server.data = {'os': 'ubuntu14_64Bit',
+                       'locationId': 'UC1',
+                       'details': {'ipAddresses': [{'internal': '10.0.0.5'}],
+                                   'customFields': []}}
+        mock_clc_sdk.v2.Server.return_value = server
+        with patch.dict('os.environ', {'CLC_INVENTORY_FIELDS': 'details.ipAddresses'}):
+            hostvars = clc_inv._find_hostvars_single_server('testServer')
+        self.assertEqual(hostvars['testServer']['clc_data'],
+                         {'details': {'ipAddresses': [{'internal': '10.0.0.5'}]}})
+        self.assertEqual(hostvars['testServer']['clc_location'], 'UC1')
+        self.assertEqual(clc_inv._build_datacenter_groups({'hostvars': hostvars}),
+                         {'UC1': ['testServer']})
+
     def test_build_datacenter_groups(self):
         try:
             input = {
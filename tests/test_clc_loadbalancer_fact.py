@@ -102,9 +102,10 @@ class TestClcLoadbalancerFact(unittest.TestCase):
         self.assertTrue('argument_spec' in result)
         self.assertEqual(
             result['argument_spec'],
-            {'name': {'required': True},
+            {'name': {'required': False},
              'location': {'required': True},
-             'alias': {'required': True}})
+             'alias': {'required': True},
+             'parallelism': {'type': 'int', 'default': 10}})
 
     def test_set_clc_credentials_from_env(self):
         # Required combination of credentials not passed
@@ -154,6 +155,55 @@ class TestClcLoadbalancerFact(unittest.TestCase):
     def test_get_endpoint(self):
         pass
 
+    @patch.object(clc_loadbalancer_fact, 'clc_sdk')
+    def test_process_request_without_name_returns_all_loadbalancers(self, mock_clc_sdk):
+        lb_list = [{'name': 'lb1', 'id': 'lb_id1'}, {'name': 'lb2', 'id': 'lb_id2'}]
+        details = {
+            '/v2/sharedLoadBalancers/alias/uc1/lb_id1': {'name': 'lb1', 'id': 'lb_id1', 'pools': [{'nodes': []}]},
+            '/v2/sharedLoadBalancers/alias/uc1/lb_id2': {'name': 'lb2', 'id': 'lb_id2', 'pools': []},
+        }
+        mock_clc_sdk.v2.API.Call.side_effect = lambda method, url: (
+            lb_list if url == '/v2/sharedLoadBalancers/alias/uc1' else details[url])
+        self.module.params = {'location': 'uc1', 'alias': 'alias', 'parallelism': 2}
+        under_test = ClcLoadbalancerFact(self.module)
+
+        with patch.object(under_test, '_set_clc_credentials_from_env'):
+            under_test.process_request()
+
+        self.assertEqual(mock_clc_sdk.v2.API.Call.call_count, 3)
+        self.module.exit_json.assert_called_once_with(changed=False, loadbalancers={
+            'lb1': details['/v2/sharedLoadBalancers/alias/uc1/lb_id1'],
+            'lb2': details['/v2/sharedLoadBalancers/alias/uc1/lb_id2']})
+        self.assertFalse(self.module.fail_json.called)
+
+    def test_get_all_loadbalancers_keys_duplicate_names_by_id(self):
+        self.module.params = {'parallelism': 2}
+        under_test = ClcLoadbalancerFact(self.module)
+        under_test.clc = mock.MagicMock()
+        under_test.lb_dict = [{'name': 'web', 'id': 'lb_id1'}, {'name': 'web', 'id': 'lb_id2'},
+                              {'name': 'db', 'id': 'lb_id3'}]
+        under_test.clc.v2.API.Call.side_effect = lambda method, url: [
+            lb for lb in under_test.lb_dict if url.endswith('/' + lb['id'])][0]
+
+        result = under_test._get_all_loadbalancers('alias', 'uc1')
+
+        self.assertEqual(sorted(result.keys()), ['db', 'lb_id1', 'lb_id2'])
+        self.assertEqual(result['lb_id2'], {'name': 'web', 'id': 'lb_id2'})
+        self.assertFalse(self.module.fail_json.called)
+
+    def test_get_all_loadbalancers_aggregates_failures(self):
+        self.module.params = {'parallelism': 2}
+        under_test = ClcLoadbalancerFact(self.module)
+        under_test.clc = mock.MagicMock()
+        under_test.clc.v2.API.Call.side_effect = APIFailedResponse('Mock failure')
+        under_test.lb_dict = [{'name': 'lb1', 'id': 'lb_id1'}, {'name': 'lb2', 'id': 'lb_id2'}]
+
+        under_test._get_all_loadbalancers('alias', 'uc1')
+
+        self.module.fail_json.assert_called_once_with(
+            msg='Unable to get information for load balancer lb1 with account: alias at location: uc1. Mock failure '
+                'Unable to get information for load balancer lb2 with account: alias at location: uc1. Mock failure')
+
 
 if __name__ == '__main__':
     unittest.main()
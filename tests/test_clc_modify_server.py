@@ -22,6 +22,7 @@ from mock import patch
 
 import clc_ansible_module.clc_modify_server as clc_modify_server
 from clc_ansible_module.clc_modify_server import ClcModifyServer
+from clc_ansible_module.clc_modify_server import ClcNetworkCatalog
 
 
 
@@ -443,6 +444,27 @@ class TestClcModifyServerFunctions(unittest.TestCase):
         self.assertFalse(self.module.fail_json.called)
         self.assertIsNotNone(result)
 
+    @patch.object(clc_modify_server, 'ClcCatalogCache')
+    @patch.object(clc_modify_server, 'clc_sdk')
+    def test_get_aa_policy_id_from_catalog_cache(self, mock_clc_sdk, mock_cache):
+        mock_cache.get.return_value = [{'name': 'test1', 'id': '111', 'location': 'UC1', 'servers': []}]
+        policy_id = ClcModifyServer._get_aa_policy_id_by_name(mock_clc_sdk, None, 'alias', 'test1')
+        self.assertEqual('111', policy_id)
+        self.assertFalse(mock_clc_sdk.v2.API.Call.called)
+        self.assertFalse(mock_cache.put.called)
+
+    @patch.object(clc_modify_server, 'ClcCatalogCache')
+    @patch.object(clc_modify_server, 'clc_sdk')
+    def test_get_aa_policy_catalog_fills_cache(self, mock_clc_sdk, mock_cache):
+        mock_cache.get.return_value = None
+        mock_clc_sdk.v2.API.Call.return_value = {'items': [
+            {'name': 'test1', 'id': '111', 'location': 'UC1',
+             'links': [{'rel': 'self', 'id': '111'}, {'rel': 'server', 'id': 'svr1'}]}]}
+        catalog = ClcModifyServer._get_aa_policy_catalog(mock_clc_sdk, 'alias')
+        expected = [{'name': 'test1', 'id': '111', 'location': 'UC1', 'servers': ['svr1']}]
+        self.assertEqual(catalog, expected)
+        mock_cache.put.assert_called_once_with('aa_policies', 'alias', expected)
+
     @patch.object(clc_modify_server, 'clc_sdk')
     def test_get_anti_affinity_policy_id_by_name_singe_match(self, mock_clc_sdk):
         mock_clc_sdk.v2.API.Call.side_effect = [{'items' :
@@ -702,6 +724,222 @@ class TestClcModifyServerFunctions(unittest.TestCase):
         self.assertEqual(changed, True)
         self.assertEqual(result[0], 'server1')
 
+    @patch.object(ClcModifyServer, '_get_servers_from_clc')
+    @patch.object(ClcModifyServer, '_ensure_nic_present')
+    @patch.object(ClcModifyServer, '_ensure_alert_policy_present')
+    @patch.object(ClcModifyServer, '_ensure_aa_policy_present')
+    @patch.object(ClcModifyServer, '_ensure_server_config')
+    @patch.object(clc_modify_server, 'clc_sdk')
+    def test_modify_servers_in_parallel_keeps_order(
+            self, mock_clc_sdk, mock_ensure_config, mock_aa_pol, mock_alert_pol,
+            mock_nic, mock_get_servers):
+        self.module.params = {'state': 'present', 'wait': False, 'parallelism': 4}
+        servers = []
+        for index in range(8):
+            server = mock.MagicMock()
+            server.id = 'server%d' % index
+            servers.append(server)
+        mock_get_servers.return_value = servers
+        mock_ensure_config.side_effect = lambda server, params: (server.id != 'server3', None)
+        mock_aa_pol.return_value = False
+        mock_alert_pol.return_value = False
+        mock_nic.return_value = False
+        under_test = ClcModifyServer(self.module)
+        changed, server, result = under_test._modify_servers([s.id for s in servers])
+        self.assertEqual(changed, True)
+        self.assertEqual(result, ['server%d' % i for i in range(8) if i != 3])
+        self.assertFalse(self.module.fail_json.called)
+
+    @patch.object(ClcModifyServer, '_get_servers_from_clc')
+    @patch.object(ClcModifyServer, '_ensure_alert_policy_absent')
+    @patch.object(ClcModifyServer, '_ensure_aa_policy_absent')
+    @patch.object(clc_modify_server, 'clc_sdk')
+    def test_modify_servers_aggregates_failures(
+            self, mock_clc_sdk, mock_ensure_aa_pol, mock_ensure_alert_pol, mock_get_servers):
+        self.module.params = {'state': 'absent', 'wait': True, 'parallelism': 2}
+        server1 = mock.MagicMock()
+        server1.id = 'server1'
+        server2 = mock.MagicMock()
+        server2.id = 'server2'
+        mock_get_servers.return_value = [server1, server2]
+
+        def ensure_aa_pol(server, params):
+            return under_test.module.fail_json(msg='failed %s.' % server.id)
+        mock_ensure_aa_pol.side_effect = ensure_aa_pol
+        mock_ensure_alert_pol.return_value = False
+        under_test = ClcModifyServer(self.module)
+        under_test._modify_servers(['server1', 'server2'])
+        self.module.fail_json.assert_called_once_with(
+            msg='Unable to modify the servers. failed server1. failed server2.')
+        self.assertEqual(under_test.module, self.module)
+
+    @patch.object(ClcModifyServer, '_get_servers_from_clc')
+    @patch.object(ClcModifyServer, '_ensure_nic_present')
+    @patch.object(ClcModifyServer, '_ensure_alert_policy_present')
+    @patch.object(ClcModifyServer, '_ensure_aa_policy_present')
+    @patch.object(ClcModifyServer, '_ensure_server_config')
+    @patch.object(clc_modify_server, 'clc_sdk')
+    def test_modify_servers_in_batches(
+            self, mock_clc_sdk, mock_ensure_config, mock_aa_pol, mock_alert_pol,
+            mock_nic, mock_get_servers):
+        self.module.params = {'state': 'present', 'wait': True, 'batch_size': 2,
+                              'max_failures': 0, 'parallelism': 2}
+        servers = []
+        for index in range(5):
+            server = mock.MagicMock()
+            server.id = 'server%d' % index
+            servers.append(server)
+        mock_get_servers.return_value = servers
+        request = mock.MagicMock()
+        request.WaitUntilComplete.return_value = 0
+        mock_ensure_config.return_value = (True, request)
+        mock_aa_pol.return_value = False
+        mock_alert_pol.return_value = False
+        mock_nic.return_value = False
+        under_test = ClcModifyServer(self.module)
+        changed, server, result = under_test._modify_servers([s.id for s in servers])
+        self.assertEqual(result, ['server%d' % i for i in range(5)])
+        self.assertEqual(request.WaitUntilComplete.call_count, 5)
+        self.assertFalse(self.module.fail_json.called)
+
+    @patch.object(ClcModifyServer, '_get_servers_from_clc')
+    @patch.object(ClcModifyServer, '_ensure_nic_present')
+    @patch.object(ClcModifyServer, '_ensure_alert_policy_present')
+    @patch.object(ClcModifyServer, '_ensure_aa_policy_present')
+    @patch.object(ClcModifyServer, '_ensure_server_config')
+    @patch.object(clc_modify_server, 'clc_sdk')
+    def test_modify_servers_in_batches_aborts_on_failures(
+            self, mock_clc_sdk, mock_ensure_config, mock_aa_pol, mock_alert_pol,
+            mock_nic, mock_get_servers):
+        self.module.params = {'state': 'present', 'wait': True, 'batch_size': 2,
+                              'max_failures': 0, 'parallelism': 2}
+        servers = []
+        for index in range(5):
+            server = mock.MagicMock()
+            server.id = 'server%d' % index
+            servers.append(server)
+        mock_get_servers.return_value = servers
+        failed_request = mock.MagicMock()
+        failed_request.WaitUntilComplete.return_value = 1
+        ok_request = mock.MagicMock()
+        ok_request.WaitUntilComplete.return_value = 0
+        mock_ensure_config.side_effect = lambda server, params: (
+            True, failed_request if server.id == 'server1' else ok_request)
+        mock_aa_pol.return_value = False
+        mock_alert_pol.return_value = False
+        mock_nic.return_value = False
+        under_test = ClcModifyServer(self.module)
+        under_test._modify_servers([s.id for s in servers])
+        self.assertEqual(mock_ensure_config.call_count, 2)
+        self.module.fail_json.assert_called_once_with(
+            msg='Unable to modify the servers. '
+                'Unable to process modify server request for server : "server1". '
+                'Aborted the modification of the 3 remaining servers.',
+            server_ids=['server0'])
+
+    @patch.object(ClcModifyServer, '_modify_server_wave')
+    def test_modify_servers_in_batches_without_wait(self, mock_wave):
+        self.module.params = {'state': 'present', 'wait': False, 'batch_size': 2,
+                              'max_failures': 0, 'parallelism': 2}
+        under_test = ClcModifyServer(self.module)
+        under_test._modify_servers_in_batches([mock.MagicMock()], 'present', {})
+        self.module.fail_json.assert_called_once_with(
+            msg='batch_size waits for each wave and cannot be used with wait set to false')
+        self.assertFalse(mock_wave.called)
+
+    @patch.object(ClcModifyServer, '_get_aa_policy_id_of_server')
+    @patch.object(ClcModifyServer, '_resolve_task_context')
+    def test_plan_server_changes_present(self, mock_context, mock_get_server_aa_pol):
+        self.module.params = {'state': 'present', 'parallelism': 2}
+        mock_context.return_value = {'alias': 'alias', 'cpu': 4, 'memory': 4,
+                                     'anti_affinity_policy_id': 'aa_new',
+                                     'alert_policy_id': 'alert_id',
+                                     'network_id': 'net_id',
+                                     'networks': self.build_network_catalog()}
+        mock_get_server_aa_pol.return_value = 'aa_old'
+        server1 = mock.MagicMock(cpu=2, memory=4, alertPolicies=[{'id': 'alert_id'}],
+                                 data={'details': {'ipAddresses': [{'internal': '10.0.0.5'}]}})
+        server2 = mock.MagicMock(cpu=4, memory=4, alertPolicies=[],
+                                 data={'details': {'ipAddresses': [{'internal': '10.1.0.5'}]}})
+        under_test = ClcModifyServer(self.module)
+        under_test.clc = mock.MagicMock()
+        under_test.clc.v2.Server.side_effect = \
+            lambda id, alias: server1 if id == 'server1' else server2
+        changed, plan = under_test._plan_server_changes(['server1', 'server2'])
+        self.assertTrue(changed)
+        self.assertEqual(plan, [
+            {'id': 'server1',
+             'cpu': {'before': 2, 'after': 4},
+             'anti_affinity_policy': {'action': 'attach', 'before': 'aa_old', 'after': 'aa_new'}},
+            {'id': 'server2',
+             'anti_affinity_policy': {'action': 'attach', 'before': 'aa_old', 'after': 'aa_new'},
+             'alert_policy': {'action': 'attach', 'id': 'alert_id'},
+             'nic': {'action': 'add', 'network_id': 'net_id'}}])
+        self.assertFalse(self.module.fail_json.called)
+
+    @patch.object(ClcModifyServer, '_get_aa_policy_id_of_server')
+    @patch.object(ClcModifyServer, '_resolve_task_context')
+    def test_plan_server_changes_absent(self, mock_context, mock_get_server_aa_pol):
+        self.module.params = {'state': 'absent'}
+        mock_context.return_value = {'alias': 'alias',
+                                     'anti_affinity_policy_id': 'aa_id',
+                                     'alert_policy_id': 'alert_id',
+                                     'network_id': 'net_id',
+                                     'networks': self.build_network_catalog()}
+        mock_get_server_aa_pol.return_value = 'other_aa_id'
+        server1 = mock.MagicMock(alertPolicies=[{'id': 'alert_id'}],
+                                 data={'details': {'ipAddresses': [{'internal': '10.0.0.5'}]}})
+        server2 = mock.MagicMock(alertPolicies=[],
+                                 data={'details': {'ipAddresses': [{'internal': '10.1.0.5'}]}})
+        under_test = ClcModifyServer(self.module)
+        under_test.clc = mock.MagicMock()
+        under_test.clc.v2.Server.side_effect = \
+            lambda id, alias: server1 if id == 'server1' else server2
+        changed, plan = under_test._plan_server_changes(['server1', 'server2'])
+        self.assertTrue(changed)
+        self.assertEqual(plan, [{'id': 'server1',
+                                 'alert_policy': {'action': 'detach', 'id': 'alert_id'},
+                                 'nic': {'action': 'remove', 'network_id': 'net_id'}},
+                                {'id': 'server2'}])
+
+    def build_network_catalog(self):
+        network = mock.MagicMock(id='net_id', data={'name': 'net', 'cidr': '10.0.0.0/24'})
+        return ClcNetworkCatalog([network])
+
+    @patch.object(ClcModifyServer, '_resolve_task_context')
+    def test_plan_server_changes_fetch_error(self, mock_context):
+        self.module.params = {'state': 'present'}
+        mock_context.return_value = {'alias': 'alias'}
+        under_test = ClcModifyServer(self.module)
+        under_test.clc = mock.MagicMock()
+        under_test.clc.v2.Server.side_effect = CLCException('not found')
+        under_test._plan_server_changes(['server1'])
+        self.module.fail_json.assert_called_once_with(
+            msg='Unable to plan the server changes. Unable to fetch the server server1. not found')
+
+    @patch.object(ClcModifyServer, '_plan_server_changes')
+    @patch.object(ClcModifyServer, '_set_clc_credentials_from_env')
+    def test_process_request_check_mode_returns_plan(self, mock_set_clc_creds, mock_plan):
+        self.module.params = {'state': 'present', 'server_ids': ['server1', 'server2']}
+        self.module.check_mode = True
+        plan = [{'id': 'server1', 'cpu': {'before': 1, 'after': 2}}, {'id': 'server2'}]
+        mock_plan.return_value = (True, plan)
+        under_test = ClcModifyServer(self.module)
+        under_test.process_request()
+        self.module.exit_json.assert_called_once_with(
+            changed=True, server_ids=['server1'], servers=[], plan=plan)
+
+    def test_clc_requests_session_sets_content_type_per_request(self):
+        session = clc_modify_server.ClcRequestsSession()
+        session.headers['content-type'] = 'application/x-www-form-urlencoded'
+        with patch.object(clc_modify_server.requests.Session, 'request') as mock_request:
+            session.request('PATCH', 'http://localhost', data='[]')
+            session.request('DELETE', 'http://localhost', data={})
+        self.assertEqual(mock_request.call_args_list[0][1]['headers'],
+                         {'content-type': 'Application/json'})
+        self.assertEqual(mock_request.call_args_list[1][1]['headers'],
+                         {'content-type': 'application/x-www-form-urlencoded'})
+
     def test_modify_servers_empty_servers(self):
         under_test = ClcModifyServer(self.module)
         under_test._modify_servers(None)
@@ -913,7 +1151,8 @@ class TestClcModifyServerFunctions(unittest.TestCase):
         mock_network1.id = 'test1'
         mock_network2 = mock.MagicMock()
         mock_network2.id = 'test2'
-        mock_datacenter.Networks().Get.return_value = mock_network1
+        mock_network1.data = {'id': 'test1', 'name': 'test2'}
+        mock_datacenter.Networks().networks = [mock_network1]
         ret = ClcModifyServer._find_network_id(self.module, mock_datacenter)
         self.assertEqual(ret, 'test1')
         self.assertEqual(self.module.fail_json.called, False)
@@ -929,7 +1168,7 @@ class TestClcModifyServerFunctions(unittest.TestCase):
         mock_network1.id = 'test1'
         mock_network2 = mock.MagicMock()
         mock_network2.id = 'test2'
-        mock_datacenter.Networks().Get.return_value = None
+        mock_datacenter.Networks().networks = []
         ClcModifyServer._find_network_id(self.module, mock_datacenter)
         self.module.fail_json.assert_called_with(msg='Unable to find a network with name/id "test1" at location: DC1')
 
@@ -1029,6 +1268,51 @@ class TestClcModifyServerFunctions(unittest.TestCase):
         changed, server, result = under_test._modify_servers(server_ids)
         self.assertEqual(changed, True)
 
+    @patch.object(ClcModifyServer, '_get_alert_policy_id_by_name')
+    @patch.object(ClcModifyServer, '_get_aa_policy_id_by_name')
+    @patch.object(ClcModifyServer, '_find_network_id')
+    @patch.object(ClcModifyServer, '_find_datacenter')
+    def test_resolve_task_context(self, mock_dc, mock_network, mock_aa_pol, mock_alert_pol):
+        mock_network.return_value = 'net_id'
+        mock_aa_pol.return_value = 'aa_id'
+        mock_alert_pol.return_value = 'alert_id'
+        under_test = ClcModifyServer(self.module)
+        under_test.clc = mock.MagicMock()
+        under_test.clc.v2.Account.GetAlias.return_value = 'alias'
+        server_params = {'additional_network': 'beer',
+                         'anti_affinity_policy_name': 'aa_name',
+                         'alert_policy_name': 'alert_name'}
+        context = under_test._resolve_task_context(server_params)
+        self.assertEqual(context['alias'], 'alias')
+        self.assertEqual(context['network_id'], 'net_id')
+        self.assertEqual(context['anti_affinity_policy_id'], 'aa_id')
+        self.assertEqual(context['alert_policy_id'], 'alert_id')
+        self.assertNotIn('alias', server_params)
+        mock_aa_pol.assert_called_once_with(under_test.clc, self.module, 'alias', 'aa_name')
+        mock_alert_pol.assert_called_once_with(under_test.clc, self.module, 'alias', 'alert_name')
+
+    @patch.object(ClcModifyServer, '_find_datacenter')
+    def test_resolve_task_context_without_lookups(self, mock_dc):
+        under_test = ClcModifyServer(self.module)
+        under_test.clc = mock.MagicMock()
+        under_test.clc.v2.Account.GetAlias.return_value = 'alias'
+        context = under_test._resolve_task_context({'anti_affinity_policy_id': 'aa_id'})
+        self.assertEqual(context, {'alias': 'alias', 'anti_affinity_policy_id': 'aa_id'})
+        self.assertFalse(mock_dc.called)
+
+    @patch.object(ClcModifyServer, '_find_network_id')
+    @patch.object(ClcModifyServer, '_find_datacenter')
+    def test_modify_add_nic_uses_resolved_network(self, mock_dc, mock_network):
+        self.module.check_mode = False
+        self.module.params = {'wait': False}
+        under_test = ClcModifyServer(self.module)
+        under_test._modify_add_nic(self.clc, self.module, 'server_id', 'alias', 'net_id')
+        self.assertFalse(mock_dc.called)
+        self.assertFalse(mock_network.called)
+        self.assertFalse(self.clc.v2.Account.GetAlias.called)
+        self.clc.v2.Server.assert_called_once_with(alias='alias', id='server_id')
+        self.clc.v2.Server.return_value.AddNIC.assert_called_once_with(network_id='net_id')
+
     @patch.object(ClcModifyServer, '_modify_remove_nic')
     def test_ensure_nic_absent_calls_modify_remove_nic(self, mock_remove_nic):
         self.module.clc = self.clc
@@ -1036,9 +1320,12 @@ class TestClcModifyServerFunctions(unittest.TestCase):
         mock_server.id = 'test_id'
 
         under_test = ClcModifyServer(self.module)
-        under_test._ensure_nic_absent(mock_server, {'additional_network': 'beer'})
+        under_test._ensure_nic_absent(mock_server, {'additional_network': 'beer',
+                                                    'alias': 'alias',
+                                                    'network_id': 'net_id'})
 
-        mock_remove_nic.assert_called_once_with(under_test.clc, under_test.module, 'test_id')
+        mock_remove_nic.assert_called_once_with(under_test.clc, under_test.module, 'test_id',
+                                                'alias', 'net_id')
 
     @patch.object(ClcModifyServer, '_modify_remove_nic')
     def test_ensure_nic_absent_returns_false_if_network_not_provided(self, mock_remove_nic):
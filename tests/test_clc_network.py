@@ -22,6 +22,8 @@ from clc import CLCException
 import mock
 from mock import patch, create_autospec
 import os
+import shutil
+import tempfile
 import unittest
 
 def FakeAnsibleModule():
@@ -169,6 +171,8 @@ class TestClcNetwork(unittest.TestCase):
             name=dict(required=False),
             location=dict(required=True),
             description=dict(required=False),
+            networks=dict(type='list', required=False),
+            parallelism=dict(type='int', default=10),
             state=dict(default='present', choices=['present', 'absent']),
             wait=dict(default=True, type='bool')
         ))
@@ -176,16 +180,167 @@ class TestClcNetwork(unittest.TestCase):
     @patch.object(ClcNetwork, '_set_clc_credentials_from_env')
     def test_process_request_populates_network_list(self, mock_set_creds):
         mock_nets = mock.MagicMock()
+        mock_nets.networks = [self.build_mock_network('12345', 'existing', '10.0.0.0/24')]
         self.network.clc.v2.Networks = mock.MagicMock(return_value=mock_nets)
         self.module.params = {
             'id': 'nope',
             'location': 'mock_loc'
         }
 
-        self.network.process_request()
+        with patch.object(self.network.clc.v2.Account, 'GetAlias', return_value='mock_alias'):
+            self.network.process_request()
 
         self.network.clc.v2.Networks.assert_called_once_with(location="mock_loc")
-        self.assertEqual(mock_nets, self.network.networks)
+        self.assertEqual(mock_nets.networks, self.network.networks.networks)
+
+    def build_mock_claim(self, network_id):
+        request = mock.MagicMock()
+        request.requests[0].uri = 'status/' + network_id
+        request.WaitUntilComplete.return_value = 0
+        return request
+
+    @patch.object(ClcNetwork, '_set_clc_credentials_from_env')
+    def test_process_request_networks_claims_missing_networks(self, mock_set_creds):
+        claims = [self.build_mock_claim('net1'), self.build_mock_claim('net2')]
+        self.network.clc.v2.Network.Create = mock.MagicMock(side_effect=claims)
+        self.network.clc.v2.API.Call = mock.MagicMock(side_effect=lambda method, uri: (
+            {'summary': {'links': [{'href': 'networks/' + uri.split('/')[-1]}]}}
+            if uri.startswith('status/') else {'id': uri.split('/')[-1]}))
+        self.network.clc.v2.Network.side_effect = lambda id, network_obj: self.build_mock_network(
+            id, None, None)
+        self.existing_net.description = 'current'
+        self.existing_net.data = {'name': 'existing'}
+        self.module.params = {
+            'location': 'mock_loc',
+            'networks': [{'name': 'web', 'description': 'Web tier'}, 'existing', {'name': 'db'}],
+            'parallelism': 2,
+            'wait': True
+        }
+
+        with patch.object(ClcNetwork, '_populate_networks', return_value=self.mock_nets):
+            self.network.process_request()
+
+        self.assertEqual(self.network.clc.v2.Network.Create.call_count, 2)
+        self.network.clc.v2.Network.Create.assert_called_with(location='mock_loc')
+        for claim in claims:
+            claim.WaitUntilComplete.assert_called_once_with()
+        self.assertFalse(self.existing_net.Update.called)
+        changed = self.module.exit_json.call_args[1]['changed']
+        networks = self.module.exit_json.call_args[1]['networks']
+        self.assertTrue(changed)
+        self.assertEqual([network['id'] for network in networks[::2]], ['net1', 'net2'])
+        self.assertEqual(networks[1], {'name': 'existing'})
+        self.assertFalse(self.module.fail_json.called)
+
+    @patch.object(ClcNetwork, '_set_clc_credentials_from_env')
+    def test_process_request_networks_check_mode(self, mock_set_creds):
+        self.network.clc.v2.Network.Create = mock.MagicMock()
+        self.module.check_mode = True
+        self.module.params = {
+            'location': 'mock_loc',
+            'networks': ['web', 'db'],
+        }
+
+        with patch.object(ClcNetwork, '_populate_networks', return_value=self.mock_nets):
+            self.network.process_request()
+
+        self.assertFalse(self.network.clc.v2.Network.Create.called)
+        self.module.exit_json.assert_called_once_with(
+            changed=True,
+            networks=[{'name': 'web', 'claimed': False}, {'name': 'db', 'claimed': False}])
+
+    @patch('clc_ansible_module.clc_network.ClcNetworkCatalog.invalidate')
+    def test_ensure_networks_present_reports_claims_on_failure(self, mock_invalidate):
+        error = CLCException('Mock failure message')
+        self.network.clc.v2.Network.Create = mock.MagicMock(
+            side_effect=[self.build_mock_claim('net1'), error])
+        self.network.clc.v2.API.Call = mock.MagicMock(side_effect=lambda method, uri: (
+            {'summary': {'links': [{'href': 'networks/' + uri.split('/')[-1]}]}}
+            if uri.startswith('status/') else {'id': uri.split('/')[-1]}))
+        named_network = self.build_mock_network('net1', 'web', None)
+        self.network.clc.v2.Network.side_effect = lambda id, network_obj: named_network
+        self.module.params = {
+            'location': 'mock_loc',
+            'networks': ['web', 'db'],
+            'parallelism': 1,
+            'wait': True
+        }
+
+        self.network.networks = self.mock_nets
+        self.network.alias = 'mock_alias'
+
+        self.network._ensure_networks_present(self.module.params)
+
+        self.module.fail_json.assert_called_once_with(
+            msg='Unable to claim a network in location mock_loc. Mock failure message',
+            networks=[named_network.data, {'name': 'db', 'claimed': False}])
+        named_network.Update.assert_called_once_with('web', location='mock_loc')
+        mock_invalidate.assert_called_once_with('mock_alias', 'mock_loc')
+
+    def test_claim_networks_returns_failures(self):
+        error = CLCException('Mock failure message')
+        self.network.clc.v2.Network.Create = mock.MagicMock(side_effect=error)
+        self.module.params = {'parallelism': 2}
+
+        claims = self.network._claim_networks('mock_loc', 2)
+
+        self.assertEqual(claims, [(None, 'Unable to claim a network in location mock_loc. Mock failure message')] * 2)
+        self.assertFalse(self.module.fail_json.called)
+
+    @patch.object(ClcNetwork, '_set_clc_credentials_from_env')
+    def test_process_request_networks_require_state_present(self, mock_set_creds):
+        self.module.params = {
+            'location': 'mock_loc',
+            'networks': ['web'],
+            'state': 'absent'
+        }
+
+        with patch.object(ClcNetwork, '_populate_networks', return_value=self.mock_nets):
+            self.network.process_request()
+
+        self.module.fail_json.assert_called_once_with(
+            msg='networks is only supported with state present')
+
+    def build_mock_network(self, id, name, cidr):
+        network = mock.MagicMock()
+        network.id = id
+        network.data = {'id': id, 'name': name, 'cidr': cidr}
+        return network
+
+    def test_network_catalog_lookups(self):
+        wide_net = self.build_mock_network('wide', 'WideNet', '10.0.0.0/16')
+        narrow_net = self.build_mock_network('narrow', 'NarrowNet', '10.0.5.0/24')
+        catalog = clc_network.ClcNetworkCatalog([wide_net, narrow_net])
+
+        self.assertEqual(catalog.Get('narrow'), narrow_net)
+        self.assertEqual(catalog.Get('WideNet'), wide_net)
+        self.assertEqual(catalog.Get('10.0.5.0/24'), narrow_net)
+        self.assertEqual(catalog.Get('nope'), None)
+        self.assertEqual(catalog.find_by_ip('10.0.5.12'), narrow_net)
+        self.assertEqual(catalog.find_by_ip('10.0.6.12'), wide_net)
+        self.assertEqual(catalog.find_by_ip('10.1.0.1'), None)
+        self.assertEqual(catalog.find_by_ip('not-an-ip'), None)
+
+    def test_network_catalog_load_uses_cache(self):
+        cache_dir = tempfile.mkdtemp()
+        try:
+            with patch.dict('os.environ', {'CLC_CACHE_DIR': cache_dir, 'CLC_CACHE_TTL': '60'}):
+                mock_nets = mock.MagicMock()
+                mock_nets.networks = [self.build_mock_network('12345', 'existing', '10.0.0.0/24')]
+                loader = mock.MagicMock(return_value=mock_nets)
+                clc_network.ClcNetworkCatalog.load('alias', 'uc1', loader)
+                with patch.object(clc_network, 'clc_sdk') as mock_clc_sdk:
+                    catalog = clc_network.ClcNetworkCatalog.load('alias', 'uc1', loader)
+                    self.assertEqual(loader.call_count, 1)
+                    mock_clc_sdk.v2.Network.assert_called_once_with(
+                        '12345', alias='alias',
+                        network_obj={'id': '12345', 'name': 'existing', 'cidr': '10.0.0.0/24'})
+                    self.assertEqual(catalog.networks, [mock_clc_sdk.v2.Network.return_value])
+                    clc_network.ClcNetworkCatalog.invalidate('alias', 'uc1')
+                    clc_network.ClcNetworkCatalog.load('alias', 'uc1', loader)
+                    self.assertEqual(loader.call_count, 2)
+        finally:
+            shutil.rmtree(cache_dir)
 
     @patch.object(ClcNetwork, '_set_clc_credentials_from_env')
     def test_process_request_present_calls_sdk_network_create(self, mock_set_creds):
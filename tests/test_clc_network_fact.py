@@ -104,6 +104,19 @@ class TestClcNetworkFactFunctions(unittest.TestCase):
     def test_get_clc_networks(self):
         pass
 
+    @patch.object(clc_network_fact, 'clc_sdk')
+    def test_process_request_finds_network_holding_ip(self, mock_clc_sdk):
+        mock_network = mock.MagicMock()
+        mock_network.id = '12345'
+        mock_network.data = {'id': '12345', 'name': 'Ansible Network', 'cidr': '10.101.236.0/24'}
+        mock_clc_sdk.v2.Networks.return_value.networks = [mock_network]
+        self.module.params = {'id': '10.101.236.12', 'location': 'CA3'}
+        under_test = ClcNetworkFact(self.module)
+        with patch.object(under_test, '_set_clc_credentials_from_env'):
+            under_test.process_request()
+        self.module.exit_json.assert_called_once_with(network=mock_network.data)
+        self.assertFalse(self.module.fail_json.called)
+
     def test_define_argument_spec(self):
         result = ClcNetworkFact._define_module_argument_spec()
         self.assertIsInstance(result, dict)
@@ -111,7 +124,9 @@ class TestClcNetworkFactFunctions(unittest.TestCase):
         self.assertEqual(
             result,
             {'id': {'required': False},
-             'location': {'required': True}})
+             'location': {'required': True},
+             'fields': {'type': 'list', 'required': False},
+             'exclude': {'type': 'list', 'required': False}})
 
     def test_set_clc_credentials_from_env(self):
         # Required combination of credentials not passed
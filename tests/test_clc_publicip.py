@@ -347,6 +347,145 @@ class TestClcPublicIpFunctions(unittest.TestCase):
         self.assertEqual(changed, True)
         self.assertEqual(servers_modified, ['TESTSVR1'])
 
+    @patch.object(ClcPublicIp, '_get_servers_from_clc')
+    def test_ensure_public_ip_absent_loads_public_ips_once(self, mock_get_servers):
+        mock_servers = self.build_mock_server_list()
+        expected_requests = self.build_mock_publicip_delete_request_list(mock_servers)
+        for server in mock_servers:
+            server.PublicIPs.reset_mock()
+        mock_get_servers.return_value = mock_servers
+        self.module.params = {'parallelism': 2}
+        self.module.check_mode = False
+
+        under_test = ClcPublicIp(self.module)
+        changed, servers_modified, requests = under_test.ensure_public_ip_absent(['TESTSVR1', 'TESTSVR2'])
+        self.assertTrue(changed)
+        self.assertEqual(servers_modified, ['TESTSVR1', 'TESTSVR2'])
+        self.assertEqual(requests, expected_requests)
+        for server in mock_servers:
+            self.assertEqual(server.PublicIPs.call_count, 1)
+        self.assertFalse(self.module.fail_json.called)
+
+    @patch.object(ClcPublicIp, '_get_servers_from_clc')
+    def test_ensure_public_ip_present_in_parallel(self, mock_get_servers):
+        mock_servers = self.build_mock_server_list_wo_public_ips()
+        mock_get_servers.return_value = mock_servers
+        self.module.params = {'parallelism': 2}
+        self.module.check_mode = False
+
+        under_test = ClcPublicIp(self.module)
+        changed, servers_modified, requests = under_test.ensure_public_ip_present(
+            ['TESTSVR1', 'TESTSVR2'], 'TCP', [80])
+        self.assertTrue(changed)
+        self.assertEqual(servers_modified, ['TESTSVR1', 'TESTSVR2'])
+        self.assertEqual(requests, [server.PublicIPs().Add.return_value for server in mock_servers])
+        for server in mock_servers:
+            server.PublicIPs().Add.assert_called_once_with(
+                ports=[{'protocol': 'TCP', 'port': 80}, {'protocol': 'ICMP', 'port': 0}],
+                source_restrictions=[])
+
+    def test_submit_public_ip_requests_aggregates_failures(self):
+        error = CLCException("Failed")
+        error.response_text = 'Mock failure message'
+        mock_servers = self.build_mock_server_list_wo_public_ips()
+        for server in mock_servers:
+            server.PublicIPs().Add.side_effect = error
+        self.module.params = {'parallelism': 2}
+
+        under_test = ClcPublicIp(self.module)
+        under_test._submit_public_ip_requests(
+            mock_servers, lambda server: [under_test._add_publicip_to_server(server, [])])
+        self.module.fail_json.assert_called_once_with(
+            msg='Failed to add public ip to the server : TESTSVR1. Mock failure message '
+                'Failed to add public ip to the server : TESTSVR2. Mock failure message')
+        self.assertEqual(under_test.module, self.module)
+
+    def build_mock_public_ip(self, ports, cidrs):
+        public_ip = mock.MagicMock()
+        public_ip.id = '10.10.10.10'
+        public_ip.ports = [mock.MagicMock(protocol=protocol, port=port, port_to=None)
+                           for protocol, port in ports]
+        public_ip.source_restrictions = [mock.MagicMock(cidr=cidr) for cidr in cidrs]
+        return public_ip
+
+    def test_get_drifted_public_ips(self):
+        ports_to_expose = [{'protocol': 'TCP', 'port': '443'}, {'protocol': 'ICMP', 'port': 0}]
+        restrictions = [{'cidr': '10.0.0.0/8'}]
+        in_sync = self.build_mock_public_ip([('TCP', 443), ('ICMP', 0)], ['10.0.0.0/8'])
+        port_drift = self.build_mock_public_ip([('TCP', 80), ('ICMP', 0)], ['10.0.0.0/8'])
+        cidr_drift = self.build_mock_public_ip([('tcp', 443), ('ICMP', 0)], [])
+        result = ClcPublicIp._get_drifted_public_ips(
+            [in_sync, port_drift, cidr_drift], ports_to_expose, restrictions)
+        self.assertEqual(result, [port_drift, cidr_drift])
+
+    @patch.object(ClcPublicIp, '_get_servers_from_clc')
+    def test_ensure_public_ip_present_reconciles_drift(self, mock_get_servers):
+        mock_servers = self.build_mock_server_list()
+        mock_servers[0].PublicIPs().public_ips = [
+            self.build_mock_public_ip([('TCP', 80), ('ICMP', 0)], [])]
+        mock_servers[1].PublicIPs().public_ips = [
+            self.build_mock_public_ip([('TCP', 443), ('ICMP', 0)], [])]
+        mock_get_servers.return_value = mock_servers
+        self.module.params = {'parallelism': 2}
+        self.module.check_mode = False
+
+        under_test = ClcPublicIp(self.module)
+        with patch.object(under_test, '_update_public_ip', return_value='update') as mock_update:
+            changed, servers_modified, requests = under_test.ensure_public_ip_present(
+                ['TESTSVR1', 'TESTSVR2'], 'TCP', [443], reconcile=True)
+        self.assertTrue(changed)
+        self.assertEqual(servers_modified, ['TESTSVR1'])
+        self.assertEqual(requests, ['update'])
+        mock_update.assert_called_once_with(
+            mock_servers[0],
+            mock_servers[0].PublicIPs().public_ips[0],
+            [{'protocol': 'TCP', 'port': 443}, {'protocol': 'ICMP', 'port': 0}],
+            [])
+        self.assertFalse(mock_servers[0].PublicIPs().Add.called)
+
+    @patch.object(ClcPublicIp, '_get_servers_from_clc')
+    def test_ensure_public_ip_present_ignores_drift_without_reconcile(self, mock_get_servers):
+        mock_servers = self.build_mock_server_list()
+        mock_servers[0].PublicIPs().public_ips = [
+            self.build_mock_public_ip([('TCP', 80), ('ICMP', 0)], [])]
+        mock_get_servers.return_value = mock_servers
+        self.module.check_mode = False
+
+        under_test = ClcPublicIp(self.module)
+        changed, servers_modified, requests = under_test.ensure_public_ip_present(
+            ['TESTSVR1', 'TESTSVR2'], 'TCP', [443])
+        self.assertFalse(changed)
+        self.assertEqual(servers_modified, [])
+
+    @patch.object(ClcPublicIp, 'clc')
+    def test_update_public_ip(self, mock_clc_sdk):
+        mock_server = mock.MagicMock()
+        mock_server.id = 'TESTSVR1'
+        mock_server.alias = 'TEST'
+        public_ip = self.build_mock_public_ip([('TCP', 80)], [])
+        under_test = ClcPublicIp(self.module)
+        result = under_test._update_public_ip(
+            mock_server, public_ip, [{'protocol': 'TCP', 'port': 443, 'port_to': 444}], [{'cidr': '10.0.0.0/8'}])
+        mock_clc_sdk.v2.API.Call.assert_called_once_with(
+            'PUT',
+            'servers/TEST/TESTSVR1/publicIPAddresses/10.10.10.10',
+            clc_publicip.json.dumps({'ports': [{'protocol': 'TCP', 'port': 443, 'portTo': 444}],
+                                     'sourceRestrictions': [{'cidr': '10.0.0.0/8'}]}))
+        self.assertEqual(result, mock_clc_sdk.v2.Requests.return_value)
+
+    @patch.object(ClcPublicIp, 'clc')
+    def test_update_public_ip_exception(self, mock_clc_sdk):
+        error = CLCException("Failed")
+        error.response_text = 'Mock failure message'
+        mock_clc_sdk.v2.API.Call.side_effect = error
+        mock_server = mock.MagicMock()
+        mock_server.id = 'TESTSVR1'
+        public_ip = self.build_mock_public_ip([], [])
+        under_test = ClcPublicIp(self.module)
+        under_test._update_public_ip(mock_server, public_ip, [], [])
+        self.module.fail_json.assert_called_once_with(
+            msg='Failed to update public ip 10.10.10.10 on the server : TESTSVR1. Mock failure message')
+
     def test_wait_for_requests_w_mock_request(self):
         mock_r1 = mock.MagicMock()
         mock_r1.WaitUntilComplete.return_value = True
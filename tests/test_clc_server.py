@@ -31,6 +31,7 @@ class TestClcServerFunctions(unittest.TestCase):
     def setUp(self):
         self.clc = mock.MagicMock()
         self.module = mock.MagicMock()
+        self.module.check_mode = False
         self.datacenter = mock.MagicMock()
 
     def test_clc_module_not_found(self):
@@ -850,17 +851,16 @@ class TestClcServerFunctions(unittest.TestCase):
         mock_subsubgroup = mock.MagicMock()
 
         mock_group_to_find.name = "TEST_RECURSIVE_GRP"
+        mock_group.name = "TopGroup"
+        mock_subgroup.name = "SubGroup"
+        mock_subsubgroup.name = "SubSubGroup"
 
         mock_datacenter.Groups().Get.side_effect = CLCException()
         mock_datacenter.Groups().groups = [mock_group]
-
-        mock_group.Subgroups().Get.side_effect = CLCException()
         mock_group.Subgroups().groups = [mock_subgroup]
-
-        mock_subgroup.Subgroups().Get.side_effect = CLCException()
         mock_subgroup.Subgroups().groups = [mock_subsubgroup]
-
-        mock_subsubgroup.Subgroups().Get.return_value = mock_group_to_find
+        mock_subsubgroup.Subgroups().groups = [mock_group_to_find]
+        mock_group_to_find.Subgroups().groups = []
 
         # Test
         under_test = ClcServer(self.module)
@@ -911,15 +911,15 @@ class TestClcServerFunctions(unittest.TestCase):
         # Setup
         mock_network = mock.MagicMock()
         mock_network.id = UUID('12345678123456781234567812345678')
+        mock_network.data = {'name': 'AwesomeIdHere'}
         self.module.params = {"network_id": "AwesomeIdHere"}
-        self.datacenter.Networks().Get = mock.MagicMock(return_value=mock_network)
+        self.datacenter.Networks().networks = [mock_network]
 
         # Function Under Test
         result = ClcServer._find_network_id(self.module, self.datacenter)
 
         # Assert Result
         self.datacenter.Networks.assert_called_with(forced_load=True)
-        self.datacenter.Networks().Get.assert_called_once_with('AwesomeIdHere')
         self.assertEqual(result, mock_network.id)
         self.assertEqual(self.module.fail_json.called, False)  
 
@@ -995,6 +995,27 @@ class TestClcServerFunctions(unittest.TestCase):
         # Assert Result
         self.assertEqual(self.module.fail_json.called, True)
 
+    @patch.object(clc_server, 'ClcCatalogCache')
+    @patch.object(clc_server, 'clc_sdk')
+    def test_get_aa_policy_id_from_catalog_cache(self, mock_clc_sdk, mock_cache):
+        mock_cache.get.return_value = [{'name': 'test1', 'id': '111', 'location': 'UC1', 'servers': []}]
+        policy_id = ClcServer._get_anti_affinity_policy_id(mock_clc_sdk, None, 'alias', 'test1')
+        self.assertEqual('111', policy_id)
+        self.assertFalse(mock_clc_sdk.v2.API.Call.called)
+        self.assertFalse(mock_cache.put.called)
+
+    @patch.object(clc_server, 'ClcCatalogCache')
+    @patch.object(clc_server, 'clc_sdk')
+    def test_get_aa_policy_catalog_fills_cache(self, mock_clc_sdk, mock_cache):
+        mock_cache.get.return_value = None
+        mock_clc_sdk.v2.API.Call.return_value = {'items': [
+            {'name': 'test1', 'id': '111', 'location': 'UC1',
+             'links': [{'rel': 'self', 'id': '111'}, {'rel': 'server', 'id': 'svr1'}]}]}
+        catalog = ClcServer._get_aa_policy_catalog(mock_clc_sdk, 'alias')
+        expected = [{'name': 'test1', 'id': '111', 'location': 'UC1', 'servers': ['svr1']}]
+        self.assertEqual(catalog, expected)
+        mock_cache.put.assert_called_once_with('aa_policies', 'alias', expected)
+
     @patch.object(clc_server, 'clc_sdk')
     def test_get_anti_affinity_policy_id_singe_match(self, mock_clc_sdk):
         mock_clc_sdk.v2.API.Call.side_effect = [{'items' :
@@ -1085,6 +1106,28 @@ class TestClcServerFunctions(unittest.TestCase):
         under_test._find_datacenter(mock_clc_sdk, self.module)
         self.module.fail_json.assert_called_with(msg='Unable to find location: testdc')
 
+    def test_find_group_recursive_by_path(self):
+        mock_prod = mock.MagicMock()
+        mock_prod.name = 'prod'
+        mock_dev = mock.MagicMock()
+        mock_dev.name = 'dev'
+        mock_prod_web = mock.MagicMock()
+        mock_prod_web.name = 'web'
+        mock_prod_web.Subgroups().groups = []
+        mock_dev_web = mock.MagicMock()
+        mock_dev_web.name = 'web'
+        mock_dev_web.Subgroups().groups = []
+        mock_prod.Subgroups().groups = [mock_prod_web]
+        mock_dev.Subgroups().groups = [mock_dev_web]
+        mock_group_list = mock.MagicMock()
+        mock_group_list.groups = [mock_prod, mock_dev]
+
+        result = ClcServer._find_group_recursive(self.module, mock_group_list, 'dev/web')
+
+        self.assertEqual(result, mock_dev_web)
+        self.assertEqual(ClcServer._find_group_recursive(self.module, mock_group_list, 'web'), mock_dev_web)
+        self.assertEqual(ClcServer._find_group_recursive(self.module, mock_group_list, 'qa/web'), None)
+
     @patch.object(ClcServer, '_find_group_recursive')
     def test_find_group_no_result(self, mock_find_recursive):
         mock_find_recursive.return_value = None
@@ -1224,6 +1267,15 @@ class TestClcServerFunctions(unittest.TestCase):
                           'server_id',
                           'alert_policy_id')
 
+    @patch.object(clc_server, 'ClcCatalogCache')
+    @patch.object(clc_server, 'clc_sdk')
+    def test_get_alert_policy_id_by_name_from_cache(self, mock_clc_sdk, mock_cache):
+        mock_cache.get.return_value = [{'name': 'test1', 'id': '111'}]
+        policy_id = ClcServer._get_alert_policy_id_by_name(mock_clc_sdk, None, 'alias', 'test1')
+        self.assertEqual('111', policy_id)
+        self.assertFalse(mock_clc_sdk.v2.API.Call.called)
+        self.assertFalse(mock_cache.put.called)
+
     @patch.object(clc_server, 'AnsibleModule')
     @patch.object(clc_server, 'clc_sdk')
     def test_get_alert_policy_id_by_name_dup_match(self, mock_clc_sdk, mock_ansible_module):
@@ -1360,6 +1412,63 @@ class TestClcServerFunctions(unittest.TestCase):
         self.assertEqual(created_server_ids, [])
         self.assertEqual(partial_created_servers_ids, [])
 
+    def test_get_count_changes(self):
+        ids = ['c', 'a', 'b']
+        self.assertEqual(ClcServer._get_count_changes(ids, 5, None, None), (2, []))
+        self.assertEqual(ClcServer._get_count_changes(ids, 1, None, None), (0, ['a', 'b']))
+        self.assertEqual(ClcServer._get_count_changes(ids, None, 4, None), (1, []))
+        self.assertEqual(ClcServer._get_count_changes(ids, None, 1, 2), (0, ['a']))
+        self.assertEqual(ClcServer._get_count_changes(ids, None, 2, 4), (0, []))
+
+    @patch.object(ClcServer, '_validate_module_params')
+    def test_plan_request_start_servers(self, mock_validate):
+        self.module.params = {'state': 'started', 'server_ids': ['server1', 'server2']}
+        server1 = mock.MagicMock(id='server1', powerState='stopped')
+        server2 = mock.MagicMock(id='server2', powerState='started')
+        self.clc.v2.Servers.return_value.Servers.return_value = [server1, server2]
+        under_test = ClcServer(self.module)
+        changed, plan = under_test._plan_request(self.module, self.clc)
+        self.assertTrue(changed)
+        self.assertEqual(plan, {'create': None, 'delete': [],
+                                'power': [{'id': 'server1', 'before': 'stopped', 'after': 'started'}]})
+        self.assertFalse(mock_validate.called)
+        self.clc.v2.Servers.assert_called_once_with(['server1', 'server2'])
+
+    @patch.object(ClcServer, '_find_datacenter')
+    @patch.object(ClcServer, '_find_running_servers_by_group')
+    @patch.object(ClcServer, '_validate_module_params')
+    def test_plan_request_exact_count(self, mock_validate, mock_running_servers, mock_dc):
+        params = {'state': 'present', 'template': 'TEMPLATE', 'type': 'standard',
+                  'name': 'test', 'group': 'group_id', 'location': 'UC1', 'cpu': 1,
+                  'memory': 2, 'count': 1, 'exact_count': 1, 'count_group': 'Web'}
+        mock_validate.return_value = params
+        mock_running_servers.return_value = (
+            [], [mock.MagicMock(id='server2'), mock.MagicMock(id='server1')])
+        under_test = ClcServer(self.module)
+        changed, plan = under_test._plan_request(self.module, self.clc)
+        self.assertTrue(changed)
+        self.assertEqual(plan, {'create': None, 'delete': ['server1'], 'power': []})
+
+        params['exact_count'] = 4
+        changed, plan = under_test._plan_request(self.module, self.clc)
+        self.assertEqual(plan['create'], {'count': 2, 'name': 'test', 'template': 'TEMPLATE',
+                                          'type': 'standard', 'group': 'group_id',
+                                          'location': 'UC1', 'cpu': 1, 'memory': 2})
+        self.assertEqual(plan['delete'], [])
+        self.assertFalse(self.module.fail_json.called)
+
+    @patch.object(ClcServer, '_plan_request')
+    @patch.object(ClcServer, '_set_clc_credentials_from_env')
+    def test_process_request_check_mode_returns_plan(self, mock_creds, mock_plan):
+        self.module.check_mode = True
+        plan = {'create': None, 'delete': ['server1'], 'power': []}
+        mock_plan.return_value = (True, plan)
+        under_test = ClcServer(self.module)
+        under_test.process_request()
+        self.module.exit_json.assert_called_once_with(
+            changed=True, server_ids=[], group=None, partially_created_server_ids=[],
+            servers=[], plan=plan)
+
     def test_enforce_count_missing_argument(self):
         params = {
             'state': 'present',
@@ -1484,6 +1593,64 @@ class TestClcServerFunctions(unittest.TestCase):
         self.assertEqual(changed, True)
         self.assertEqual(result_server_ids, ['mockid1'])
 
+    def _build_power_servers(self, count, power_state='stopped'):
+        servers = []
+        for index in range(count):
+            server = mock.MagicMock()
+            server.id = 'server%d' % index
+            server.powerState = power_state
+            servers.append(server)
+        return servers
+
+    @patch('clc_ansible_module.clc_server.ClcServer._change_server_power_state')
+    def test_start_stop_servers_in_batches(self, mock_change_state):
+        self.module.params = {'batch_size': 2, 'max_failures': 0}
+        self.module.check_mode = False
+        servers = self._build_power_servers(5)
+        servers[2].powerState = 'started'
+        mock_change_state.return_value.WaitUntilComplete.return_value = 0
+        changed_servers = ClcServer._start_stop_servers_in_batches(
+            self.module, servers, 'started')
+        self.assertEqual([server.id for server in changed_servers],
+                         ['server0', 'server1', 'server3', 'server4'])
+        self.assertEqual(mock_change_state.call_count, 4)
+        self.assertFalse(self.module.fail_json.called)
+
+    @patch('clc_ansible_module.clc_server.ClcServer._change_server_power_state')
+    def test_start_stop_servers_in_batches_aborts_on_failures(self, mock_change_state):
+        self.module.params = {'batch_size': 2, 'max_failures': 1}
+        self.module.check_mode = False
+        servers = self._build_power_servers(6)
+        mock_change_state.return_value.WaitUntilComplete.return_value = 1
+        ClcServer._start_stop_servers_in_batches(self.module, servers, 'started')
+        self.assertEqual(mock_change_state.call_count, 2)
+        self.module.fail_json.assert_called_once_with(
+            msg='Unable to process server request. '
+                'Unable to change power state for server server0. '
+                'Unable to change power state for server server1. '
+                'Aborted the remaining 4 servers.',
+            server_ids=[])
+
+    @patch('clc_ansible_module.clc_server.ClcServer._change_server_power_state')
+    def test_start_stop_servers_in_batches_without_wait(self, mock_change_state):
+        self.module.params = {'batch_size': 2, 'wait': False}
+        self.module.check_mode = False
+        servers = self._build_power_servers(3)
+        ClcServer._start_stop_servers_in_batches(self.module, servers, 'started')
+        self.module.fail_json.assert_called_once_with(
+            msg='batch_size waits for each wave and cannot be used with wait set to false')
+        self.assertFalse(mock_change_state.called)
+
+    @patch('clc_ansible_module.clc_server.ClcServer._change_server_power_state')
+    def test_start_stop_servers_in_batches_check_mode(self, mock_change_state):
+        self.module.params = {'batch_size': 2}
+        self.module.check_mode = True
+        servers = self._build_power_servers(3)
+        changed_servers = ClcServer._start_stop_servers_in_batches(
+            self.module, servers, 'started')
+        self.assertEqual(len(changed_servers), 3)
+        self.assertFalse(mock_change_state.called)
+
     def test_wait_for_requests_fail(self):
         under_test = ClcServer(self.module)
         mock_request = mock.MagicMock()
@@ -15,8 +15,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
 import os
+import shutil
+import tempfile
 import unittest
+import requests
 from uuid import UUID
 import clc as clc_sdk
 from clc import CLCException
@@ -26,6 +30,7 @@ from mock import patch, create_autospec
 
 import clc_ansible_module.clc_server_fact as clc_server_fact
 from clc_ansible_module.clc_server_fact import ClcServerFact
+from tests.fact_helpers import build_fact_module, build_mock_response
 
 
 class TestClcServerFactFunctions(unittest.TestCase):
@@ -64,8 +69,180 @@ class TestClcServerFactFunctions(unittest.TestCase):
         self.assertTrue('argument_spec' in result)
         self.assertEqual(
             result['argument_spec'],
-            {'server_id': {'required': True},
-             'credentials': {'default': False}})
+            {'server_id': {'required': False},
+             'server_ids': {'type': 'list', 'required': False},
+             'credentials': {'default': False},
+             'fields': {'type': 'list', 'required': False},
+             'exclude': {'type': 'list', 'required': False},
+             'parallelism': {'type': 'int', 'default': 10}})
+        self.assertEqual(result['mutually_exclusive'], [['server_id', 'server_ids']])
+        self.assertEqual(result['required_one_of'], [['server_id', 'server_ids']])
+
+    def build_server_payload(self, server_id):
+        return {'id': server_id,
+                'details': {'memoryMB': 2048,
+                            'ipAddresses': [{'internal': '10.0.0.5'},
+                                            {'internal': '10.0.0.6', 'public': '1.2.3.4'}]}}
+
+    @patch.object(ClcServerFact, '_set_clc_credentials_from_env')
+    def test_process_request_server_ids(self, mock_set_creds):
+        under_test = build_fact_module(
+            ClcServerFact, self.module,
+            {'server_ids': ['server1', 'server2'], 'credentials': True, 'parallelism': 2})
+        under_test.session.get.side_effect = lambda url, headers: (
+            build_mock_response(200, {'password': 'secret'}) if url.endswith('/credentials')
+            else build_mock_response(200, self.build_server_payload(url.split('/')[-1])))
+
+        under_test.process_request()
+
+        self.assertEqual(under_test.session.get.call_count, 4)
+        under_test.session.get.assert_any_call(
+            'http://unittest.example.com/v2/servers/test_alias/server2/credentials',
+            headers={'Authorization': 'Bearer dummy_token'})
+        servers = self.module.exit_json.call_args[1]['servers']
+        self.assertEqual(sorted(servers.keys()), ['server1', 'server2'])
+        self.assertEqual(servers['server1']['details']['memory'], 2)
+        self.assertEqual(servers['server1']['ipaddress'], '10.0.0.5')
+        self.assertEqual(servers['server2']['publicip']['public'], '1.2.3.4')
+        self.assertEqual(servers['server2']['credentials'], {'password': 'secret'})
+        self.assertFalse(self.module.fail_json.called)
+
+    @patch.object(ClcServerFact, '_set_clc_credentials_from_env')
+    def test_process_request_server_ids_aggregates_failures(self, mock_set_creds):
+        under_test = build_fact_module(
+            ClcServerFact, self.module,
+            {'server_ids': ['server1', 'server2'], 'parallelism': 2})
+        under_test.session.get.return_value = build_mock_response(404, None)
+
+        under_test.process_request()
+
+        self.module.fail_json.assert_called_once_with(
+            msg='Failed to retrieve server facts: server1 Failed to retrieve server facts: server2')
+        self.assertFalse(self.module.exit_json.called)
+
+    def test_project_fields(self):
+        document = {'id': 'server1',
+                    'links': [{'rel': 'self'}],
+                    'details': {'memoryMB': 2048,
+                                'snapshots': [],
+                                'ipAddresses': [{'internal': '10.0.0.5'},
+                                                {'internal': '10.0.0.6', 'public': '1.2.3.4'}]}}
+        self.assertEqual(
+            ClcServerFact._project_fields(document, ['id', 'details.ipAddresses.internal', 'missing.path']),
+            {'id': 'server1', 'details': {'ipAddresses': [{'internal': '10.0.0.5'}, {'internal': '10.0.0.6'}]}})
+        self.assertEqual(
+            ClcServerFact._project_fields(document, ['details'], ['details.snapshots', 'details.ipAddresses.public']),
+            {'details': {'memoryMB': 2048,
+                         'ipAddresses': [{'internal': '10.0.0.5'}, {'internal': '10.0.0.6'}]}})
+        self.assertEqual(
+            ClcServerFact._project_fields(document, None, ['links', 'details']),
+            {'id': 'server1'})
+
+    @patch.object(ClcServerFact, '_set_clc_credentials_from_env')
+    def test_process_request_projects_fields(self, mock_set_creds):
+        under_test = build_fact_module(
+            ClcServerFact, self.module, {'server_id': 'server1', 'fields': ['id', 'ipaddress']})
+        under_test.session.get.return_value = build_mock_response(
+            200, self.build_server_payload('server1'))
+
+        under_test.process_request()
+
+        self.module.exit_json.assert_called_once_with(
+            changed=False, server={'id': 'server1', 'ipaddress': '10.0.0.5'})
+
+    def build_http_response(self, status_code, body=None, headers=None):
+        response = requests.models.Response()
+        response.status_code = status_code
+        response.encoding = 'utf-8'
+        response.headers.update(headers or {})
+        response._content = (body or '').encode('utf-8')
+        return response
+
+    def test_caching_session_revalidates_with_etag(self):
+        cache_dir = tempfile.mkdtemp()
+        try:
+            with patch.dict('os.environ', {'CLC_CACHE_DIR': cache_dir, 'CLC_HTTP_CACHE_TTL': '60'}), \
+                    patch.object(requests.Session, 'request') as mock_request:
+                mock_request.side_effect = [
+                    self.build_http_response(200, '{"id": "server1"}', {'ETag': '"v1"'}),
+                    self.build_http_response(304)]
+                session = clc_server_fact.ClcCachingSession()
+                first = session.get('http://unittest.example.com/v2/servers/alias/server1')
+                second = session.get('http://unittest.example.com/v2/servers/alias/server1')
+            self.assertEqual(first.json(), {'id': 'server1'})
+            self.assertEqual(second.status_code, 200)
+            self.assertEqual(second.json(), {'id': 'server1'})
+            self.assertEqual(mock_request.call_args[1]['headers'], {'If-None-Match': '"v1"'})
+        finally:
+            shutil.rmtree(cache_dir)
+
+    def test_caching_session_reuses_response_without_validators(self):
+        cache_dir = tempfile.mkdtemp()
+        try:
+            with patch.dict('os.environ', {'CLC_CACHE_DIR': cache_dir, 'CLC_HTTP_CACHE_TTL': '60'}), \
+                    patch.object(requests.Session, 'request') as mock_request:
+                mock_request.return_value = self.build_http_response(200, '{"id": "server1"}')
+                session = clc_server_fact.ClcCachingSession()
+                session.get('http://unittest.example.com/v2/servers/alias/server1')
+                cached = session.get('http://unittest.example.com/v2/servers/alias/server1')
+                session.post('http://unittest.example.com/v2/authentication/login')
+            self.assertEqual(cached.json(), {'id': 'server1'})
+            self.assertEqual(mock_request.call_count, 2)
+            self.assertEqual(mock_request.call_args[0][0], 'POST')
+        finally:
+            shutil.rmtree(cache_dir)
+
+    def test_caching_session_disabled_without_ttl(self):
+        with patch.dict('os.environ', {}, clear=True), \
+                patch.object(requests.Session, 'request') as mock_request:
+            mock_request.return_value = self.build_http_response(200, '{}', {'ETag': '"v1"'})
+            session = clc_server_fact.ClcCachingSession()
+            session.get('http://unittest.example.com/v2/servers/alias/server1')
+            session.get('http://unittest.example.com/v2/servers/alias/server1')
+        self.assertEqual(mock_request.call_count, 2)
+        self.assertEqual(mock_request.call_args[1]['headers'], None)
+
+    def test_caching_session_ignores_catalog_cache_ttl(self):
+        with patch.dict('os.environ', {'CLC_CACHE_TTL': '3600'}, clear=True), \
+                patch.object(requests.Session, 'request') as mock_request:
+            mock_request.return_value = self.build_http_response(200, '{"id": "server1"}')
+            session = clc_server_fact.ClcCachingSession()
+            session.get('http://unittest.example.com/v2/servers/alias/server1')
+            session.get('http://unittest.example.com/v2/servers/alias/server1')
+        self.assertEqual(mock_request.call_count, 2)
+
+    def test_caching_session_does_not_cache_credentials(self):
+        cache_dir = tempfile.mkdtemp()
+        try:
+            self.module.params = {'server_id': 'server1', 'credentials': True}
+            under_test = ClcServerFact(self.module)
+            under_test.api_url = 'http://unittest.example.com'
+            under_test.clc_alias = 'test_alias'
+            under_test.v2_api_token = 'dummy_token'
+            with patch.dict('os.environ', {'CLC_CACHE_DIR': cache_dir, 'CLC_HTTP_CACHE_TTL': '60'}), \
+                    patch.object(requests.Session, 'request') as mock_request:
+                mock_request.side_effect = lambda method, url, **kwargs: (
+                    self.build_http_response(200, '{"password": "secret"}')
+                    if url.endswith('/credentials')
+                    else self.build_http_response(200, json.dumps(self.build_server_payload('server1'))))
+                facts, error = under_test._get_server_facts('server1')
+                under_test._get_server_facts('server1')
+            self.assertEqual(error, None)
+            self.assertEqual(facts['credentials'], {'password': 'secret'})
+            self.assertEqual(mock_request.call_count, 3)
+            cache_files = os.listdir(cache_dir)
+            self.assertEqual(len(cache_files), 1)
+            with open(os.path.join(cache_dir, cache_files[0])) as cache_file:
+                self.assertFalse('secret' in cache_file.read())
+        finally:
+            shutil.rmtree(cache_dir)
+
+    def test_get_session_is_shared(self):
+        self.module.params = {'parallelism': 4}
+        under_test = ClcServerFact(self.module)
+        session = under_test._get_session()
+        self.assertIs(under_test._get_session(), session)
+        self.assertEqual(session.get_adapter('https://api.ctl.io')._pool_maxsize, 4)
 
     def test_get_server_credentials(self):
         under_test = ClcServerFact(self.module)
@@ -284,7 +284,7 @@ class TestClcServerSnapshotFunctions(unittest.TestCase):
         mock_r2.WaitUntilComplete.return_value = True
         requests = [mock_r1, mock_r2]
 
-        self.module.wait = True
+        self.module.params = {'wait': True, 'state': 'present', 'parallelism': 2}
 
         under_test = ClcSnapshot(self.module)
         under_test._wait_for_requests_to_complete(requests, mock.MagicMock())
@@ -297,7 +297,7 @@ class TestClcServerSnapshotFunctions(unittest.TestCase):
         mock_response.Status.return_value = 'Failed'
         mock_request.requests = [mock_response]
         requests = [mock_request]
-        self.module.wait = True
+        self.module.params = {'wait': True, 'state': 'present', 'parallelism': 2}
 
         under_test = ClcSnapshot(self.module)
         under_test._wait_for_requests_to_complete(requests, mock.MagicMock())
@@ -317,10 +317,53 @@ class TestClcServerSnapshotFunctions(unittest.TestCase):
 
     @patch.object(ClcSnapshot, 'clc')
     def test_get_servers_from_clc(self, mock_clc_sdk):
-        mock_clc_sdk.v2.Servers.side_effect = CLCException("Server Not Found")
+        mock_clc_sdk.v2.Server.side_effect = CLCException("Server Not Found")
         under_test = ClcSnapshot(self.module)
         under_test._get_servers_from_clc(['TESTSVR1', 'TESTSVR2'], 'FAILED TO OBTAIN LIST')
-        self.module.fail_json.assert_called_once_with(msg='FAILED TO OBTAIN LIST: Server Not Found')
+        self.module.fail_json.assert_called_once_with(
+            msg='FAILED TO OBTAIN LIST: TESTSVR1 Server Not Found, TESTSVR2 Server Not Found')
+
+    @patch.object(ClcSnapshot, 'clc')
+    def test_get_servers_from_clc_in_parallel(self, mock_clc_sdk):
+        self.module.params = {'parallelism': 3}
+        mock_clc_sdk.v2.Server.side_effect = lambda server_id: 'loaded-' + server_id
+        under_test = ClcSnapshot(self.module)
+        servers = under_test._get_servers_from_clc(
+            ['TESTSVR%d' % i for i in range(6)], 'FAILED TO OBTAIN LIST')
+        self.assertEqual(servers, ['loaded-TESTSVR%d' % i for i in range(6)])
+        self.assertFalse(self.module.fail_json.called)
+
+    def test_submit_server_requests(self):
+        self.module.params = {'parallelism': 2}
+        servers = []
+        for index in range(3):
+            server = mock.MagicMock()
+            server.id = 'TESTSVR%d' % index
+            servers.append(server)
+        under_test = ClcSnapshot(self.module)
+        request_list, changed_servers, failed_servers = under_test._submit_server_requests(
+            servers, lambda server: None if server.id == 'TESTSVR1' else 'request-' + server.id)
+        self.assertEqual(request_list, ['request-TESTSVR0', 'request-TESTSVR2'])
+        self.assertEqual(changed_servers, ['TESTSVR0', 'TESTSVR2'])
+        self.assertEqual(failed_servers, ['TESTSVR1'])
+        self.assertFalse(self.module.fail_json.called)
+
+    def test_submit_server_requests_aggregates_failures(self):
+        self.module.params = {'parallelism': 2}
+        self.module.check_mode = False
+        servers = []
+        for index in range(2):
+            server = mock.MagicMock()
+            server.id = 'TESTSVR%d' % index
+            server.CreateSnapshot.side_effect = CLCException('Failed')
+            servers.append(server)
+        under_test = ClcSnapshot(self.module)
+        under_test._submit_server_requests(
+            servers, lambda server: under_test._create_server_snapshot(server, 7, False))
+        self.module.fail_json.assert_called_once_with(
+            msg='Failed to create snapshot for server : TESTSVR0. Failed '
+                'Failed to create snapshot for server : TESTSVR1. Failed')
+        self.assertEqual(under_test.module, self.module)
 
     @patch.object(ClcSnapshot, '_get_servers_from_clc')
     def test_wait_for_requests_to_complete(self,mock_get_servers):
@@ -330,6 +373,30 @@ class TestClcServerSnapshotFunctions(unittest.TestCase):
         under_test._wait_for_requests_to_complete (mock.MagicMock(), mock.MagicMock())
         self.assertFalse(self.module.fail_json.called)
 
+    @patch.object(ClcSnapshot, 'clc')
+    def test_wait_for_requests_absent_waits_for_snapshot_removal(self, mock_clc_sdk):
+        mock_request = mock.MagicMock()
+        mock_request.requests = []
+        snapshots = {'TESTSVR1': [], 'TESTSVR2': ['snapshot']}
+        mock_clc_sdk.v2.Server.side_effect = lambda server_id: mock.MagicMock(
+            GetSnapshots=mock.MagicMock(return_value=snapshots[server_id]))
+        self.module.params = {'wait': True, 'state': 'absent', 'parallelism': 2}
+        under_test = ClcSnapshot(self.module)
+        with patch.object(ClcSnapshot, '_wait_for_snapshot_removal',
+                          side_effect=lambda server_id: not snapshots[server_id]):
+            under_test._wait_for_requests_to_complete([mock_request], ['TESTSVR1', 'TESTSVR2'])
+        self.module.fail_json.assert_called_once_with(
+            msg='Failed to delete snapshot for server : TESTSVR2.')
+
+    @patch.object(ClcSnapshot, 'clc')
+    def test_wait_for_snapshot_removal(self, mock_clc_sdk):
+        mock_server = mock.MagicMock()
+        mock_server.GetSnapshots.side_effect = [['snapshot'], []]
+        mock_clc_sdk.v2.Server.return_value = mock_server
+        under_test = ClcSnapshot(self.module)
+        self.assertTrue(under_test._wait_for_snapshot_removal('TESTSVR1', poll_freq=0))
+        self.assertEqual(mock_server.GetSnapshots.call_count, 2)
+
     def test_wait_for_requests_no_wait(self):
         mock_request = mock.MagicMock()
         mock_request.WaitUntilComplete.return_value = True
@@ -340,6 +407,70 @@ class TestClcServerSnapshotFunctions(unittest.TestCase):
         under_test._wait_for_requests_to_complete([mock_request], mock.MagicMock())
         self.assertFalse(self.module.fail_json.called)
 
+    @patch.object(ClcSnapshot, '_get_servers_from_clc')
+    @patch.object(ClcSnapshot, '_set_clc_credentials_from_env')
+    @patch.object(ClcSnapshot, 'clc')
+    def test_process_request_group_targets(self, mock_clc_sdk, mock_set_clc_creds, mock_get_servers):
+        mock_clc_sdk.v2.Datacenter.return_value.RootGroup.return_value.data = {
+            'id': 'root', 'name': 'UC1 Hardware', 'links': [],
+            'groups': [
+                {'id': 'g1', 'name': 'Web', 'groups': [], 'links': [
+                    {'rel': 'server', 'id': 'TESTSVR1'},
+                    {'rel': 'server', 'id': 'TESTSVR2'},
+                    {'rel': 'parentGroup', 'id': 'root'}]}]}
+        mock_get_servers.return_value = []
+        self.module.params = {
+            'server_ids': ['TESTSVR2', 'TESTSVR3'],
+            'group': 'Web',
+            'location': 'UC1',
+            'expiration_days': 7,
+            'wait': True,
+            'state': 'present',
+            'ignore_failures': False
+        }
+        self.module.check_mode = False
+        under_test = ClcSnapshot(self.module)
+        under_test.process_request()
+        mock_clc_sdk.v2.Datacenter.assert_called_once_with('UC1')
+        mock_get_servers.assert_called_once_with(
+            ['TESTSVR2', 'TESTSVR3', 'TESTSVR1'],
+            'Failed to obtain server list from the CLC API')
+        self.module.exit_json.assert_called_once_with(changed=False, server_ids=[], failed_server_ids=[])
+
+    @patch.object(ClcSnapshot, 'clc')
+    def test_get_group_server_ids_group_not_found(self, mock_clc_sdk):
+        mock_datacenter = mock_clc_sdk.v2.Datacenter.return_value
+        mock_datacenter.id = 'UC1'
+        mock_datacenter.RootGroup.return_value.data = {'id': 'root', 'name': 'UC1 Hardware', 'groups': []}
+        under_test = ClcSnapshot(self.module)
+        under_test._get_group_server_ids('Missing', 'UC1')
+        self.module.fail_json.assert_called_once_with(
+            msg='Unable to find group: Missing in location: UC1')
+
+    def test_find_group_data_by_id_in_nested_group(self):
+        tree = {'id': 'root', 'name': 'UC1 Hardware', 'groups': [
+            {'id': 'g1', 'name': 'Web', 'groups': [
+                {'id': 'g2', 'name': 'Blue', 'groups': []}]}]}
+        self.assertEqual(ClcSnapshot._find_group_data(tree, 'g2')['name'], 'Blue')
+        self.assertIsNone(ClcSnapshot._find_group_data(tree, 'Green'))
+
+    @patch.object(clc_server_snapshot.time, 'sleep')
+    def test_token_bucket_paces_requests(self, mock_sleep):
+        bucket = clc_server_snapshot.ClcTokenBucket(2)
+        with patch.object(clc_server_snapshot.time, 'time', side_effect=[0, 0, 0, 0.5]):
+            bucket._updated = 0
+            bucket.acquire()
+            bucket.acquire()
+            bucket.acquire()
+        mock_sleep.assert_called_once_with(0.5)
+
+    @patch.object(clc_server_snapshot.time, 'sleep')
+    def test_token_bucket_unlimited(self, mock_sleep):
+        bucket = clc_server_snapshot.ClcTokenBucket(0)
+        for _ in range(10):
+            bucket.acquire()
+        self.assertFalse(mock_sleep.called)
+
     def test_create_server_snapshot_exception(self):
         mock_server = mock.MagicMock()
         mock_server.id = 'test_server'